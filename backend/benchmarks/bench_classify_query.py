@@ -0,0 +1,100 @@
+# benchmarks/bench_classify_query.py
+"""
+Latência do classify_query com catálogos sintéticos de 10 a 50k famílias,
+comparando o índice (trie) com o loop antigo família por família.
+
+Uso (de dentro de backend/):
+    python -m benchmarks.bench_classify_query
+"""
+import random
+import time
+from typing import List, Optional
+
+from prices.domain.catalog import FAMILIES, FamilyIndex, ProductFamily
+from prices.domain.text import normalize_text
+
+FAMILY_COUNTS = [10, 100, 1_000, 10_000, 50_000]
+QUERIES = 500
+
+_WORDS = [
+    "gloss", "batom", "base", "paleta", "sombra", "rimel", "blush", "primer",
+    "matte", "liquido", "cremoso", "nude", "rosa", "vermelho", "pro", "max",
+]
+
+
+def synthetic_families(count: int) -> List[ProductFamily]:
+    rng = random.Random(count)
+    families = list(FAMILIES)
+    for i in range(count - len(families)):
+        brand = f"marca{i % 500}"
+        model = f"{rng.choice(_WORDS)} {rng.choice(_WORDS)} {i}"
+        families.append(
+            ProductFamily(
+                slug=f"fam-{i}",
+                display_name=model.title(),
+                category="makeup",
+                brand=brand,
+                keywords=[f"{brand} {model}", model, f"{brand}-{i}"],
+            )
+        )
+    return families[:count]
+
+
+def normalized_keywords(families: List[ProductFamily]) -> List[List[str]]:
+    return [list(dict.fromkeys(normalize_text(kw) for kw in fam.keywords)) for fam in families]
+
+
+def linear_best(
+    families: List[ProductFamily], keywords: List[List[str]], q_norm: str
+) -> Optional[ProductFamily]:
+    """Loop antigo, com as keywords já normalizadas."""
+    best_match, best_score = None, 0
+    for fam, fam_keywords in zip(families, keywords):
+        score = sum(1 for kw in fam_keywords if kw in q_norm)
+        if score > best_score:
+            best_score, best_match = score, fam
+    return best_match
+
+
+def queries_for(families: List[ProductFamily]) -> List[str]:
+    rng = random.Random(0)
+    queries = []
+    for _ in range(QUERIES):
+        if rng.random() < 0.5:
+            fam = rng.choice(families)
+            queries.append(f"{rng.choice(fam.keywords)} promoção")
+        else:
+            queries.append(" ".join(rng.choice(_WORDS) for _ in range(3)))
+    return queries
+
+
+def per_query_us(fn, queries: List[str]) -> float:
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main() -> None:
+    print(f"{'famílias':>9} {'build (ms)':>11} {'índice (µs)':>12} {'loop (µs)':>10}")
+    for count in FAMILY_COUNTS:
+        families = synthetic_families(count)
+        queries = queries_for(families)
+        keywords = normalized_keywords(families)
+
+        start = time.perf_counter()
+        index = FamilyIndex(families)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        for q in queries:
+            assert index.best_family(normalize_text(q)) is linear_best(
+                families, keywords, normalize_text(q)
+            ), q
+
+        indexed = per_query_us(lambda q: index.best_family(normalize_text(q)), queries)
+        linear = per_query_us(lambda q: linear_best(families, keywords, normalize_text(q)), queries[:50])
+        print(f"{count:>9} {build_ms:>11.1f} {indexed:>12.1f} {linear:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_local_catalog.py
+"""
+Carga e latência do catálogo local (SQLite FTS5) sobre o catálogo
+sintético de maquiagem, em vários tamanhos.
+
+Uso (de dentro de backend/):
+    python -m benchmarks.bench_local_catalog
+"""
+import os
+import statistics
+import tempfile
+import time
+
+from prices.mock_data.synthetic import generate_products
+from prices.price_sources.local_catalog import LocalCatalog
+
+SIZES = (1_000, 10_000, 100_000)
+QUERIES = (
+    "batom matte vermelho",
+    "base liquida",
+    "máscara de cílios",
+    "paleta sombra",
+    "gloss",
+    "corretivo claro",
+    "rimel à prova d'água",
+)
+ROUNDS = 200
+
+
+def bench(size: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = LocalCatalog(os.path.join(tmp, "catalog.sqlite3"))
+
+        start = time.perf_counter()
+        batch = []
+        for product in generate_products(size, seed=1):
+            batch.append(product)
+            if len(batch) >= 10_000:
+                catalog.ingest(batch)
+                batch = []
+        catalog.ingest(batch)
+        load = time.perf_counter() - start
+
+        timings = []
+        hits = 0
+        for _ in range(ROUNDS):
+            for query in QUERIES:
+                start = time.perf_counter()
+                hits += len(catalog.search(query))
+                timings.append(time.perf_counter() - start)
+
+        timings.sort()
+        p50 = statistics.median(timings) * 1e3
+        p99 = timings[int(len(timings) * 0.99)] * 1e3
+        print(
+            f"{size:>9} {size / load:>12.0f} {p50:>9.3f} {p99:>9.3f} "
+            f"{hits / (ROUNDS * len(QUERIES)):>10.1f}"
+        )
+
+
+def main() -> None:
+    print(f"{'produtos':>9} {'carga (o/s)':>12} {'p50 (ms)':>9} {'p99 (ms)':>9} {'ofertas':>10}")
+    for size in SIZES:
+        bench(size)
+
+
+if __name__ == "__main__":
+    main()
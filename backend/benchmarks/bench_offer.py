@@ -0,0 +1,80 @@
+# benchmarks/bench_offer.py
+"""
+Memória por oferta e tempo de acesso a atributo: dict antigo x Offer.
+
+Uso (de dentro de backend/):
+    python -m benchmarks.bench_offer
+"""
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from prices.domain.offer import Offer
+
+OFFERS = 100_000
+
+
+def make_dict(i: int) -> Dict[str, Any]:
+    # formato antigo, já com as chaves que o agregador acrescentava
+    return {
+        "store": "Loja Exemplo",
+        "source": "bench",
+        "id": i,
+        "title": "Batom matte vermelho",
+        "price": 39.9 + i,
+        "currency": "BRL",
+        "url": "https://exemplo.com/produto",
+        "thumbnail": None,
+        "relevance_score": 0.5,
+        "relevant": True,
+        "price_outlier": False,
+        "store_trust_factor": 1.0,
+        "effective_price": 39.9 + i,
+    }
+
+
+def make_offer(i: int) -> Offer:
+    return Offer(
+        store="Loja Exemplo",
+        source="bench",
+        id=i,
+        title="Batom matte vermelho",
+        price=39.9 + i,
+        url="https://exemplo.com/produto",
+        relevance_score=0.5,
+        store_trust_factor=1.0,
+        effective_price=39.9 + i,
+    )
+
+
+def bytes_per_item(factory: Callable[[int], Any]) -> float:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    items: List[Any] = [factory(i) for i in range(OFFERS)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del items
+    return total / OFFERS
+
+
+def main() -> None:
+    d = make_dict(1)
+    o = make_offer(1)
+    loops = 2_000_000
+
+    env = {"d": d, "o": o}
+
+    def ns(stmt: str) -> float:
+        return timeit.timeit(stmt, globals=env, number=loops) / loops * 1e9
+
+    dict_read, offer_read = ns('d["price"]'), ns("o.price")
+    dict_write, offer_write = ns('d["relevant"] = False'), ns("o.relevant = False")
+
+    print(f"{'':>8} {'bytes/oferta':>13} {'leitura (ns)':>13} {'escrita (ns)':>13}")
+    print(f"{'dict':>8} {bytes_per_item(make_dict):>13.0f} {dict_read:>13.1f} {dict_write:>13.1f}")
+    print(f"{'Offer':>8} {bytes_per_item(make_offer):>13.0f} {offer_read:>13.1f} {offer_write:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
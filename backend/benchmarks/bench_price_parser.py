@@ -0,0 +1,75 @@
+# benchmarks/bench_price_parser.py
+"""
+Mede a vazão do parse_price: parser antigo da Serper (replace/regex a cada
+oferta) x parser novo sem e com memo. Os formatos reais das lojas são
+conferidos nos testes (`python manage.py test prices`).
+
+Uso (de dentro de backend/):
+    python -m benchmarks.bench_price_parser
+"""
+import random
+import re
+import time
+from typing import Any, Callable, List, Optional
+
+from prices.domain import price as price_module
+from prices.domain.price import parse_price
+
+CALLS = 200_000
+
+
+def legacy_serper_parse(price_str: Optional[str]) -> Optional[float]:
+    """Cópia do _parse_price que a Serper usava, só pra comparação."""
+    if not price_str:
+        return None
+    s = price_str.strip()
+    s = re.sub(r"\bagora\b", "", s, flags=re.IGNORECASE).strip()
+    s = re.sub(r"[^\d,\.]", "", s)
+    if "," in s and "." in s:
+        s = s.replace(".", "").replace(",", ".")
+    elif "," in s and "." not in s:
+        s = s.replace(",", ".")
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+def workload() -> List[str]:
+    """Preços de uma busca típica: muitos valores diferentes, formatos de loja."""
+    rng = random.Random(0)
+    templates = ["R$ {}", "R$ {}", "{} agora", "agora R$ {}", "R$ {} - R$ 999,00"]
+    values = []
+    for _ in range(CALLS):
+        cents = rng.randint(990, 499_900)
+        reais, cent = divmod(cents, 100)
+        number = f"{reais:,}".replace(",", ".") + f",{cent:02d}"
+        values.append(rng.choice(templates).format(number))
+    return values
+
+
+def per_call_ns(fn: Callable[[Any], Any], values: List[str]) -> float:
+    start = time.perf_counter()
+    for value in values:
+        fn(value)
+    return (time.perf_counter() - start) / len(values) * 1e9
+
+
+def main() -> None:
+    values = workload()
+    legacy = per_call_ns(legacy_serper_parse, values)
+
+    price_module._parse_text.cache_clear()
+    cold = per_call_ns(parse_price, values)
+    warm = per_call_ns(parse_price, values[:1000] * (CALLS // 1000))
+    numeric = per_call_ns(parse_price, [59.9] * CALLS)
+
+    print(f"{'parser':>22} {'ns/chamada':>11}")
+    print(f"{'antigo (serper)':>22} {legacy:>11.0f}")
+    print(f"{'novo, sem memo':>22} {cold:>11.0f}")
+    print(f"{'novo, strings repetidas':>22} {warm:>11.0f}")
+    print(f"{'novo, numérico':>22} {numeric:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# benchmarks/bench_runbot.py
+"""
+Vazão da ingestão por long polling (UpdatePoller + UpdateQueue + fila de
+envio) contra um Telegram fake local: o servidor entrega UPDATES mensagens
+"/start" de CHATS chats pelo getUpdates e só conta os sendMessage.
+
+Os rate limits de envio ficam desligados aqui (senão o número medido é o
+limite do Telegram, não o nosso código). "ingestão/s" vai até o último
+update processado; "com envio/s", até a última resposta sair. O servidor
+fake roda no mesmo processo, então disputa o GIL com os envios.
+
+Uso (de dentro de backend/):
+    python -m benchmarks.bench_runbot
+"""
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+UPDATES = 5_000
+CHATS = 500
+WORKERS = (1, 4, 16)
+PORT = 8799
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ["TELEGRAM_API_BASE"] = f"http://127.0.0.1:{PORT}/botfake"
+os.environ["PRICEBOT_SEND_GLOBAL_RATE"] = "0"
+os.environ["PRICEBOT_SEND_CHAT_RATE"] = "0"
+os.environ["PRICEBOT_SEND_WORKERS"] = "16"
+
+import django  # noqa: E402
+
+django.setup()
+
+from telegram.services.bot_client import send_queue_stats  # noqa: E402
+from telegram.services.handlers import handle_update  # noqa: E402
+from telegram.services.polling import UpdatePoller  # noqa: E402
+from telegram.services.update_queue import UpdateQueue  # noqa: E402
+
+
+def make_updates(count: int, chats: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "update_id": 1_000 + i,
+            "message": {
+                "message_id": i,
+                "from": {"id": 10 + i % chats},
+                "chat": {"id": 10 + i % chats},
+                "text": "/start",
+            },
+        }
+        for i in range(count)
+    ]
+
+
+class FakeTelegram(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, como o api.telegram.org
+    updates: List[Dict[str, Any]] = []
+    sent = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])) or b"{}")
+        method = self.path.rsplit("/", 1)[-1]
+
+        if method == "getUpdates":
+            offset = body.get("offset", 0)
+            limit = body.get("limit", 100)
+            result: Any = [u for u in self.updates if u["update_id"] >= offset][:limit]
+        else:
+            with self.lock:
+                FakeTelegram.sent += 1
+                result = {"message_id": FakeTelegram.sent}
+
+        data = json.dumps({"ok": True, "result": result}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def _sends_done() -> int:
+    stats = send_queue_stats()
+    return stats["sent"] + stats["failed"]
+
+
+def run(workers: int) -> None:
+    FakeTelegram.sent = 0
+    sends_before = _sends_done()
+    update_queue = UpdateQueue(handle_update, max_size=1_000, workers=workers)
+    poller = UpdatePoller(update_queue, poll_timeout=0, dedup=False)
+
+    start = time.perf_counter()
+    while poller.received < UPDATES:
+        poller.poll_once()
+    update_queue.join()
+    ingested = time.perf_counter() - start
+    while _sends_done() - sends_before < UPDATES:
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+
+    stats = update_queue.stats()
+    print(
+        f"{workers:>8} {UPDATES / ingested:>12.0f} {UPDATES / elapsed:>12.0f} {FakeTelegram.sent:>9} "
+        f"{stats['wait_seconds']['p99'] * 1e3:>14.1f} {stats['processing_seconds']['p99'] * 1e3:>16.2f}"
+    )
+
+
+def main() -> None:
+    FakeTelegram.updates = make_updates(UPDATES, CHATS)
+    server = FakeServer(("127.0.0.1", PORT), FakeTelegram)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print(f"{'workers':>8} {'ingestão/s':>12} {'com envio/s':>12} {'enviadas':>9} {'espera p99 ms':>14} {'processa p99 ms':>16}")
+    try:
+        for workers in WORKERS:
+            run(workers)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# benchmarks/bench_static_replies.py
+"""
+Custo de montar o corpo do sendMessage das respostas fixas: dict + teclado
++ json.dumps a cada envio (como era) x bytes prontos do registro.
+
+Uso (de dentro de backend/):
+    python -m benchmarks.bench_static_replies
+"""
+import json
+import timeit
+
+from telegram.services.static_replies import get_static_reply
+
+LOOPS = 200_000
+
+
+def legacy_start_body(chat_id: int) -> bytes:
+    """Como o /start era montado a cada chamada (o requests faz o json.dumps)."""
+    reply_markup = {
+        "inline_keyboard": [
+            [
+                {"text": "💄 Rosto", "callback_data": "cat:face"},
+                {"text": "👁️ Olhos", "callback_data": "cat:eyes"},
+            ],
+            [
+                {"text": "💋 Lábios", "callback_data": "cat:lips"},
+                {"text": "🧴 Skincare", "callback_data": "cat:skincare"},
+            ],
+            [
+                {"text": "🛍️ Tudo", "callback_data": "cat:all"},
+            ],
+        ]
+    }
+    text = get_static_reply("start").text
+    payload = {"chat_id": chat_id, "text": text, "reply_markup": reply_markup}
+    return json.dumps(payload).encode("utf-8")
+
+
+def main() -> None:
+    reply = get_static_reply("start")
+    legacy = timeit.timeit(lambda: legacy_start_body(123456789), number=LOOPS) / LOOPS * 1e6
+    prebuilt = timeit.timeit(lambda: reply.payload_for(123456789), number=LOOPS) / LOOPS * 1e6
+
+    print(f"{'':>10} {'µs/envio':>9} {'bytes':>6}")
+    print(f"{'montado':>10} {legacy:>9.2f} {len(legacy_start_body(123456789)):>6}")
+    print(f"{'pronto':>10} {prebuilt:>9.2f} {len(reply.payload_for(123456789)):>6}")
+
+
+if __name__ == "__main__":
+    main()
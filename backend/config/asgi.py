@@ -3,6 +3,10 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+As views de busca (`prices.views.search_prices` e `telegram.views.telegram_webhook`)
+são async; rodando por aqui (uvicorn) um único event loop segura várias chamadas
+às APIs das lojas ao mesmo tempo.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
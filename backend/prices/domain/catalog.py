@@ -1,5 +1,8 @@
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence
+
+from prices.domain.keyword_index import KeywordTrie
+from prices.domain.text import normalize_text, tokenize
 
 
 @dataclass
@@ -82,35 +85,69 @@ FAMILIES: List[ProductFamily] = [
 ]
 
 
-def classify_query(query: str) -> QueryProfile:
-    q_lower = query.lower()
-    tokens = q_lower.split()
-
-    best_match: Optional[ProductFamily] = None
-    best_score = 0
-
-    for fam in FAMILIES:
-        score = 0
-        for kw in fam.keywords:
-            if kw in q_lower:
-                score += 1
-        if score > best_score:
-            best_score = score
-            best_match = fam
-
-    if best_match is None:
+class FamilyIndex:
+    """
+    Índice das keywords de todas as famílias, montado uma vez.
+
+    Mesma regra do loop antigo: o score de uma família é quantas keywords
+    dela aparecem na query (substring), e no empate fica a que vem antes na
+    lista. Query e keywords passam pelo mesmo `normalize_text`, então
+    acento e pontuação não atrapalham ("playstation®5" == "playstation 5").
+    Só que a query é varrida uma vez no trie, em vez de testar cada keyword
+    de cada família.
+    """
+
+    def __init__(self, families: Sequence[ProductFamily]) -> None:
+        self.families = list(families)
+        self._trie = KeywordTrie()
+        # id da keyword no trie -> índices das famílias que a usam
+        self._keyword_families: Dict[int, List[int]] = {}
+        keyword_ids: Dict[str, int] = {}
+
+        for fam_index, fam in enumerate(self.families):
+            for kw in dict.fromkeys(normalize_text(kw) for kw in fam.keywords):
+                if not kw:
+                    continue
+                keyword_id = keyword_ids.get(kw)
+                if keyword_id is None:
+                    keyword_id = keyword_ids[kw] = self._trie.add(kw)
+                self._keyword_families.setdefault(keyword_id, []).append(fam_index)
+
+    def best_family(self, q_norm: str) -> Optional[ProductFamily]:
+        scores: Dict[int, int] = {}
+        for keyword_id in self._trie.matches(q_norm):
+            for fam_index in self._keyword_families[keyword_id]:
+                scores[fam_index] = scores.get(fam_index, 0) + 1
+
+        if not scores:
+            return None
+        best_index = min(scores, key=lambda index: (-scores[index], index))
+        return self.families[best_index]
+
+    def classify(self, query: str) -> QueryProfile:
+        tokens = list(tokenize(query))
+        best_match = self.best_family(normalize_text(query))
+
+        if best_match is None:
+            return QueryProfile(
+                category=None,
+                brand=None,
+                family_slug=None,
+                raw_query=query,
+                tokens=tokens,
+            )
+
         return QueryProfile(
-            category=None,
-            brand=None,
-            family_slug=None,
+            category=best_match.category,
+            brand=best_match.brand,
+            family_slug=best_match.slug,
             raw_query=query,
             tokens=tokens,
         )
 
-    return QueryProfile(
-        category=best_match.category,
-        brand=best_match.brand,
-        family_slug=best_match.slug,
-        raw_query=query,
-        tokens=tokens,
-    )
+
+_family_index = FamilyIndex(FAMILIES)
+
+
+def classify_query(query: str) -> QueryProfile:
+    return _family_index.classify(query)
@@ -0,0 +1,51 @@
+# prices/domain/keyword_index.py
+"""
+Trie de keywords para achar, numa query, todas as keywords que aparecem
+nela como substring (mesma regra do `kw in query` de antes).
+
+A busca anda no trie a partir de cada posição da query, então o custo
+depende do tamanho da query (e da maior keyword), não de quantas keywords
+ou famílias existem no catálogo.
+"""
+from typing import Dict, Iterable, Iterator, List, Set
+
+# chave reservada no nó: ids das keywords que terminam ali
+_END = "\0"
+
+
+class KeywordTrie:
+    def __init__(self, keywords: Iterable[str] = ()) -> None:
+        self._root: Dict[str, dict] = {}
+        self.keywords: List[str] = []
+        for keyword in keywords:
+            self.add(keyword)
+
+    def add(self, keyword: str) -> int:
+        """Adiciona a keyword e devolve o id dela (posição em `self.keywords`)."""
+        keyword_id = len(self.keywords)
+        self.keywords.append(keyword)
+
+        node = self._root
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node.setdefault(_END, []).append(keyword_id)
+        return keyword_id
+
+    def iter_matches(self, text: str) -> Iterator[int]:
+        """Ids das keywords encontradas em `text` (pode repetir)."""
+        root = self._root
+        for start in range(len(text)):
+            node = root
+            for ch in text[start:]:
+                node = node.get(ch)
+                if node is None:
+                    break
+                ids = node.get(_END)
+                if ids:
+                    yield from ids
+
+    def matches(self, text: str) -> Set[int]:
+        return set(self.iter_matches(text))
+
+    def contains_any(self, text: str) -> bool:
+        return next(self.iter_matches(text), None) is not None
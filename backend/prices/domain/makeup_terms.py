@@ -1,3 +1,6 @@
+from prices.domain.keyword_index import KeywordTrie
+from prices.domain.text import normalize_text, tokenize
+
 MAKEUP_KEYWORDS = [
     "gloss", "batom", "lip", "liphoney", "lipstick",
     "base", "corretivo", "pó", "primer",
@@ -7,6 +10,17 @@ MAKEUP_KEYWORDS = [
     "vult", "nina secrets", "mac", "nars", "dior", "maybelline",
 ]
 
+# keyword com até isso de letras só vale como palavra inteira: sem acento,
+# "pó" vira "po", e como substring casaria com "copo", "tempo", "corpo"...
+SHORT_KEYWORD_LEN = 3
+
+# sem acento, igual às queries: "pó" e "po" casam do mesmo jeito
+_NORMALIZED_KEYWORDS = [normalize_text(word) for word in MAKEUP_KEYWORDS]
+_SHORT_KEYWORDS = frozenset(word for word in _NORMALIZED_KEYWORDS if len(word) <= SHORT_KEYWORD_LEN)
+_MAKEUP_INDEX = KeywordTrie(word for word in _NORMALIZED_KEYWORDS if len(word) > SHORT_KEYWORD_LEN)
+
+
 def is_makeup_query(query: str) -> bool:
-    q = query.lower()
-    return any(word in q for word in MAKEUP_KEYWORDS)
+    if any(token in _SHORT_KEYWORDS for token in tokenize(query)):
+        return True
+    return _MAKEUP_INDEX.contains_any(normalize_text(query))
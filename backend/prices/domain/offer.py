@@ -0,0 +1,38 @@
+# prices/domain/offer.py
+"""
+Oferta de uma loja, do jeito que as fontes devolvem e o agregador consome.
+
+Antes cada oferta era um dict que ia ganhando chaves pelo caminho
+(relevance_score, price_outlier, effective_price...). Agora é um registro
+com `__slots__`: campos fixos, menos memória por oferta e acesso por
+atributo em vez de lookup de chave. Pra API JSON, use `to_dict`.
+"""
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Dict, Optional
+
+
+@dataclass(slots=True, eq=False)
+class Offer:
+    store: str
+    source: str
+    id: Any
+    title: str
+    price: Optional[float]
+    currency: str = "BRL"
+    url: Optional[str] = None
+    thumbnail: Optional[str] = None
+
+    # preenchidos ao longo do pipeline (fonte / agregador)
+    relevance_score: float = 0.0
+    relevant: bool = True
+    price_outlier: bool = False
+    store_trust_factor: Optional[float] = None
+    effective_price: Optional[float] = None
+    # quantas ofertas quase iguais (outras fontes/lojas) esta representa
+    alternatives: int = 0
+
+    def copy(self) -> "Offer":
+        return replace(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
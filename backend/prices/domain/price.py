@@ -0,0 +1,88 @@
+# prices/domain/price.py
+"""
+Parser único de preço em reais, usado por todas as fontes.
+
+- número (int/float) passa direto, sem mexer em string;
+- string: uma regex compilada acha o primeiro número ("R$ 10,00 - R$ 20,00"
+  vira 10.0, "agora R$ 59,90" vira 59.9) e o separador decimal é decidido
+  pelo formato: "1.234,56" e "1,234.56" são 1234.56; com um separador só,
+  grupo de 3 dígitos depois dele é milhar ("R$ 1.299" = 1299), senão é
+  decimal ("59,9" = 59.9);
+- strings repetidas (a mesma loja manda o mesmo formato o tempo todo) ficam
+  num memo limitado.
+"""
+import logging
+import math
+import os
+import re
+from functools import lru_cache
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+PRICE_CACHE_SIZE = int(os.environ.get("PRICEBOT_PRICE_CACHE_SIZE", "4096"))
+
+# milhar com grupos de 3 (ponto, vírgula ou espaço, inclusive NBSP) +
+# decimal opcional, ou dígitos corridos com decimal opcional. Número colado
+# num "x" é quantidade de parcelas ("12x R$ 10,00"), não preço.
+_NUMBER_RE = re.compile(
+    r"(?<![\d.,])"
+    r"(?:\d{1,3}(?:[.,\u00a0\u202f ]\d{3})+(?:[.,]\d+)?|\d+(?:[.,]\d+)?)"
+    r"(?![\d]|\s?[xX]\b)"
+)
+_INSTALLMENTS_RE = re.compile(r"(\d+)\s?[xX]\s*(?:de\s*)?(?:R\$\s*)?$")
+_SPACES = str.maketrans("", "", "\u00a0\u202f ")
+
+
+def _to_float(number: str) -> float:
+    if " " in number or "\u00a0" in number or "\u202f" in number:
+        number = number.translate(_SPACES)
+    last_dot = number.rfind(".")
+    last_comma = number.rfind(",")
+
+    if last_dot < 0 and last_comma < 0:
+        return float(number)
+
+    if last_dot >= 0 and last_comma >= 0:
+        # o que aparece por último é o decimal: 1.234,56 / 1,234.56
+        if last_comma > last_dot:
+            return float(number.replace(".", "").replace(",", "."))
+        return float(number.replace(",", ""))
+
+    # um separador só: grupo final de 3 dígitos (ou vários separadores) é milhar
+    sep = "." if last_dot >= 0 else ","
+    last = last_dot if last_dot >= 0 else last_comma
+    if len(number) - last == 4 or number.count(sep) > 1:
+        return float(number.replace(sep, ""))
+    return float(number.replace(",", ".")) if sep == "," else float(number)
+
+
+@lru_cache(maxsize=PRICE_CACHE_SIZE)
+def _parse_text(text: str) -> Optional[float]:
+    match = _NUMBER_RE.search(text)
+    if match is None:
+        logger.warning("Não consegui converter preço: %r", text)
+        return None
+
+    value = _to_float(match.group(0))
+    # "12x R$ 10,00": o preço é o total das parcelas
+    if "x" in text or "X" in text:
+        installments = _INSTALLMENTS_RE.search(text, 0, match.start())
+        if installments is not None:
+            value *= int(installments.group(1))
+    return value
+
+
+def parse_price(raw: Any) -> Optional[float]:
+    """Preço em float, ou None se não der pra entender."""
+    if raw is None or isinstance(raw, bool):
+        return None
+    if isinstance(raw, (int, float)):
+        value = float(raw)
+        return value if math.isfinite(value) and value >= 0 else None
+    if not isinstance(raw, str):
+        raw = str(raw)
+    raw = raw.strip()
+    if not raw:
+        return None
+    return _parse_text(raw)
@@ -0,0 +1,144 @@
+# prices/domain/store_trust.py
+"""
+Fator de confiança por loja (<= 1.0), usado pra "baratear" um pouco o preço
+de lojas grandes na comparação.
+
+A tabela vira uma regex única, compilada uma vez, e o fator de cada nome de
+loja fica num memo limitado, já que as mesmas lojas aparecem em toda busca.
+
+A tabela pode vir de um JSON ({"loja": fator, ...}) apontado por
+PRICEBOT_TRUSTED_STORES_FILE; o arquivo é relido quando muda.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+TRUSTED_STORES_FILE = os.environ.get("PRICEBOT_TRUSTED_STORES_FILE", "")
+# de quanto em quanto tempo (s) olhar se o arquivo mudou
+TRUSTED_STORES_RELOAD = float(os.environ.get("PRICEBOT_TRUSTED_STORES_RELOAD", "30"))
+STORE_FACTOR_MEMO_SIZE = int(os.environ.get("PRICEBOT_STORE_FACTOR_MEMO_SIZE", "4096"))
+
+# Lojas mais conhecidas para maquiagem / beleza
+DEFAULT_TRUSTED_STORES: Dict[str, float] = {
+    "sephora": 0.9,
+    "panvel": 0.9,
+    "droga raia": 0.9,
+    "drogaria raia": 0.9,
+    "drogasil": 0.9,
+    "epoca cosmeticos": 0.9,
+    "época cosmeticos": 0.9,
+    "epoca cosméticos": 0.9,
+    "magazine luiza": 0.9,
+    "magalu": 0.9,
+    "amazon": 0.9,
+    "renner": 0.9,
+    "cea": 0.9,
+    "c&a": 0.9,
+    "casas bahia": 0.9,
+    "l'occitane": 0.9,
+    "boticario": 0.9,
+    "o boticário": 0.9,
+}
+
+
+class StoreTrustMatcher:
+    """
+    Mesma regra do loop antigo: vale a primeira chave da tabela (na ordem)
+    que aparece em qualquer lugar do nome; sem chave, fator 1.0.
+    """
+
+    def __init__(self, table: Dict[str, float]) -> None:
+        self.table = {key.lower(): factor for key, factor in table.items()}
+        self._keys = list(self.table)
+        self._order = {key: index for index, key in enumerate(self._keys)}
+        # lookahead: em cada posição casa a chave de menor índice que começa
+        # ali, sem consumir texto (então chaves sobrepostas também aparecem)
+        if self.table:
+            alternation = "|".join(re.escape(key) for key in self.table)
+            self._pattern: Optional[re.Pattern] = re.compile(f"(?=({alternation}))")
+        else:
+            self._pattern = None
+        self.factor = lru_cache(maxsize=STORE_FACTOR_MEMO_SIZE)(self._factor)
+
+    def _factor(self, store_name: str) -> float:
+        if self._pattern is None:
+            return 1.0
+
+        name = (store_name or "").lower()
+        best_index = None
+        for match in self._pattern.finditer(name):
+            index = self._order[match.group(1)]
+            if best_index is None or index < best_index:
+                best_index = index
+                if index == 0:
+                    break
+
+        if best_index is None:
+            return 1.0  # loja desconhecida: sem desconto
+        return self.table[self._keys[best_index]]
+
+
+def load_trust_table(path: str = TRUSTED_STORES_FILE) -> Dict[str, float]:
+    if not path:
+        return dict(DEFAULT_TRUSTED_STORES)
+
+    try:
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        return {str(key): float(factor) for key, factor in data.items()}
+    except (OSError, ValueError, AttributeError):
+        logger.exception("Erro ao ler tabela de lojas em %s; usando a padrão", path)
+        return dict(DEFAULT_TRUSTED_STORES)
+
+
+_matcher: Optional[StoreTrustMatcher] = None
+_matcher_mtime: Optional[float] = None
+_matcher_checked_at = 0.0
+_matcher_lock = threading.Lock()
+
+
+def _file_mtime() -> Optional[float]:
+    if not TRUSTED_STORES_FILE:
+        return None
+    try:
+        return os.path.getmtime(TRUSTED_STORES_FILE)
+    except OSError:
+        return None
+
+
+def get_store_matcher() -> StoreTrustMatcher:
+    """Matcher atual; recompila se o arquivo de configuração mudou."""
+    global _matcher, _matcher_mtime, _matcher_checked_at
+
+    now = time.monotonic()
+    if _matcher is not None and now - _matcher_checked_at < TRUSTED_STORES_RELOAD:
+        return _matcher
+
+    with _matcher_lock:
+        _matcher_checked_at = now
+        mtime = _file_mtime()
+        if _matcher is None or mtime != _matcher_mtime:
+            if _matcher is not None:
+                logger.info("Tabela de lojas confiáveis mudou; recompilando")
+            _matcher = StoreTrustMatcher(load_trust_table())
+            _matcher_mtime = mtime
+    return _matcher
+
+
+def set_trust_table(table: Dict[str, float]) -> None:
+    """Troca a tabela em tempo de execução (recompila e zera o memo)."""
+    global _matcher
+
+    with _matcher_lock:
+        _matcher = StoreTrustMatcher(table)
+
+
+def store_factor(store_name: str) -> float:
+    return get_store_matcher().factor(store_name or "")
@@ -0,0 +1,56 @@
+# prices/domain/text.py
+"""
+Normalização de texto única pra queries, títulos e keywords.
+
+`normalize_text` deixa tudo minúsculo, tira acentos ("pó" -> "po"), troca
+pontuação por espaço e junta espaços repetidos. Como os mesmos títulos e
+queries passam por aqui várias vezes na mesma busca (fonte, classificação,
+relevância), o resultado fica num memo limitado: cada texto é normalizado
+de fato uma vez só.
+"""
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Tuple
+
+TEXT_CACHE_SIZE = int(os.environ.get("PRICEBOT_TEXT_CACHE_SIZE", "8192"))
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def fold_accents(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def normalize_text_uncached(text: str) -> str:
+    """Mesma normalização, fora do memo (pra indexar catálogos grandes de uma vez)."""
+    text = fold_accents((text or "").lower())
+    text = _PUNCT_RE.sub(" ", text)
+    return _SPACES_RE.sub(" ", text).strip()
+
+
+_normalize = lru_cache(maxsize=TEXT_CACHE_SIZE)(normalize_text_uncached)
+
+
+def normalize_text(text: str) -> str:
+    return _normalize(text or "")
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def _tokenize(text: str) -> Tuple[str, ...]:
+    return tuple(_normalize(text).split())
+
+
+def tokenize(text: str) -> Tuple[str, ...]:
+    """Tokens da versão normalizada (tupla, pra poder ficar no memo)."""
+    return _tokenize(text or "")
+
+
+def cache_stats() -> dict:
+    return {
+        "normalize": _normalize.cache_info()._asdict(),
+        "tokenize": _tokenize.cache_info()._asdict(),
+    }
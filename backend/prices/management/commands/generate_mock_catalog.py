@@ -0,0 +1,27 @@
+# prices/management/commands/generate_mock_catalog.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from prices.mock_data.synthetic import generate_products, write_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera um catálogo sintético de maquiagem (JSON lines) para teste de carga; "
+        "use com PRICEBOT_MOCK_CATALOG=<arquivo> e PRICEBOT_MOCK_SOURCE=True"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=100_000, help="nº de produtos (padrão 100000)")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", default="mock_catalog.jsonl")
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        count = write_catalog(options["output"], generate_products(options["size"], options["seed"]))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{count} produtos gravados em {options['output']} ({time.monotonic() - start:.1f}s)"
+            )
+        )
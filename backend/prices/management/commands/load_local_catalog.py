@@ -0,0 +1,63 @@
+# prices/management/commands/load_local_catalog.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from prices.price_sources.local_catalog import LOCAL_CATALOG_PATH, LocalCatalog, iter_dump_offers
+
+
+class Command(BaseCommand):
+    help = (
+        "Carrega ofertas no catálogo local (SQLite FTS5): dumps JSON da API de busca, "
+        "listas de ofertas ou JSON lines, e/ou o resultado de buscas feitas agora (--query)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("dumps", nargs="*", help="arquivos .json/.jsonl")
+        parser.add_argument(
+            "--query",
+            action="append",
+            default=[],
+            help="roda search_all e grava as ofertas (pode repetir)",
+        )
+        parser.add_argument(
+            "--db",
+            default=LOCAL_CATALOG_PATH,
+            help="arquivo SQLite (padrão: PRICEBOT_LOCAL_CATALOG)",
+        )
+        parser.add_argument("--batch", type=int, default=10_000, help="ofertas por transação")
+
+    def handle(self, *args, **options):
+        if not options["db"]:
+            raise CommandError("Informe --db ou defina PRICEBOT_LOCAL_CATALOG")
+        if not options["dumps"] and not options["query"]:
+            raise CommandError("Nada para carregar: passe arquivos e/ou --query")
+
+        catalog = LocalCatalog(options["db"])
+        start = time.monotonic()
+        total = 0
+
+        for path in options["dumps"]:
+            batch = []
+            for offer in iter_dump_offers(path):
+                batch.append(offer)
+                if len(batch) >= options["batch"]:
+                    total += catalog.ingest(batch)
+                    batch = []
+            total += catalog.ingest(batch)
+
+        if options["query"]:
+            # import aqui: o agregador abre o catálogo do env, que pode nem existir
+            from prices.services.price_agregator import PriceAggregator
+
+            aggregator = PriceAggregator()
+            for query in options["query"]:
+                result = aggregator.search_all(query)
+                total += catalog.ingest(result["results"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} ofertas gravadas em {options['db']} "
+                f"({catalog.count()} no catálogo, {time.monotonic() - start:.1f}s)"
+            )
+        )
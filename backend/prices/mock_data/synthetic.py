@@ -0,0 +1,80 @@
+# prices/mock_data/synthetic.py
+"""
+Catálogo sintético de maquiagem a partir de MOCK_MAKEUP_PRODUCTS, pra teste
+de carga offline (100k–1M produtos, sem chave de nenhuma API).
+
+Cada produto base vira variações com marca, cor, acabamento, tamanho, loja e
+preço diferentes. O catálogo é gravado em JSON lines, um produto por linha,
+no mesmo formato dos dicts de MOCK_MAKEUP_PRODUCTS.
+"""
+import json
+import random
+import re
+from typing import Any, Dict, Iterable, Iterator
+
+from prices.mock_data.makeup_products import MOCK_MAKEUP_PRODUCTS
+
+BRANDS = [
+    "Ruby Rose", "Vult", "Bruna Tavares", "Franciny Ehlke", "Maybelline",
+    "Nina Secrets", "MAC", "NARS", "Dior", "Eudora", "Quem Disse Berenice",
+    "Boca Rosa", "Dailus", "Océane", "Mari Maria", "Payot",
+]
+SHADES = [
+    "vermelho", "nude", "rosa", "marrom", "vinho", "coral", "bege claro",
+    "bege médio", "bege escuro", "chocolate", "transparente", "preto",
+    "dourado", "bronze", "pêssego", "lilás",
+]
+FINISHES = ["matte", "cremoso", "glow", "acetinado", "metálico", "longa duração", "à prova d'água"]
+SIZES = ["3,5g", "4g", "5ml", "10ml", "30ml", "6g", "12 cores", "kit 2 unidades"]
+STORES = [
+    "Sephora", "Época Cosméticos", "Drogasil", "Droga Raia", "Amazon",
+    "Magalu", "Beleza na Web", "Loja Mock Make 1", "Loja Mock Make 2",
+    "Loja Mock Make 3", "O Boticário", "Panvel",
+]
+
+# "Batom vermelho matte longa duração - Marca Y" -> "Batom vermelho matte longa duração"
+_BRAND_SUFFIX_RE = re.compile(r"\s*-\s*Marca \w+$")
+
+
+def generate_products(size: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    bases = [
+        (_BRAND_SUFFIX_RE.sub("", p["title"]), p) for p in MOCK_MAKEUP_PRODUCTS
+    ]
+
+    for i in range(size):
+        base_title, base = bases[i % len(bases)]
+        brand = rng.choice(BRANDS)
+        title = " ".join(
+            [base_title, rng.choice(SHADES), rng.choice(FINISHES), rng.choice(SIZES)]
+        ) + f" - {brand}"
+        price = round(float(base["price"]) * rng.uniform(0.6, 1.8), 2)
+
+        yield {
+            "store": rng.choice(STORES),
+            "source": "mock_makeup",
+            "id": f"SYN-{i:07d}",
+            "category": base.get("category"),
+            "title": title,
+            "price": price,
+            "currency": "BRL",
+            "url": f"https://exemplo.com/produto/syn-{i:07d}",
+            "thumbnail": base.get("thumbnail"),
+        }
+
+
+def write_catalog(path: str, products: Iterable[Dict[str, Any]]) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as fh:
+        for product in products:
+            fh.write(json.dumps(product, ensure_ascii=False))
+            fh.write("\n")
+            count += 1
+    return count
+
+
+def read_catalog(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
@@ -1,12 +1,16 @@
 # prices/price_sources/amazon_rapidapi.py
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
 import os
 import urllib.parse
 
+import httpx
 import requests
 
-from prices.price_sources.base import BasePriceSource
+from prices.domain.offer import Offer
+from prices.domain.price import parse_price
+from prices.price_sources.base import BasePriceSource, SourceUnavailable
+from prices.services.http_client import get_async_client, get_paid_session
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +18,16 @@ logger = logging.getLogger(__name__)
 class AmazonRapidAPISource(BasePriceSource):
     name = "Amazon (via RapidAPI)"
     BASE_URL = "https://real-time-amazon-data.p.rapidapi.com/search"
+    cache_ttl = 600.0
+    cache_stale_grace = 1200.0
+    # RapidAPI devolve 429 em rajada: segura as chamadas na fila em vez de estourar
+    rate_limit = float(os.environ.get("RAPIDAPI_RATE_LIMIT", "1"))
+    rate_burst = 2
+    daily_budget = int(os.environ.get("RAPIDAPI_DAILY_BUDGET", "0"))
+    monthly_budget = int(os.environ.get("RAPIDAPI_MONTHLY_BUDGET", "0"))
+    budget_policy = "queue"
+    # cauda longa (a maioria volta em ~1s, algumas penduram até o timeout)
+    hedge = os.environ.get("RAPIDAPI_HEDGE", "True") == "True"
 
     def __init__(self) -> None:
         super().__init__()
@@ -28,9 +42,9 @@ class AmazonRapidAPISource(BasePriceSource):
                 "essa fonte não irá retornar resultados."
             )
 
-    def search(self, query: str) -> List[Dict[str, Any]]:
+    def _request_kwargs(self, query: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
         if not self.rapidapi_key:
-            return []
+            return None
 
         q_clean = urllib.parse.unquote_plus(query)
 
@@ -50,17 +64,13 @@ class AmazonRapidAPISource(BasePriceSource):
             "x-rapidapi-host": self.rapidapi_host,
         }
 
-        try:
-            resp = requests.get(
-                self.BASE_URL,
-                params=params,
-                headers=headers,
-                timeout=15,
-            )
-        except requests.RequestException as e:
-            logger.exception("[AmazonRapidAPISource] Erro de rede: %s", e)
-            return []
+        return {"params": params, "headers": headers, "timeout": self.request_timeout(timeout)}
 
+    def _parse_response(self, query: str, resp) -> List[Offer]:
+        """
+        Interpreta a resposta HTTP (requests ou httpx, ambos têm a mesma
+        interface de status_code/url/text/json).
+        """
         logger.info(
             "[AmazonRapidAPISource] HTTP %s - URL final: %s",
             resp.status_code,
@@ -73,8 +83,9 @@ class AmazonRapidAPISource(BasePriceSource):
                 resp.status_code,
                 resp.text,
             )
-            return []
+            raise SourceUnavailable.from_response(resp)
 
+        q_clean = urllib.parse.unquote_plus(query)
         data = resp.json()
 
         products = data.get("data", {}).get("products") or []
@@ -84,7 +95,7 @@ class AmazonRapidAPISource(BasePriceSource):
             len(products),
         )
 
-        results: List[Dict[str, Any]] = []
+        results: List[Offer] = []
 
         for p in products:
             title = p.get("product_title") or q_clean
@@ -93,56 +104,45 @@ class AmazonRapidAPISource(BasePriceSource):
             price_str = p.get("product_price")
             currency = p.get("currency") or "BRL"
 
-            price_value = _parse_price(price_str)
+            price_value = parse_price(price_str)
             if price_value is None:
                 continue
 
             results.append(
-                {
-                    "store": self.name,
-                    "source": "amazon_rapidapi",
-                    "id": p.get("asin") or p.get("product_id"),
-                    "title": title,
-                    "price": price_value,
-                    "currency": currency,
-                    "url": url,
-                    "thumbnail": thumb,
-                }
+                Offer(
+                    store=self.name,
+                    source="amazon_rapidapi",
+                    id=p.get("asin") or p.get("product_id"),
+                    title=title,
+                    price=price_value,
+                    currency=currency,
+                    url=url,
+                    thumbnail=thumb,
+                )
             )
 
         return results
-    
-
 
+    def search(self, query: str, timeout: Optional[float] = None) -> List[Offer]:
+        kwargs = self._request_kwargs(query, timeout)
+        if kwargs is None:
+            return []
 
-def _parse_price(price_str: Any) -> float | None:
-    if not price_str:
-        return None
-
-    s = str(price_str)
-
-    # remove NBSP e outros espaços "estranhos"
-    s = s.replace("\u00a0", " ")
+        try:
+            resp = get_paid_session().get(self.BASE_URL, **kwargs)
+        except requests.RequestException as e:
+            raise SourceUnavailable(f"Erro de rede: {e}") from e
 
-    s = s.strip()
+        return self._parse_response(query, resp)
 
-    # remove símbolos de moeda
-    for ch in ["R$", "US$", "$", "€"]:
-        s = s.replace(ch, "")
-    s = s.strip()
+    async def asearch(self, query: str, timeout: Optional[float] = None) -> List[Offer]:
+        kwargs = self._request_kwargs(query, timeout)
+        if kwargs is None:
+            return []
 
-    s = s.replace(" ", "")
+        try:
+            resp = await get_async_client().get(self.BASE_URL, **kwargs)
+        except httpx.HTTPError as e:
+            raise SourceUnavailable(f"Erro de rede: {e}") from e
 
-    try:
-        # casos BR: 1.234,56  -> 1234.56
-        if "," in s and "." in s:
-            s_norm = s.replace(".", "").replace(",", ".")
-            return float(s_norm)
-        # casos tipo 1234,56
-        if "," in s and "." not in s:
-            s_norm = s.replace(",", ".")
-            return float(s_norm)
-        # casos tipo 1234.56
-        return float(s)
-    except ValueError:
-        logger.warning("[AmazonRapidAPISource] Falha ao parsear preço: %r", price_str)
+        return self._parse_response(query, resp)
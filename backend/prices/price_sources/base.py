@@ -1,23 +1,84 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import List, Optional
+
+from prices.domain.offer import Offer
+from prices.domain.price import parse_price
+
+
+class SourceUnavailable(Exception):
+    """
+    A fonte não conseguiu responder (erro de rede, HTTP != 200, JSON inválido).
+    Diferente de devolver [], que significa "respondeu, mas não achou nada".
+    """
+
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_response(cls, resp) -> "SourceUnavailable":
+        """Erro a partir de uma resposta HTTP != 200 (requests ou httpx)."""
+        try:
+            retry_after = float(resp.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            retry_after = None
+        return cls(
+            f"HTTP {resp.status_code}",
+            status_code=resp.status_code,
+            retry_after=retry_after,
+        )
 
 
 class BasePriceSource(ABC):
     name: str
+    # timeout HTTP de cada chamada à API da fonte (segundos)
+    timeout: float = 15.0
+    # prazo máximo que o agregador espera por essa fonte; None => usa `timeout`
+    deadline: Optional[float] = None
+    # cache da lista normalizada por query (0 => sem cache) e janela em que
+    # uma entrada vencida ainda é servida enquanto atualiza em background
+    cache_ttl: float = 0.0
+    cache_stale_grace: float = 0.0
+    # rate limit (chamadas/s, 0 => sem limite), créditos por dia/mês (0 => sem
+    # limite) e o que fazer sem token/crédito: "queue", "skip" ou "stale"
+    rate_limit: float = 0.0
+    rate_burst: int = 1
+    daily_budget: int = 0
+    monthly_budget: int = 0
+    budget_policy: str = "skip"
+    # dispara uma segunda chamada se a primeira passar do p90 da fonte
+    hedge: bool = False
 
     @abstractmethod
-    def search(self, query: str) -> List[Dict]:
+    def search(self, query: str, timeout: Optional[float] = None) -> List[Offer]:
+        """`timeout`: quanto o agregador ainda espera (s); encurta o timeout HTTP."""
         raise NotImplementedError
 
+    async def asearch(self, query: str, timeout: Optional[float] = None) -> List[Offer]:
+        """
+        Versão assíncrona da busca. Fontes com HTTP sobrescrevem com um cliente
+        async nativo; as locais (mocks) só rodam o `search` numa thread.
+        """
+        return await asyncio.to_thread(self.search, query, timeout)
+
+    def request_timeout(self, timeout: Optional[float]) -> float:
+        """
+        Timeout HTTP da chamada: o da fonte, nunca além do prazo do agregador
+        (senão a thread do pool fica presa numa fonte que ninguém espera mais).
+        """
+        return self.timeout if timeout is None else min(self.timeout, timeout)
+
 
 def parse_brl_price(raw: str) -> float:
-    if raw is None:
-        raise ValueError("Preço vazio")
-
-    cleaned = raw.replace("R$", "")
-    cleaned = cleaned.replace("\xa0", "")  # NBSP
-    cleaned = cleaned.replace(" ", "")
-    cleaned = cleaned.replace(".", "")
-    cleaned = cleaned.strip()
-    cleaned = cleaned.replace(",", ".")
-    return float(cleaned)
+    """Como `parse_price` (prices/domain/price.py), mas sem preço é erro."""
+    price = parse_price(raw)
+    if price is None:
+        raise ValueError(f"Preço inválido: {raw!r}")
+    return price
@@ -1,10 +1,13 @@
 # prices/price_sources/http_store_source.py
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
 import urllib.parse
+import httpx
 import requests
 
-from prices.price_sources.base import BasePriceSource
+from prices.domain.offer import Offer
+from prices.price_sources.base import BasePriceSource, SourceUnavailable
+from prices.services.http_client import get_async_client, get_session
 
 logger = logging.getLogger(__name__)
 
@@ -17,21 +20,16 @@ class HttpStoreSource(BasePriceSource):
 
     name = "Loja HTTP Exemplo"
     SEARCH_URL = "https://dummyjson.com/products/search"
+    timeout = 10.0
 
-    def search(self, query: str) -> List[Dict[str, Any]]:
+    def _params(self, query: str) -> Dict[str, Any]:
         q_clean = urllib.parse.unquote_plus(query)
-
-        params = {
+        return {
             "q": q_clean,
             "limit": 10,
         }
 
-        try:
-            resp = requests.get(self.SEARCH_URL, params=params, timeout=10)
-        except requests.RequestException as e:
-            logger.exception("[%s] erro de rede: %s", self.name, e)
-            return []
-
+    def _parse_response(self, query: str, resp) -> List[Offer]:
         if resp.status_code != 200:
             logger.error(
                 "[%s] erro HTTP %s: %s",
@@ -39,23 +37,44 @@ class HttpStoreSource(BasePriceSource):
                 resp.status_code,
                 resp.text,
             )
-            return []
+            raise SourceUnavailable.from_response(resp)
 
+        q_clean = urllib.parse.unquote_plus(query)
         data = resp.json()
 
-        results: List[Dict[str, Any]] = []
+        results: List[Offer] = []
         for product in data.get("products", []):  
             results.append(
-                {
-                    "store": self.name,
-                    "source": "http_store_example",
-                    "id": str(product.get("id")),
-                    "title": product.get("title") or q_clean,
-                    "price": float(product.get("price", 0)),
-                    "currency": "BRL",
-                    "url": product.get("url") or "",
-                    "thumbnail": product.get("thumbnail"),
-                }
+                Offer(
+                    store=self.name,
+                    source="http_store_example",
+                    id=str(product.get("id")),
+                    title=product.get("title") or q_clean,
+                    price=float(product.get("price", 0)),
+                    currency="BRL",
+                    url=product.get("url") or "",
+                    thumbnail=product.get("thumbnail"),
+                )
             )
 
         return results
+
+    def search(self, query: str, timeout: Optional[float] = None) -> List[Offer]:
+        try:
+            resp = get_session().get(
+                self.SEARCH_URL, params=self._params(query), timeout=self.request_timeout(timeout)
+            )
+        except requests.RequestException as e:
+            raise SourceUnavailable(f"erro de rede: {e}") from e
+
+        return self._parse_response(query, resp)
+
+    async def asearch(self, query: str, timeout: Optional[float] = None) -> List[Offer]:
+        try:
+            resp = await get_async_client().get(
+                self.SEARCH_URL, params=self._params(query), timeout=self.request_timeout(timeout)
+            )
+        except httpx.HTTPError as e:
+            raise SourceUnavailable(f"erro de rede: {e}") from e
+
+        return self._parse_response(query, resp)
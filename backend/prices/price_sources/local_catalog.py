@@ -0,0 +1,285 @@
+# prices/price_sources/local_catalog.py
+"""
+Catálogo local de ofertas em SQLite com índice FTS5 (ranking BM25).
+
+Serve de primeira camada, de graça e offline: o agregador pergunta aqui
+antes e só vai às APIs pagas quando o catálogo tem pouca coisa fresca pra
+query. As ofertas que voltam das APIs são gravadas de volta, e dá pra
+carregar dumps em lote com `manage.py load_local_catalog`.
+
+Liga com PRICEBOT_LOCAL_CATALOG=<arquivo .sqlite3>.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from prices.domain.offer import Offer
+from prices.domain.text import normalize_text_uncached, tokenize
+from prices.price_sources.base import BasePriceSource
+
+logger = logging.getLogger(__name__)
+
+LOCAL_CATALOG_PATH = os.environ.get("PRICEBOT_LOCAL_CATALOG", "")
+# oferta mais velha que isso (s) não conta como resultado local
+LOCAL_CATALOG_MAX_AGE = float(os.environ.get("PRICEBOT_LOCAL_CATALOG_MAX_AGE", "86400"))
+LOCAL_CATALOG_LIMIT = int(os.environ.get("PRICEBOT_LOCAL_CATALOG_LIMIT", "50"))
+# com pelo menos isso de ofertas frescas no catálogo (com todos os termos da
+# query no título), o agregador nem chama as APIs
+LOCAL_CATALOG_MIN_RESULTS = int(os.environ.get("PRICEBOT_LOCAL_CATALOG_MIN_RESULTS", "5"))
+# grava no catálogo o que as fontes remotas devolvem
+LOCAL_CATALOG_LEARN = os.environ.get("PRICEBOT_LOCAL_CATALOG_LEARN", "True") == "True"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS offers (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    offer_id TEXT NOT NULL,
+    store TEXT NOT NULL,
+    title TEXT NOT NULL,
+    price REAL NOT NULL,
+    currency TEXT NOT NULL,
+    url TEXT,
+    thumbnail TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS offers_fts USING fts5(
+    title,
+    content='offers',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS offers_ai AFTER INSERT ON offers BEGIN
+    INSERT INTO offers_fts(rowid, title) VALUES (new.id, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS offers_ad AFTER DELETE ON offers BEGIN
+    INSERT INTO offers_fts(offers_fts, rowid, title) VALUES ('delete', old.id, old.title);
+END;
+CREATE TRIGGER IF NOT EXISTS offers_au AFTER UPDATE OF title ON offers BEGIN
+    INSERT INTO offers_fts(offers_fts, rowid, title) VALUES ('delete', old.id, old.title);
+    INSERT INTO offers_fts(rowid, title) VALUES (new.id, new.title);
+END;
+"""
+
+_UPSERT = """
+INSERT INTO offers (key, source, offer_id, store, title, price, currency, url, thumbnail, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    source = excluded.source,
+    offer_id = excluded.offer_id,
+    store = excluded.store,
+    title = excluded.title,
+    price = excluded.price,
+    currency = excluded.currency,
+    url = excluded.url,
+    thumbnail = excluded.thumbnail,
+    updated_at = excluded.updated_at
+"""
+
+_SEARCH = """
+SELECT o.source, o.offer_id, o.store, o.title, o.price, o.currency, o.url, o.thumbnail
+FROM offers_fts
+JOIN offers o ON o.id = offers_fts.rowid
+WHERE offers_fts MATCH ? AND o.updated_at >= ?
+ORDER BY bm25(offers_fts)
+LIMIT ?
+"""
+
+
+def _fts_query(query: str, operator: str) -> Optional[str]:
+    # cada token vira prefixo entre aspas ("batom"*), sem sintaxe FTS vinda do usuário
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    return f" {operator} ".join(f'"{token}"*' for token in tokens)
+
+
+def _canonical_url(url: str) -> str:
+    # mesmo produto com e sem utm_*/âncora, host em caixa diferente, barra no fim
+    parts = urlsplit(url.strip())
+    params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not k.startswith("utm_")]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(params), ""))
+
+
+def _offer_key(data: Dict[str, Any], store: str, title: str) -> str:
+    """
+    Chave de uma oferta no catálogo: a URL canônica, ou loja + título
+    normalizado sem URL. O `id` das fontes não serve: no Serper ele cai na
+    posição do resultado ("1", "2"…) e repete entre buscas diferentes.
+    """
+    url = data.get("url")
+    if url:
+        return _canonical_url(url)
+    return f"{normalize_text_uncached(store)}|{normalize_text_uncached(title)}"
+
+
+def _offer_row(offer: Union[Offer, Dict[str, Any]], now: float) -> Optional[tuple]:
+    # aceita Offer (resultado do agregador) ou dict (dump JSON)
+    data = offer if isinstance(offer, dict) else offer.to_dict()
+    price = data.get("price")
+    title = data.get("title")
+    if not isinstance(price, (int, float)) or not title:
+        return None
+    store = data.get("store") or "Loja"
+    return (
+        _offer_key(data, store, title),
+        data.get("source") or "local",
+        str(data.get("id") or data.get("url") or title),
+        store,
+        title,
+        float(price),
+        data.get("currency") or "BRL",
+        data.get("url"),
+        data.get("thumbnail"),
+        now,
+    )
+
+
+class LocalCatalog:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # conexão sqlite não deve ser dividida entre threads: uma por thread
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def search(
+        self,
+        query: str,
+        limit: int = LOCAL_CATALOG_LIMIT,
+        max_age: float = LOCAL_CATALOG_MAX_AGE,
+        require_all: bool = False,
+    ) -> List[Offer]:
+        """
+        Ofertas frescas para a query, das mais relevantes (BM25) pras menos.
+        Com `require_all`, só as que têm todos os termos no título; sem, se
+        nenhuma tiver, vale qualquer termo.
+        """
+        conn = self._connect()
+        oldest = time.time() - max_age
+
+        rows: List[tuple] = []
+        for operator in ("AND",) if require_all else ("AND", "OR"):
+            match = _fts_query(query, operator)
+            if match is None:
+                return []
+            rows = conn.execute(_SEARCH, (match, oldest, limit)).fetchall()
+            if rows:
+                break
+
+        return [
+            Offer(
+                store=store,
+                source=source,
+                id=offer_id,
+                title=title,
+                price=price,
+                currency=currency,
+                url=url,
+                thumbnail=thumbnail,
+            )
+            for source, offer_id, store, title, price, currency, url, thumbnail in rows
+        ]
+
+    def ingest(self, offers: Iterable[Union[Offer, Dict[str, Any]]]) -> int:
+        """Grava (ou atualiza) as ofertas numa transação só; devolve quantas."""
+        now = time.time()
+        rows = []
+        for offer in offers:
+            row = _offer_row(offer, now)
+            if row is not None:
+                rows.append(row)
+
+        conn = self._connect()
+        with conn:
+            conn.executemany(_UPSERT, rows)
+        return len(rows)
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM offers").fetchone()[0]
+
+
+def iter_dump_offers(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Ofertas de um dump: resposta JSON da API de busca ({"results": [...]}),
+    lista de ofertas, ou JSON lines (um produto por linha, como o catálogo
+    sintético).
+    """
+    with open(path, encoding="utf-8") as fh:
+        head = fh.read(1)
+        while head.isspace():
+            head = fh.read(1)
+        fh.seek(0)
+
+        if head == "[":
+            yield from json.load(fh)
+            return
+
+        if path.endswith(".jsonl"):
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        data = json.load(fh)
+        if isinstance(data, dict):
+            yield from data.get("results") or []
+            if data.get("best"):
+                yield data["best"]
+        else:
+            yield from data
+
+
+class LocalCatalogSource(BasePriceSource):
+    """
+    O catálogo como camada do agregador: só entram ofertas com todos os
+    termos da query (o OR solto acharia "batom vermelho" pra "batom nude"
+    e o catálogo pareceria cheio sem ter o produto).
+    """
+
+    name = "Catálogo local"
+    timeout = 1.0
+
+    def __init__(self, catalog: LocalCatalog) -> None:
+        self.catalog = catalog
+
+    def search(self, query: str, timeout: Optional[float] = None) -> List[Offer]:
+        return self.catalog.search(query, require_all=True)
+
+    def ingest(self, offers: Iterable[Union[Offer, Dict[str, Any]]]) -> int:
+        return self.catalog.ingest(offers)
+
+
+_catalog_source: Optional[LocalCatalogSource] = None
+_catalog_lock = threading.Lock()
+
+
+def get_local_catalog_source() -> Optional[LocalCatalogSource]:
+    """Camada local do processo (None se PRICEBOT_LOCAL_CATALOG não estiver definido)."""
+    global _catalog_source
+
+    if not LOCAL_CATALOG_PATH:
+        return None
+    if _catalog_source is None:
+        with _catalog_lock:
+            if _catalog_source is None:
+                catalog = LocalCatalog(LOCAL_CATALOG_PATH)
+                logger.info("Catálogo local %s: %d ofertas", LOCAL_CATALOG_PATH, catalog.count())
+                _catalog_source = LocalCatalogSource(catalog)
+    return _catalog_source
@@ -1,49 +1,156 @@
 # prices/price_sources/makeup_mock.py
-import re
-from typing import List, Dict, Any
+"""
+Fonte local de maquiagem, sem API: busca num catálogo em memória.
 
+O catálogo (MOCK_MAKEUP_PRODUCTS ou um JSON lines gerado com
+`manage.py generate_mock_catalog`, apontado por PRICEBOT_MOCK_CATALOG) é
+indexado uma vez só, na primeira busca: colunas por campo + índice invertido
+token -> linhas. A busca junta as postings dos tokens da query e conta em
+quantas cada produto aparece; quem tem todos os tokens (a interseção) fica
+com score 1.0 e vem primeiro.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from prices.domain.offer import Offer
 from prices.price_sources.base import BasePriceSource
+from prices.domain.text import normalize_text_uncached, tokenize
 from prices.mock_data.makeup_products import MOCK_MAKEUP_PRODUCTS
+from prices.mock_data.synthetic import read_catalog
+
+logger = logging.getLogger(__name__)
+
+MOCK_CATALOG = os.environ.get("PRICEBOT_MOCK_CATALOG", "")
+# num catálogo grande um token comum bate em milhares de produtos
+MOCK_MAX_RESULTS = int(os.environ.get("PRICEBOT_MOCK_MAX_RESULTS", "200"))
+
+
+class CatalogIndex:
+    def __init__(self, products: Iterable[Dict[str, Any]]) -> None:
+        self.stores: List[str] = []
+        self.sources: List[str] = []
+        self.ids: List[Any] = []
+        self.titles: List[str] = []
+        self.currencies: List[str] = []
+        self.urls: List[Optional[str]] = []
+        self.thumbnails: List[Optional[str]] = []
+        prices: List[float] = []
+        postings: Dict[str, List[int]] = {}
+
+        for row, p in enumerate(products):
+            # loja/fonte/moeda se repetem muito: guarda uma cópia só de cada
+            self.stores.append(sys.intern(p["store"]))
+            self.sources.append(sys.intern(p["source"]))
+            self.currencies.append(sys.intern(p.get("currency", "BRL")))
+            self.thumbnails.append(p.get("thumbnail"))
+            self.ids.append(p["id"])
+            self.titles.append(p["title"])
+            self.urls.append(p.get("url"))
+            prices.append(float(p["price"]))
+
+            for token in set(normalize_text_uncached(p["title"]).split()):
+                postings.setdefault(token, []).append(row)
+
+        self.prices = np.array(prices, dtype=float)
+        self._postings = {
+            token: np.array(rows, dtype=np.int32) for token, rows in postings.items()
+        }
+        self._vocab = sorted(self._postings)
+        self.postings_for = lru_cache(maxsize=1024)(self._expand)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def _expand(self, token: str) -> np.ndarray:
+        """Linhas com algum token que começa com `token` ("lip" acha "liphoney")."""
+        start = bisect_left(self._vocab, token)
+        arrays = []
+        for word in self._vocab[start:]:
+            if not word.startswith(token):
+                break
+            arrays.append(self._postings[word])
+
+        if not arrays:
+            return np.zeros(0, dtype=np.int32)
+        if len(arrays) == 1:
+            return arrays[0]
+        return np.unique(np.concatenate(arrays))
+
+    def match(self, tokens: Sequence[str], limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(linhas, nº de tokens que bateram), do mais completo pro menos."""
+        if limit <= 0 or not tokens:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int64)
+
+        arrays = [self.postings_for(token) for token in tokens]
+        if len(arrays) == 1:
+            rows = arrays[0]
+            hits = np.ones(len(rows), dtype=np.int64)
+        else:
+            rows, hits = np.unique(np.concatenate(arrays), return_counts=True)
+
+        if len(rows) > limit:
+            keep = np.argpartition(-hits, limit - 1)[:limit]
+            rows, hits = rows[keep], hits[keep]
+
+        order = np.lexsort((rows, -hits))
+        return rows[order], hits[order]
+
+
+_index: Optional[CatalogIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_catalog_index() -> CatalogIndex:
+    global _index
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                start = time.monotonic()
+                products = read_catalog(MOCK_CATALOG) if MOCK_CATALOG else MOCK_MAKEUP_PRODUCTS
+                _index = CatalogIndex(products)
+                logger.info(
+                    "Catálogo mock indexado: %d produtos em %.2fs",
+                    len(_index),
+                    time.monotonic() - start,
+                )
+    return _index
 
 
 class MakeupMockSource(BasePriceSource):
     name = "Makeup Mock Store"
 
-    def _normalize(self, s: str) -> str:
-        return re.sub(r"\s+", " ", s or "").strip().lower()
-
-    def search(self, query: str) -> List[Dict[str, Any]]:
-        q_norm = self._normalize(query)
-        if not q_norm:
+    def search(self, query: str, timeout: Optional[float] = None) -> List[Offer]:
+        tokens = tokenize(query)
+        if not tokens:
             return []
 
-        tokens = q_norm.split()
-        results: List[Dict[str, Any]] = []
-
-        for p in MOCK_MAKEUP_PRODUCTS:
-            title_norm = self._normalize(p["title"])
-
-            # contagem de tokens que aparecem no título
-            hits = sum(1 for t in tokens if t in title_norm)
-            if hits == 0:
-                continue
-
-            score = hits / len(tokens)
-
-            item = {
-                "store": p["store"],
-                "source": p["source"],
-                "id": p["id"],
-                "title": p["title"],
-                "price": float(p["price"]),
-                "currency": p.get("currency", "BRL"),
-                "url": p.get("url"),
-                "thumbnail": p.get("thumbnail"),
-                "relevance_score": score,
-                "relevant": True,  # tudo que passou no filtro é relevante, por enquanto
-            }
+        index = get_catalog_index()
+        rows, hits = index.match(tokens, MOCK_MAX_RESULTS)
+
+        results: List[Offer] = []
+        for row, hit in zip(rows.tolist(), hits.tolist()):
+            item = Offer(
+                store=index.stores[row],
+                source=index.sources[row],
+                id=index.ids[row],
+                title=index.titles[row],
+                price=float(index.prices[row]),
+                currency=index.currencies[row],
+                url=index.urls[row],
+                thumbnail=index.thumbnails[row],
+                relevance_score=hit / len(tokens),
+                relevant=True,  # tudo que passou no filtro é relevante, por enquanto
+            )
             results.append(item)
 
-        # ordena do mais relevante pro menos
-        results.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
+        # já vem do mais relevante pro menos (o match ordena pelo nº de tokens)
         return results
@@ -1,47 +1,36 @@
 # prices/price_sources/mercado_livre_rapidapi.py
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
+import httpx
 import requests
 
-from prices.price_sources.base import BasePriceSource
+from prices.domain.offer import Offer
+from prices.domain.price import parse_price
+from prices.price_sources.base import BasePriceSource, SourceUnavailable
+from prices.services.http_client import get_async_client, get_paid_session
 
 
 class MercadoLivreRapidAPISource(BasePriceSource):
     name = "Mercado Livre (via RapidAPI)"
     SEARCH_URL = "https://mercado-libre7.p.rapidapi.com/listings_for_search"
-
-    def _parse_price(self, raw) -> float | None:
-        """
-        Converte preço que pode vir como string 'R$ 2.699,10' ou número.
-        """
-        if raw is None:
-            return None
-
-        if isinstance(raw, (int, float)):
-            try:
-                return float(raw)
-            except (TypeError, ValueError):
-                return None
-
-        if isinstance(raw, str):
-            s = raw.strip()
-            # remove símbolo de moeda e espaço
-            s = s.replace("R$", "").replace("US$", "").strip()
-            # remove separador de milhar e troca vírgula por ponto
-            s = s.replace(".", "").replace(",", ".")
-            try:
-                return float(s)
-            except ValueError:
-                return None
-
-        return None
-
-    def search(self, query: str) -> List[Dict[str, Any]]:
+    # anúncios do ML entram e saem rápido: cache curto
+    cache_ttl = 300.0
+    cache_stale_grace = 600.0
+    # RapidAPI devolve 429 em rajada: segura as chamadas na fila em vez de estourar
+    rate_limit = float(os.environ.get("RAPIDAPI_RATE_LIMIT", "1"))
+    rate_burst = 2
+    daily_budget = int(os.environ.get("RAPIDAPI_DAILY_BUDGET", "0"))
+    monthly_budget = int(os.environ.get("RAPIDAPI_MONTHLY_BUDGET", "0"))
+    budget_policy = "queue"
+    # cauda longa (a maioria volta em ~1s, algumas penduram até o timeout)
+    hedge = os.environ.get("RAPIDAPI_HEDGE", "True") == "True"
+
+    def _request_kwargs(self, query: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
         api_key = os.environ.get("RAPIDAPI_KEY")
         if not api_key:
             # sem key, sem resultado
-            return []
+            return None
 
         params = {
             "search_str": query,
@@ -53,26 +42,17 @@ class MercadoLivreRapidAPISource(BasePriceSource):
             "x-rapidapi-key": api_key,
             "x-rapidapi-host": "mercado-libre7.p.rapidapi.com",
         }
+        return {"headers": headers, "params": params, "timeout": self.request_timeout(timeout)}
 
-        try:
-            resp = requests.get(self.SEARCH_URL, headers=headers, params=params, timeout=15)
-        except requests.RequestException:
-            return []
-
-        if resp.status_code != 200:
-            # você pode logar se quiser
-            return []
-
-        data = resp.json()
-
+    def _parse_response(self, data: Dict[str, Any]) -> List[Offer]:
         products = data.get("data") or []
 
-        results: List[Dict[str, Any]] = []
+        results: List[Offer] = []
 
         for p in products:
             title = p.get("title") or ""
             raw_price = p.get("price")
-            price = self._parse_price(raw_price)
+            price = parse_price(raw_price)
             if price is None:
                 continue
 
@@ -85,16 +65,46 @@ class MercadoLivreRapidAPISource(BasePriceSource):
             item_id = p.get("id")
 
             results.append(
-                {
-                    "store": self.name,
-                    "source": "mercado_livre_rapidapi",
-                    "id": item_id,
-                    "title": title,
-                    "price": price,
-                    "currency": currency,
-                    "url": url,
-                    "thumbnail": thumbnail,
-                }
+                Offer(
+                    store=self.name,
+                    source="mercado_livre_rapidapi",
+                    id=item_id,
+                    title=title,
+                    price=price,
+                    currency=currency,
+                    url=url,
+                    thumbnail=thumbnail,
+                )
             )
 
         return results
+
+    def search(self, query: str, timeout: Optional[float] = None) -> List[Offer]:
+        kwargs = self._request_kwargs(query, timeout)
+        if kwargs is None:
+            return []
+
+        try:
+            resp = get_paid_session().get(self.SEARCH_URL, **kwargs)
+        except requests.RequestException as e:
+            raise SourceUnavailable(f"erro de rede: {e}") from e
+
+        if resp.status_code != 200:
+            raise SourceUnavailable.from_response(resp)
+
+        return self._parse_response(resp.json())
+
+    async def asearch(self, query: str, timeout: Optional[float] = None) -> List[Offer]:
+        kwargs = self._request_kwargs(query, timeout)
+        if kwargs is None:
+            return []
+
+        try:
+            resp = await get_async_client().get(self.SEARCH_URL, **kwargs)
+        except httpx.HTTPError as e:
+            raise SourceUnavailable(f"erro de rede: {e}") from e
+
+        if resp.status_code != 200:
+            raise SourceUnavailable.from_response(resp)
+
+        return self._parse_response(resp.json())
@@ -1,79 +1,49 @@
 import logging
 import os
-import re
 from typing import Any, Dict, List, Optional
 
+import httpx
 import requests
 
-from prices.price_sources.base import BasePriceSource
+from prices.domain.catalog import classify_query
+from prices.domain.offer import Offer
+from prices.domain.price import parse_price
+from prices.price_sources.base import BasePriceSource, SourceUnavailable
+from prices.services.relevance import score_titles
+from prices.services.http_client import get_async_client, get_paid_session
 
 logger = logging.getLogger(__name__)
 
 
-def _normalize_text(s: str) -> str:
-    s = s or ""
-    s = s.lower()
-    s = re.sub(r"[^\w\s]", " ", s, flags=re.UNICODE)
-    s = re.sub(r"\s+", " ", s)
-    return s.strip()
-
-
-def _parse_price(price_str: Optional[str]) -> Optional[float]:
-    if not price_str:
-        return None
-
-    s = price_str.strip()
-    # remove “agora” e outros textos
-    s = re.sub(r"\bagora\b", "", s, flags=re.IGNORECASE).strip()
-    # remove tudo que não é dígito, vírgula ou ponto
-    s = re.sub(r"[^\d,\.]", "", s)
-
-    if "," in s and "." in s:
-        # provavelmente 1.234,56
-        s = s.replace(".", "").replace(",", ".")
-    elif "," in s and "." not in s:
-        # 59,90
-        s = s.replace(",", ".")
-
-    try:
-        return float(s)
-    except ValueError:
-        logger.warning("Não consegui converter preço: %r", price_str)
-        return None
-
-
 class SerperShoppingSource(BasePriceSource):
     name = "Google Shopping (Serper)"
     URL = "https://google.serper.dev/shopping"
+    timeout = 10.0
+    # Serper cobra por crédito: orçamento configurável, e sem crédito serve o cache vencido
+    rate_limit = float(os.environ.get("SERPER_RATE_LIMIT", "5"))
+    rate_burst = 5
+    daily_budget = int(os.environ.get("SERPER_DAILY_BUDGET", "0"))
+    monthly_budget = int(os.environ.get("SERPER_MONTHLY_BUDGET", "0"))
+    budget_policy = "stale"
+    # preços do Google Shopping mudam devagar: cache longo
+    cache_ttl = 1800.0
+    cache_stale_grace = 3600.0
 
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.environ.get("SERPER_API_KEY") or ""
 
-    def _relevance_score(self, query: str, title: str) -> float:
-        q_norm = _normalize_text(query)
-        t_norm = _normalize_text(title)
-
-        if not q_norm or not t_norm:
-            return 0.0
-
-        q_tokens = q_norm.split()
-        hits = sum(1 for tok in q_tokens if tok in t_norm)
-        base = hits / len(q_tokens)
-
-        first = q_tokens[0]
-        if t_norm.startswith(first):
-            base += 0.1
-
-        return base
-
-    def search(self, query: str) -> List[Dict[str, Any]]:
+    def _request_kwargs(self, query: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Monta os parâmetros da chamada (comum ao search sync e ao asearch).
+        Devolve None quando não há o que buscar.
+        """
         if not self.api_key:
             logger.warning("SERPER_API_KEY não configurada; Serper desativado.")
-            return []
+            return None
 
         q = (query or "").strip()
         if not q:
-            return []
+            return None
 
         payload = {
             "q": q,
@@ -85,22 +55,12 @@ class SerperShoppingSource(BasePriceSource):
             "X-API-KEY": self.api_key,
             "Content-Type": "application/json",
         }
+        return {"json": payload, "headers": headers, "timeout": self.request_timeout(timeout)}
 
-        try:
-            resp = requests.post(self.URL, json=payload, headers=headers, timeout=10)
-            resp.raise_for_status()
-        except requests.RequestException as e:
-            logger.exception("[Serper] erro HTTP na busca: %s", e)
-            return []
-
-        try:
-            data = resp.json()
-        except ValueError:
-            logger.exception("[Serper] resposta não é JSON válido")
-            return []
-
+    def _parse_response(self, query: str, data: Dict[str, Any]) -> List[Offer]:
+        q = (query or "").strip()
         items = data.get("shopping") or []
-        results: List[Dict[str, Any]] = []
+        results: List[Offer] = []
 
         for item in items:
             title = item.get("title") or ""
@@ -109,27 +69,69 @@ class SerperShoppingSource(BasePriceSource):
             thumb = item.get("imageUrl")
             raw_price = item.get("price")
 
-            price = _parse_price(raw_price)
+            price = parse_price(raw_price)
             if price is None:
                 continue
 
-            score = self._relevance_score(q, title)
-
             results.append(
-                {
-                    "store": source,
-                    "source": "serper_shopping",
-                    "id": item.get("productId") or item.get("position") or link or title,
-                    "title": title,
-                    "price": price,
-                    "currency": "BRL",
-                    "url": link,
-                    "thumbnail": thumb,
-                    "relevance_score": score,
-                    "relevant": True,
-                }
+                Offer(
+                    store=source,
+                    source="serper_shopping",
+                    id=item.get("productId") or item.get("position") or link or title,
+                    title=title,
+                    price=price,
+                    currency="BRL",
+                    url=link,
+                    thumbnail=thumb,
+                )
             )
 
+        # relevância em lote (query e títulos normalizados em prices/domain/text.py)
+        profile = classify_query(q)
+        scores = score_titles([r.title for r in results], profile)
+        for item, score in zip(results, scores.tolist()):
+            item.relevance_score = score
+
         # ordenar do mais relevante pro menos relevante
-        results.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
+        results.sort(key=lambda x: x.relevance_score, reverse=True)
         return results
+
+    def search(self, query: str, timeout: Optional[float] = None) -> List[Offer]:
+        kwargs = self._request_kwargs(query, timeout)
+        if kwargs is None:
+            return []
+
+        try:
+            resp = get_paid_session().post(self.URL, **kwargs)
+        except requests.RequestException as e:
+            raise SourceUnavailable(f"erro HTTP na busca: {e}") from e
+
+        if resp.status_code >= 400:
+            raise SourceUnavailable.from_response(resp)
+
+        try:
+            data = resp.json()
+        except ValueError as e:
+            raise SourceUnavailable("resposta não é JSON válido") from e
+
+        return self._parse_response(query, data)
+
+    async def asearch(self, query: str, timeout: Optional[float] = None) -> List[Offer]:
+        kwargs = self._request_kwargs(query, timeout)
+        if kwargs is None:
+            return []
+
+        try:
+            resp = await get_async_client().post(self.URL, **kwargs)
+        except httpx.HTTPError as e:
+            raise SourceUnavailable(f"erro HTTP na busca: {e}") from e
+
+        if resp.status_code >= 400:
+            raise SourceUnavailable.from_response(resp)
+
+        try:
+            data = resp.json()
+        except ValueError as e:
+            raise SourceUnavailable("resposta não é JSON válido") from e
+
+        return self._parse_response(query, data)
@@ -0,0 +1,143 @@
+# prices/services/dedup.py
+"""
+Agrupa ofertas quase iguais que vêm de fontes diferentes (o mesmo batom na
+Serper, na Amazon e no Mercado Livre com títulos um pouco diferentes).
+
+- cada título normalizado vira um conjunto de shingles de caracteres,
+  tirados palavra por palavra (a ordem das palavras não importa);
+- a assinatura MinHash (NumPy, memoizada por título) aproxima a
+  similaridade de Jaccard entre os conjuntos;
+- LSH por bandas: só títulos que colidem em alguma banda viram candidatos,
+  então o custo fica ~linear no número de ofertas;
+- cada candidato é confirmado com o Jaccard exato dos shingles (a
+  estimativa do MinHash varia alguns pontos) e só cai no grupo se passar de
+  PRICEBOT_DEDUP_THRESHOLD e tiver os mesmos números no título (cor,
+  volume, tamanho).
+
+Cada grupo fica com a oferta de menor preço efetivo que não seja outlier de
+preço (os outliers são marcados antes), e ela guarda em `alternatives`
+quantas outras foram absorvidas.
+"""
+import os
+import re
+import zlib
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, List, Tuple
+
+import numpy as np
+
+from prices.domain.offer import Offer
+from prices.domain.text import normalize_text
+
+DEDUP_ENABLED = os.environ.get("PRICEBOT_DEDUP", "True") == "True"
+DEDUP_THRESHOLD = float(os.environ.get("PRICEBOT_DEDUP_THRESHOLD", "0.7"))
+DEDUP_PERMUTATIONS = int(os.environ.get("PRICEBOT_DEDUP_PERMUTATIONS", "64"))
+DEDUP_BANDS = int(os.environ.get("PRICEBOT_DEDUP_BANDS", "16"))
+SHINGLE_SIZE = 3
+SIGNATURE_CACHE_SIZE = 4096
+
+# hash universal (a*x + b) mod p, com p primo de Mersenne 2^31 - 1: a, b e x
+# ficam abaixo de p, então a conta cabe em uint64 sem overflow
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240501)  # fixo: mesma assinatura em todo processo
+_PERM_A = _rng.integers(1, _PRIME, size=DEDUP_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _PRIME, size=DEDUP_PERMUTATIONS, dtype=np.uint64)
+
+_NUMBER_RE = re.compile(r"\d+")
+
+
+@lru_cache(maxsize=SIGNATURE_CACHE_SIZE)
+def _shingles(title_norm: str) -> FrozenSet[int]:
+    shingles = set()
+    for token in title_norm.split() or [""]:
+        text = f" {token} "
+        if len(text) <= SHINGLE_SIZE:
+            shingles.add(text)
+            continue
+        shingles.update(text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1))
+    return frozenset(zlib.crc32(shingle.encode()) for shingle in shingles)
+
+
+@lru_cache(maxsize=SIGNATURE_CACHE_SIZE)
+def minhash_signature(title_norm: str) -> np.ndarray:
+    """Assinatura MinHash (DEDUP_PERMUTATIONS valores) do título normalizado."""
+    hashes = np.fromiter(_shingles(title_norm), dtype=np.uint64) % np.uint64(_PRIME)
+    # uma linha por permutação, uma coluna por shingle
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % np.uint64(_PRIME)
+    signature = permuted.min(axis=1)
+    signature.flags.writeable = False
+    return signature
+
+
+def _numbers(title_norm: str) -> FrozenSet[str]:
+    return frozenset(_NUMBER_RE.findall(title_norm))
+
+
+def _jaccard(a: str, b: str) -> float:
+    sa, sb = _shingles(a), _shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+class _UnionFind:
+    def __init__(self, size: int) -> None:
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> None:
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+def cluster_offers(offers: List[Offer], threshold: float = DEDUP_THRESHOLD) -> List[List[int]]:
+    """Índices das ofertas agrupados por quase-duplicata (ordem de chegada)."""
+    n = len(offers)
+    if n < 2:
+        return [[i] for i in range(n)]
+
+    titles = [normalize_text(o.title) for o in offers]
+    signatures = np.stack([minhash_signature(t) for t in titles])
+    numbers = [_numbers(t) for t in titles]
+    rows = DEDUP_PERMUTATIONS // DEDUP_BANDS
+
+    uf = _UnionFind(n)
+    for band in range(DEDUP_BANDS):
+        buckets: Dict[bytes, int] = {}
+        band_slice = signatures[:, band * rows:(band + 1) * rows]
+        for i in range(n):
+            key = band_slice[i].tobytes()
+            first = buckets.setdefault(key, i)
+            if first == i or uf.find(first) == uf.find(i):
+                continue
+            if numbers[first] == numbers[i] and _jaccard(titles[first], titles[i]) >= threshold:
+                uf.union(first, i)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(n):
+        groups.setdefault(uf.find(i), []).append(i)
+    return list(groups.values())
+
+
+def dedup_offers(
+    offers: List[Offer],
+    price_key: Callable[[Offer], float],
+) -> Tuple[List[Offer], int]:
+    """
+    Uma oferta por grupo: a de menor `price_key` (preço efetivo) entre as que
+    não são `price_outlier`; um outlier só representa o grupo se todos forem.
+    Devolve a lista reduzida e quantas ofertas foram absorvidas.
+    """
+    kept: List[Offer] = []
+    for group in cluster_offers(offers):
+        members = [offers[i] for i in group]
+        for member in members:
+            member.alternatives = 0  # o streaming reagrupa a mesma lista
+        representative = min(members, key=lambda o: (o.price_outlier, price_key(o)))
+        representative.alternatives = len(members) - 1
+        kept.append(representative)
+    return kept, len(offers) - len(kept)
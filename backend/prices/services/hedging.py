@@ -0,0 +1,180 @@
+# prices/services/hedging.py
+"""
+Requisições "hedged" pra cortar a cauda de latência das fontes lentas.
+
+Se a chamada não voltou até o p90 observado da fonte, dispara uma segunda
+idêntica; a primeira resposta boa ganha e a outra é cancelada (no async a
+task é cancelada de fato; no modo com threads o resultado só é descartado).
+
+Pra custo não explodir, cada fonte tem um teto de hedges: no máximo
+PRICEBOT_HEDGE_MAX_RATIO das últimas PRICEBOT_HEDGE_WINDOW chamadas.
+"""
+import asyncio
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+HEDGE_MAX_RATIO = float(os.environ.get("PRICEBOT_HEDGE_MAX_RATIO", "0.1"))
+HEDGE_WINDOW = int(os.environ.get("PRICEBOT_HEDGE_WINDOW", "200"))
+HEDGE_WORKERS = int(os.environ.get("PRICEBOT_HEDGE_WORKERS", "8"))
+
+# pool próprio: as chamadas com hedge já rodam dentro do pool do agregador,
+# e submeter de volta nele poderia travar com o pool cheio
+_hedge_executor = ThreadPoolExecutor(
+    max_workers=HEDGE_WORKERS,
+    thread_name_prefix="price-hedge",
+)
+
+
+class HedgeBudget:
+    def __init__(self, name: str, max_ratio: float = HEDGE_MAX_RATIO) -> None:
+        self.name = name
+        self.max_ratio = max_ratio
+        # True = essa chamada teve hedge
+        self._window: Deque[bool] = deque(maxlen=HEDGE_WINDOW)
+        # hedges liberados que ainda não entraram na janela (chamada em andamento)
+        self._reserved = 0
+        self._lock = threading.Lock()
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def try_hedge(self) -> bool:
+        """
+        Reserva um hedge se couber no teto. A reserva conta na hora (senão
+        uma rajada de chamadas lentas passaria toda pela mesma checagem) e é
+        acertada em `record_call(hedged=True)` ou devolvida em `release`.
+        """
+        with self._lock:
+            calls = len(self._window) + self._reserved + 1
+            hedged = sum(self._window) + self._reserved + 1
+            if hedged / calls > self.max_ratio:
+                return False
+            self._reserved += 1
+            return True
+
+    def release(self) -> None:
+        """Devolve a reserva de um hedge que acabou não sendo disparado."""
+        with self._lock:
+            self._reserved = max(0, self._reserved - 1)
+
+    def record_call(self, hedged: bool, hedge_won: bool = False) -> None:
+        with self._lock:
+            self._window.append(hedged)
+            if hedged:
+                self._reserved = max(0, self._reserved - 1)
+                self.hedges += 1
+            if hedge_won:
+                self.hedge_wins += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = len(self._window)
+            hedged = sum(self._window)
+            return {
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "recent_hedge_ratio": hedged / calls if calls else 0.0,
+            }
+
+
+def hedged_call(
+    fn: Callable[[], Any],
+    delay: float,
+    allow_hedge: Callable[[], bool],
+    budget: HedgeBudget,
+) -> Any:
+    """Roda `fn`; se passar de `delay` e `allow_hedge()` deixar, dispara uma cópia."""
+    primary = _hedge_executor.submit(fn)
+    done, _ = wait([primary], timeout=delay)
+    if done or not allow_hedge():
+        budget.record_call(hedged=False)
+        return primary.result()
+
+    logger.info("[%s] sem resposta em %.2fs; disparando hedge", budget.name, delay)
+    hedge = _hedge_executor.submit(fn)
+    pending = {primary, hedge}
+    error: Optional[BaseException] = None
+
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                for loser in pending:
+                    loser.cancel()
+                budget.record_call(hedged=True, hedge_won=future is hedge)
+                return future.result()
+            error = future.exception()
+
+    budget.record_call(hedged=True)
+    raise error
+
+
+async def ahedged_call(
+    fn: Callable[[], Awaitable[Any]],
+    delay: float,
+    allow_hedge: Callable[[], bool],
+    budget: HedgeBudget,
+) -> Any:
+    primary = asyncio.ensure_future(fn())
+    tasks = {primary}
+    # hedge reservado e ainda não contabilizado (cancelamento pelo prazo da fonte)
+    unrecorded = False
+
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done or not allow_hedge():
+            budget.record_call(hedged=False)
+            return await primary
+
+        unrecorded = True
+        logger.info("[%s] sem resposta em %.2fs; disparando hedge", budget.name, delay)
+        hedge = asyncio.ensure_future(fn())
+        tasks.add(hedge)
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    unrecorded = False
+                    budget.record_call(hedged=True, hedge_won=task is hedge)
+                    return task.result()
+                error = task.exception()
+
+        unrecorded = False
+        budget.record_call(hedged=True)
+        raise error
+    finally:
+        if unrecorded:
+            budget.record_call(hedged=True)
+        # perdedora (ou todas, se quem chamou foi cancelado pelo prazo da fonte)
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+_registry: Dict[str, HedgeBudget] = {}
+_registry_lock = threading.Lock()
+
+
+def get_hedge_budget(source) -> HedgeBudget:
+    budget = _registry.get(source.name)
+    if budget is None:
+        with _registry_lock:
+            budget = _registry.get(source.name)
+            if budget is None:
+                budget = HedgeBudget(source.name)
+                _registry[source.name] = budget
+    return budget
+
+
+def hedging_snapshot() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        items = list(_registry.items())
+    return {name: budget.stats() for name, budget in items}
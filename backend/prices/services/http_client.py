@@ -0,0 +1,204 @@
+# prices/services/http_client.py
+"""
+Clientes HTTP compartilhados pelo processo inteiro (fontes de preço e bot
+do Telegram), pra reaproveitar conexões TCP+TLS com google.serper.dev,
+rapidapi.com e api.telegram.org em vez de abrir uma nova a cada chamada.
+
+- `get_session()`: requests.Session única, com pool por host, keep-alive e
+  retry com backoff;
+- `get_paid_session()`: o mesmo, pras APIs cobradas por chamada (Serper,
+  RapidAPI): só repete erro de conexão, que não chega a ser cobrado. Um 5xx
+  repetido aqui dentro gastaria crédito sem passar pelo rate limit nem pelo
+  orçamento da fonte (prices/services/source_limits.py);
+- `get_async_client()`: httpx.AsyncClient por event loop (um AsyncClient não
+  pode ser usado fora do loop em que foi criado), fechado quando o loop
+  encerra: sob WSGI/runserver cada `async_to_sync` roda num loop novo, e o
+  cliente dele não pode ficar com os sockets abertos;
+- `pool_stats()`: conexões abertas x reaproveitadas por host, nas sessions
+  e nos AsyncClients.
+"""
+import asyncio
+import logging
+import os
+import threading
+import weakref
+from typing import Any, Dict, Optional, Set
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# quantos hosts diferentes mantêm pool, e quantas conexões por host
+HTTP_POOL_CONNECTIONS = int(os.environ.get("PRICEBOT_HTTP_POOL_CONNECTIONS", "10"))
+HTTP_POOL_MAXSIZE = int(os.environ.get("PRICEBOT_HTTP_POOL_MAXSIZE", "20"))
+# retry em erro de conexão e em 502/503/504 de GET; nas APIs pagas, só em erro de conexão
+HTTP_RETRIES = int(os.environ.get("PRICEBOT_HTTP_RETRIES", "2"))
+HTTP_BACKOFF = float(os.environ.get("PRICEBOT_HTTP_BACKOFF", "0.3"))
+
+_session: Optional[requests.Session] = None
+_paid_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+# contadores dos AsyncClients, por host: o httpx não expõe isso no pool
+_async_counts: Dict[str, Dict[str, int]] = {}
+_async_counts_lock = threading.Lock()
+
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+# referência forte às tarefas que fecham os clientes (o loop só guarda referência fraca)
+_closers: Set[asyncio.Task] = set()
+
+
+def _build_session(paid: bool = False) -> requests.Session:
+    if paid:
+        # só erro de conexão: a requisição nem chegou na API
+        retry = Retry(
+            total=HTTP_RETRIES,
+            connect=HTTP_RETRIES,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=HTTP_BACKOFF,
+        )
+    else:
+        retry = Retry(
+            total=HTTP_RETRIES,
+            backoff_factor=HTTP_BACKOFF,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def get_paid_session() -> requests.Session:
+    global _paid_session
+
+    if _paid_session is None:
+        with _session_lock:
+            if _paid_session is None:
+                _paid_session = _build_session(paid=True)
+    return _paid_session
+
+
+def _origin(url: httpx.URL) -> str:
+    port = url.port or {"https": 443, "http": 80}.get(url.scheme)
+    return f"{url.scheme}://{url.host}:{port}"
+
+
+def _count_async(origin: str, field: str) -> None:
+    with _async_counts_lock:
+        counts = _async_counts.setdefault(origin, {"opened": 0, "requests": 0})
+        counts[field] += 1
+
+
+async def _on_async_request(request: httpx.Request) -> None:
+    origin = _origin(request.url)
+    _count_async(origin, "requests")
+
+    async def trace(event_name: str, info: Dict[str, Any]) -> None:
+        # evento do httpcore: conexão TCP nova (sem ele, a requisição reaproveitou uma)
+        if event_name == "connection.connect_tcp.complete":
+            _count_async(origin, "opened")
+
+    request.extensions["trace"] = trace
+
+
+async def _close_with_loop(loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> None:
+    # fica parada até o encerramento do loop: asyncio.run (e o async_to_sync,
+    # que usa ele) cancela as tarefas pendentes antes de fechar o loop
+    try:
+        await asyncio.Event().wait()
+    finally:
+        _async_clients.pop(loop, None)
+        await client.aclose()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """AsyncClient do event loop atual; criado na primeira chamada dentro dele."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_CONNECTIONS * HTTP_POOL_MAXSIZE,
+                max_keepalive_connections=HTTP_POOL_MAXSIZE,
+            ),
+            # httpx só repete falhas de conexão, que é o que queremos aqui
+            transport=httpx.AsyncHTTPTransport(retries=HTTP_RETRIES),
+            event_hooks={"request": [_on_async_request]},
+        )
+        _async_clients[loop] = client
+        closer = loop.create_task(_close_with_loop(loop, client))
+        _closers.add(closer)
+        closer.add_done_callback(_closers.discard)
+    return client
+
+
+def _session_stats(session: requests.Session) -> Dict[str, Dict[str, Any]]:
+    stats: Dict[str, Dict[str, Any]] = {}
+    seen = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened = pool.num_connections
+            requests_made = pool.num_requests
+            stats[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                "opened": opened,
+                "requests": requests_made,
+                "reused": max(0, requests_made - opened),
+            }
+    return stats
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Por host: conexões abertas, requisições feitas e quantas reaproveitaram
+    uma conexão já aberta (requests - opened). `sync` soma as duas sessions
+    (requests); `async`, os AsyncClients de todos os event loops.
+    """
+    sync: Dict[str, Dict[str, Any]] = {}
+    for session in (_session, _paid_session):
+        if session is None:
+            continue
+        for origin, counts in _session_stats(session).items():
+            total = sync.setdefault(origin, {"opened": 0, "requests": 0, "reused": 0})
+            for field, value in counts.items():
+                total[field] += value
+
+    with _async_counts_lock:
+        async_stats = {
+            origin: {**counts, "reused": max(0, counts["requests"] - counts["opened"])}
+            for origin, counts in _async_counts.items()
+        }
+    return {"sync": sync, "async": async_stats}
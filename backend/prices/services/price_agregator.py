@@ -1,81 +1,83 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+import asyncio
 import logging
-from statistics import median
-
+import os
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+
+from prices.price_sources.local_catalog import (
+    LOCAL_CATALOG_LEARN,
+    LOCAL_CATALOG_MIN_RESULTS,
+    LocalCatalogSource,
+    get_local_catalog_source,
+)
 from prices.price_sources.makeup_mock import MakeupMockSource
 from prices.price_sources.serper_shopping import SerperShoppingSource
 # Exemplo: quando você tiver outras fontes, adicione aqui
 # from prices.price_sources.serper_shopping import SerperShoppingSource
 
 from prices.domain.catalog import classify_query, QueryProfile
+from prices.domain.offer import Offer
+from prices.domain.store_trust import store_factor
+from prices.domain.text import tokenize
+from prices.services.dedup import DEDUP_ENABLED, dedup_offers
+from prices.services.ranking import price_median, rank_offers
+from prices.services.relevance import score_offers
+from prices.services.result_cache import DjangoResultCache, ResultCache, get_result_cache, normalize_query_key
+from prices.services.single_flight import SingleFlight, get_single_flight
+from prices.services.source_health import get_source_health
+from prices.services.hedging import ahedged_call, get_hedge_budget, hedged_call
+from prices.services.source_limits import QUEUE, STALE as STALE_POLICY, SourceThrottled, get_source_limiter
+from prices.price_sources.base import SourceUnavailable
+from prices.services.source_cache import MISS, STALE, SourceCache, get_source_cache
 
 logger = logging.getLogger(__name__)
 
-# Lojas mais conhecidas para maquiagem / beleza
-TRUSTED_STORES = {
-    "sephora": 0.9,
-    "panvel": 0.9,
-    "droga raia": 0.9,
-    "drogaria raia": 0.9,
-    "drogasil": 0.9,
-    "epoca cosmeticos": 0.9,
-    "época cosmeticos": 0.9,
-    "epoca cosméticos": 0.9,
-    "magazine luiza": 0.9,
-    "magalu": 0.9,
-    "amazon": 0.9,
-    "renner": 0.9,
-    "cea": 0.9,
-    "c&a": 0.9,
-    "casas bahia": 0.9,
-    "l'occitane": 0.9,
-    "boticario": 0.9,
-    "o boticário": 0.9,
-}
+# Prazo global de uma busca agregada (segundos). O que não terminar até lá
+# fica de fora do resultado e aparece em `timed_out_sources`.
+SEARCH_DEADLINE = float(os.environ.get("PRICEBOT_SEARCH_DEADLINE", "20"))
+# Busca as fontes em paralelo (padrão) ou uma depois da outra
+PARALLEL_SOURCES = os.environ.get("PRICEBOT_PARALLEL_SOURCES", "True") == "True"
+# Tamanho do pool compartilhado por todas as buscas do processo
+SOURCE_WORKERS = int(os.environ.get("PRICEBOT_SOURCE_WORKERS", "8"))
+# soma a fonte local (catálogo mock/sintético) às fontes reais: teste de carga sem chave de API
+MOCK_SOURCE = os.environ.get("PRICEBOT_MOCK_SOURCE", "False") == "True"
+
+# Pool único por processo: o agregador é criado a cada requisição, então o pool
+# não pode ser dele, senão cada busca criaria (e esperaria) suas próprias threads.
+_source_executor = ThreadPoolExecutor(
+    max_workers=SOURCE_WORKERS,
+    thread_name_prefix="price-source",
+)
 
 
 class PriceAggregator:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        parallel: Optional[bool] = None,
+        deadline: Optional[float] = None,
+        use_cache: bool = True,
+    ) -> None:
         self.sources = [
             # MakeupMockSource(),
             # Quando estiver usando Serper, por exemplo:
             SerperShoppingSource(),
         ]
+        if MOCK_SOURCE:
+            self.sources.append(MakeupMockSource())
+        self.parallel = PARALLEL_SOURCES if parallel is None else parallel
+        self.deadline = SEARCH_DEADLINE if deadline is None else deadline
+        self.cache: Optional[ResultCache] = get_result_cache() if use_cache else None
+        self.source_cache: Optional[SourceCache] = get_source_cache() if use_cache else None
+        self.single_flight: Optional[SingleFlight] = get_single_flight()
+        # primeira camada (SQLite FTS5, offline); None se não configurado
+        self.local_source: Optional[LocalCatalogSource] = get_local_catalog_source()
 
     # ------------- Utils básicos -------------
 
     def _tokenize(self, text: str) -> List[str]:
-        text = (text or "").lower()
-        return [t for t in text.split() if t]
-
-    def _normalize_title(self, title: str) -> str:
-        return (title or "").lower().strip()
-
-    # ------------- Relevância por texto -------------
-
-    def _relevance_score(self, profile: QueryProfile, title: str) -> float:
-        """
-        Hoje deixamos simples: contar tokens do query que aparecem no título.
-        Podemos evoluir depois com regras pra marca, categoria etc.
-        """
-        if not title:
-            return 0.0
-
-        title_l = self._normalize_title(title)
-        tokens = profile.tokens  # vindo do classify_query()
-
-        if not tokens:
-            base = 1.0
-        else:
-            hits = sum(1 for token in tokens if token in title_l)
-            base = hits / len(tokens)
-
-        # leve bônus se começa com o primeiro token
-        first_token = tokens[0] if tokens else ""
-        if first_token and title_l.startswith(first_token):
-            base += 0.1
-
-        return base
+        return list(tokenize(text))
 
     # ------------- Confiança por loja -------------
 
@@ -84,76 +86,648 @@ class PriceAggregator:
         Fator <= 1.0. Lojas “grandes” ganham fator 0.9 (ou semelhante),
         o que efetivamente “barateia” um pouco o preço na comparação.
         """
-        name = (store_name or "").lower()
-        for key, factor in TRUSTED_STORES.items():
-            if key in name:
-                return factor
-        return 1.0  # loja desconhecida: sem desconto
+        # regex compilada da tabela + memo por nome (prices/domain/store_trust.py)
+        return store_factor(store_name)
 
-    def _effective_price(self, item: Dict[str, Any]) -> float:
+    def _effective_price(self, item: Offer) -> float:
         """
         Preço ajustado pela confiança da loja.
         Se não tiver preço, devolve um número grande pra não ser escolhida.
         """
-        price = item.get("price")
+        price = item.price
         if not isinstance(price, (int, float)):
             return 10**9  # muito grande, nunca será a menor
 
-        store_factor = self._store_factor(item.get("store", ""))
+        store_factor = self._store_factor(item.store)
         effective = price * store_factor
-        item["store_trust_factor"] = store_factor
-        item["effective_price"] = effective
+        item.store_trust_factor = store_factor
+        item.effective_price = effective
         return effective
 
     # ------------- Filtro de outlier de preço -------------
 
-    def _mark_price_outliers(self, results: List[Dict[str, Any]]) -> None:
+    def _mark_price_outliers(self, results: List[Offer]) -> None:
         """
-        Marca cada item com `price_outlier: True/False` usando a mediana.
+        Marca cada item com `price_outlier: True/False` usando a mediana
+        (por seleção parcial, sem ordenar os preços).
         Outliers muito abaixo/acima da mediana são ignorados na escolha de 'best'.
         """
         prices = [
-            r["price"]
+            r.price
             for r in results
-            if isinstance(r.get("price"), (int, float))
+            if isinstance(r.price, (int, float))
         ]
 
         if len(prices) < 5:
             # Muito pouca amostra: não marca outlier
             for r in results:
-                r["price_outlier"] = False
+                r.price_outlier = False
             return
 
-        med = median(prices)
+        med = price_median(prices)
         LOW_FACTOR = 0.4   # abaixo de 40% da mediana => suspeito (baixo demais)
         HIGH_FACTOR = 2.5  # acima de 250% da mediana => suspeito (alto demais)
 
         logger.info("Mediana de preços: %.2f", med)
 
         for r in results:
-            p = r.get("price")
+            p = r.price
             if not isinstance(p, (int, float)):
-                r["price_outlier"] = False
+                r.price_outlier = False
                 continue
 
             if p < LOW_FACTOR * med or p > HIGH_FACTOR * med:
-                r["price_outlier"] = True
+                r.price_outlier = True
             else:
-                r["price_outlier"] = False
+                r.price_outlier = False
 
-    # ------------- Busca agregada -------------
+    # ------------- Consulta às fontes -------------
 
-    def search_all(self, query: str) -> Dict[str, Any]:
-        profile: QueryProfile = classify_query(query)
+    def _source_deadline(self, source) -> float:
+        """
+        Quanto tempo esperar por uma fonte: o `deadline` dela ou o timeout
+        adaptativo (p99 recente da fonte), nunca além do prazo global da busca.
+        """
+        own = getattr(source, "deadline", None) or get_source_health(source).adaptive_timeout()
+        return min(own, self.deadline)
+
+    def _source_status(self) -> Dict[str, str]:
+        """Estado do circuit breaker de cada fonte (closed/open/half_open)."""
+        return {source.name: get_source_health(source).state for source in self.sources}
 
-        all_results: List[Dict[str, Any]] = []
+    def _source_allowed(self, source) -> bool:
+        if get_source_health(source).allow_request():
+            return True
+        logger.info("[%s] circuit breaker aberto; pulando a fonte", source.name)
+        return False
+
+    def _cached_source_results(self, source, query: str) -> Optional[List[Offer]]:
+        """
+        Consulta o cache da fonte. Se a entrada estiver velha (mas dentro da
+        tolerância), devolve assim mesmo e agenda a atualização em background.
+        """
+        if self.source_cache is None:
+            return None
+
+        state, results = self.source_cache.lookup(source, query)
+        if state == MISS:
+            return None
+        if state == STALE:
+            self.source_cache.refresh_in_background(
+                source, query, lambda: self._refresh_source(source, query)
+            )
+        logger.info("[%s] cache %s para %r", source.name, state, query)
+        return results
+
+    def _refresh_source(self, source, query: str) -> Optional[List[Offer]]:
+        """
+        Atualização em background de uma entrada velha do cache, com a mesma
+        proteção de uma chamada normal: breaker, saúde/latência e rate limit
+        (sem esperar token). None = a fonte não foi chamada.
+        """
+        if not self._source_allowed(source):
+            return None
+
+        health = get_source_health(source)
+        start = time.monotonic()
+        try:
+            results = self._fetch_source(source, query, max_wait=0)
+        except SourceThrottled:
+            health.release_probe()
+            logger.info("[%s] sem crédito/token; cache não atualizado", source.name)
+            return None
+        except Exception:
+            health.record_failure(time.monotonic() - start)
+            raise
+        health.record_success(time.monotonic() - start)
+        return results
+
+    def _search_source(self, source, query: str) -> List[Offer]:
+        """
+        Uma fonte só, com o mesmo prazo do modo paralelo (`_source_deadline`):
+        a chamada roda no pool compartilhado e, se passar do prazo, é
+        abandonada com FutureTimeout (e conta como falha no breaker).
+        """
+        cached = self._cached_source_results(source, query)
+        if cached is not None:
+            return cached
+
+        if not self._source_allowed(source):
+            return []
+
+        health = get_source_health(source)
+        start = time.monotonic()
+        deadline = self._source_deadline(source)
+        future = _source_executor.submit(
+            self._fetch_source, source, query, deadline_at=start + deadline
+        )
+        try:
+            results = future.result(timeout=deadline)
+        except SourceThrottled:
+            return self._throttled_results(source, query)
+        except FutureTimeout:
+            future.cancel()
+            health.record_failure(time.monotonic() - start)
+            raise
+        except Exception:
+            health.record_failure(time.monotonic() - start)
+            raise
+        health.record_success(time.monotonic() - start)
+        return results
+
+    # ------------- Rate limit / créditos -------------
+
+    def _admit(self, source, max_wait: Optional[float] = None) -> None:
+        """
+        Pega token/crédito pra chamar a fonte. Na política "queue" espera o
+        próximo token (até `max_wait`); sem liberação, levanta SourceThrottled.
+        """
+        limiter = get_source_limiter(source)
+        if max_wait is None:
+            max_wait = self._source_deadline(source)
+        give_up_at = time.monotonic() + max_wait
+
+        while True:
+            wait = limiter.reserve()
+            if wait == 0:
+                return
+            if wait is None or limiter.policy != QUEUE or time.monotonic() + wait > give_up_at:
+                raise SourceThrottled(source.name)
+            time.sleep(wait)
+
+    async def _aadmit(self, source) -> None:
+        limiter = get_source_limiter(source)
+        give_up_at = time.monotonic() + self._source_deadline(source)
+
+        while True:
+            wait = limiter.reserve()
+            if wait == 0:
+                return
+            if wait is None or limiter.policy != QUEUE or time.monotonic() + wait > give_up_at:
+                raise SourceThrottled(source.name)
+            await asyncio.sleep(wait)
+
+    def _note_source_error(self, source, error: Exception) -> None:
+        if isinstance(error, SourceUnavailable) and error.status_code == 429:
+            get_source_limiter(source).rate_limited(error.retry_after)
+
+    def _throttled_results(self, source, query: str) -> List[Offer]:
+        """
+        A fonte ficou sem token/crédito: pula, ou na política "stale" serve o
+        que tiver no cache dela, mesmo vencido.
+        """
+        # se era a chamada de teste do breaker, ela não aconteceu
+        get_source_health(source).release_probe()
+
+        limiter = get_source_limiter(source)
+        if limiter.policy == STALE_POLICY and self.source_cache is not None:
+            _, results = self.source_cache.lookup(source, query, allow_expired=True)
+            if results is not None:
+                logger.info("[%s] sem crédito/token; servindo cache vencido", source.name)
+                return results
+
+        logger.info("[%s] sem crédito/token; pulando a fonte", source.name)
+        return []
+
+    # ------------- Hedge -------------
+
+    def _hedge_delay(self, source) -> Optional[float]:
+        """p90 da fonte, se ela usa hedge e já tem histórico suficiente."""
+        if not getattr(source, "hedge", False):
+            return None
+        return get_source_health(source).percentile(90)
+
+    def _allow_hedge(self, source) -> bool:
+        # o hedge é uma chamada paga a mais: respeita o teto e o rate limit/crédito
+        budget = get_hedge_budget(source)
+        if not budget.try_hedge():
+            return False
+        if get_source_limiter(source).reserve() != 0:
+            budget.release()
+            return False
+        return True
+
+    def _call_source(self, source, query: str, timeout: Optional[float] = None) -> List[Offer]:
+        delay = self._hedge_delay(source)
+        if delay is None:
+            return source.search(query, timeout)
+        return hedged_call(
+            lambda: source.search(query, timeout),
+            delay,
+            lambda: self._allow_hedge(source),
+            get_hedge_budget(source),
+        )
+
+    async def _acall_source(self, source, query: str, timeout: Optional[float] = None) -> List[Offer]:
+        delay = self._hedge_delay(source)
+        if delay is None:
+            return await source.asearch(query, timeout)
+        return await ahedged_call(
+            lambda: source.asearch(query, timeout),
+            delay,
+            lambda: self._allow_hedge(source),
+            get_hedge_budget(source),
+        )
+
+    def _fetch_source(
+        self,
+        source,
+        query: str,
+        max_wait: Optional[float] = None,
+        deadline_at: Optional[float] = None,
+    ) -> List[Offer]:
+        """
+        `deadline_at` (time.monotonic): até quando o agregador espera essa
+        fonte; o que sobrar dele vira o timeout HTTP da chamada.
+        """
+        self._admit(source, max_wait)
+        timeout = None
+        if deadline_at is not None:
+            timeout = deadline_at - time.monotonic()
+            if timeout <= 0:
+                # ninguém espera mais: nem gasta a chamada
+                raise SourceUnavailable("prazo da busca esgotado antes da chamada")
+        try:
+            results = self._call_source(source, query, timeout)
+        except Exception as e:
+            self._note_source_error(source, e)
+            raise
+        if self.source_cache is not None:
+            self.source_cache.store(source, query, results)
+        return results
+
+    async def _afetch_source(self, source, query: str, timeout: Optional[float] = None) -> List[Offer]:
+        await self._aadmit(source)
+        try:
+            return await self._acall_source(source, query, timeout)
+        except Exception as e:
+            self._note_source_error(source, e)
+            raise
+
+    def _search_sequential(self, query: str) -> Tuple[List[Offer], List[str]]:
+        all_results: List[Offer] = []
+        timed_out: List[str] = []
         for source in self.sources:
             try:
-                results = source.search(query)
+                results = self._search_source(source, query)
                 logger.info("[%s] retornou %d resultados", source.name, len(results))
                 all_results.extend(results)
+            except FutureTimeout:
+                timed_out.append(source.name)
+                logger.warning(
+                    "[%s] não respondeu em %.1fs; seguindo sem essa fonte",
+                    source.name,
+                    self._source_deadline(source),
+                )
             except Exception:
                 logger.exception("Erro ao buscar em %s", source.name)
+        return all_results, timed_out
+
+    def _iter_parallel(self, query: str) -> Iterator[Tuple[List[Offer], List[str], int]]:
+        """
+        Dispara todas as fontes no pool compartilhado e vai devolvendo
+        (resultados novos, fontes que estouraram o prazo, fontes que ainda
+        faltam) conforme cada uma termina. Fontes atrasadas são abandonadas
+        (a thread segue até o timeout HTTP, mas ninguém espera por ela).
+        """
+        start = time.monotonic()
+
+        # fontes com cache válido (fresco ou velho) respondem na hora, sem ir pro pool
+        to_fetch = []
+        cached_results: List[Offer] = []
+        for source in self.sources:
+            cached = self._cached_source_results(source, query)
+            if cached is not None:
+                cached_results.extend(cached)
+            elif self._source_allowed(source):
+                to_fetch.append(source)
+        if cached_results:
+            yield cached_results, [], len(to_fetch)
+
+        deadline_at = {source: start + self._source_deadline(source) for source in to_fetch}
+        futures = {
+            _source_executor.submit(
+                self._fetch_source, source, query, deadline_at=deadline_at[source]
+            ): source
+            for source in to_fetch
+        }
+        # latência = quando a fonte terminou, não quando o consumidor (que
+        # pode estar parado no yield, editando mensagem) chegou nela
+        finished_at: Dict[Any, float] = {}
+        for future in futures:
+            future.add_done_callback(lambda f: finished_at.setdefault(f, time.monotonic()))
+        deadlines = {future: deadline_at[source] for future, source in futures.items()}
+
+        pending = set(futures)
+
+        while pending:
+            next_deadline = min(deadlines[f] for f in pending)
+            done, pending = wait(
+                pending,
+                timeout=max(0.0, next_deadline - time.monotonic()),
+                return_when=FIRST_COMPLETED,
+            )
+
+            for index, future in enumerate(done):
+                source = futures[future]
+                latency = finished_at.get(future, time.monotonic()) - start
+                remaining = len(pending) + len(done) - index - 1
+                try:
+                    results = future.result()
+                except SourceThrottled:
+                    yield self._throttled_results(source, query), [], remaining
+                    continue
+                except Exception:
+                    get_source_health(source).record_failure(latency)
+                    logger.exception("Erro ao buscar em %s", source.name)
+                    continue
+                get_source_health(source).record_success(latency)
+                logger.info("[%s] retornou %d resultados", source.name, len(results))
+                yield results, [], remaining
+
+            now = time.monotonic()
+            expired = {f for f in pending if deadlines[f] <= now}
+            timed_out: List[str] = []
+            for future in expired:
+                future.cancel()
+                source = futures[future]
+                get_source_health(source).record_failure(now - start)
+                timed_out.append(source.name)
+                logger.warning(
+                    "[%s] não respondeu em %.1fs; seguindo sem essa fonte",
+                    source.name,
+                    self._source_deadline(source),
+                )
+            pending -= expired
+            if timed_out:
+                yield [], timed_out, len(pending)
+
+        logger.info("Fontes consultadas em %.2fs", time.monotonic() - start)
+
+    def _search_parallel(self, query: str) -> Tuple[List[Offer], List[str]]:
+        all_results: List[Offer] = []
+        timed_out: List[str] = []
+        for results, expired, _ in self._iter_parallel(query):
+            all_results.extend(results)
+            timed_out.extend(expired)
+        return all_results, timed_out
+
+    def _collect_results(self, query: str) -> Tuple[List[Offer], List[str]]:
+        if not self.parallel or len(self.sources) <= 1:
+            return self._search_sequential(query)
+        return self._search_parallel(query)
+
+    # ------------- Busca agregada -------------
+
+    async def _asearch_source(self, source, query: str) -> List[Offer]:
+        cached = self._cached_source_results(source, query)
+        if cached is not None:
+            return cached
+
+        if not self._source_allowed(source):
+            return []
+
+        health = get_source_health(source)
+        start = time.monotonic()
+        deadline = self._source_deadline(source)
+        try:
+            results = await asyncio.wait_for(
+                self._afetch_source(source, query, deadline),
+                timeout=deadline,
+            )
+        except SourceThrottled:
+            return self._throttled_results(source, query)
+        except Exception:
+            health.record_failure(time.monotonic() - start)
+            raise
+        health.record_success(time.monotonic() - start)
+        logger.info("[%s] retornou %d resultados", source.name, len(results))
+        if self.source_cache is not None:
+            self.source_cache.store(source, query, results)
+        return results
+
+    async def _acollect_results(self, query: str) -> Tuple[List[Offer], List[str]]:
+        """
+        Mesma regra de prazos do modo com threads, mas cada fonte é uma
+        corrotina no event loop atual.
+        """
+        start = time.monotonic()
+        outcomes = await asyncio.gather(
+            *(self._asearch_source(source, query) for source in self.sources),
+            return_exceptions=True,
+        )
+
+        all_results: List[Offer] = []
+        timed_out: List[str] = []
+        for source, outcome in zip(self.sources, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                timed_out.append(source.name)
+                logger.warning(
+                    "[%s] não respondeu em %.1fs; seguindo sem essa fonte",
+                    source.name,
+                    self._source_deadline(source),
+                )
+            elif isinstance(outcome, BaseException):
+                logger.error(
+                    "Erro ao buscar em %s", source.name, exc_info=outcome
+                )
+            else:
+                all_results.extend(outcome)
+
+        logger.info("Fontes consultadas em %.2fs", time.monotonic() - start)
+        return all_results, timed_out
+
+    # ------------- Catálogo local (primeira camada) -------------
+
+    def _local_results(self, query: str) -> Optional[List[Offer]]:
+        """
+        Ofertas frescas do catálogo local, se já bastam pra responder sem ir
+        às APIs pagas. None = catálogo ralo (ou desligado): consulta as fontes.
+        """
+        if self.local_source is None:
+            return None
+        try:
+            results = self.local_source.search(query)
+        except sqlite3.Error:
+            logger.exception("Erro ao buscar no catálogo local")
+            return None
+        if len(results) < LOCAL_CATALOG_MIN_RESULTS:
+            return None
+        logger.info("[%s] %d ofertas para %r; APIs não consultadas", self.local_source.name, len(results), query)
+        return results
+
+    def _ingest(self, offers: List[Offer]) -> None:
+        try:
+            count = self.local_source.ingest(offers)
+        except sqlite3.Error:
+            logger.exception("Erro ao gravar no catálogo local")
+            return
+        logger.info("[%s] %d ofertas gravadas", self.local_source.name, count)
+
+    def _learn(self, all_results: List[Offer]) -> None:
+        """Grava no catálogo local (em background, fora da resposta) o que veio das fontes."""
+        if self.local_source is None or not LOCAL_CATALOG_LEARN or not all_results:
+            return
+        _source_executor.submit(self._ingest, list(all_results))
+
+    # ------------- Cache de resultados -------------
+
+    def _cached_result(self, query: str) -> Optional[Dict[str, Any]]:
+        if self.cache is None:
+            return None
+        result = self.cache.get(query)
+        if result is not None:
+            logger.info("Resultado em cache para %r", query)
+        return result
+
+    def _store_result(self, query: str, result: Dict[str, Any]) -> None:
+        # resultado parcial (fonte estourou o prazo) não vai pro cache,
+        # pra próxima busca ter chance de vir completa
+        if self.cache is None or result.get("timed_out_sources"):
+            return
+        self.cache.set(query, result)
+
+    async def _acached_result(self, query: str) -> Optional[Dict[str, Any]]:
+        # o cache do Django pode ser rede/banco: fora do event loop
+        if isinstance(self.cache, DjangoResultCache):
+            return await asyncio.to_thread(self._cached_result, query)
+        return self._cached_result(query)
+
+    async def _astore_result(self, query: str, result: Dict[str, Any]) -> None:
+        if isinstance(self.cache, DjangoResultCache):
+            await asyncio.to_thread(self._store_result, query, result)
+        else:
+            self._store_result(query, result)
+
+    def _recheck_cache(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Com lock entre processos, quem esperava o lock pode achar o resultado
+        já gravado (no cache compartilhado) pelo worker que buscou antes.
+        """
+        if self.single_flight is None or not self.single_flight.cross_process:
+            return None
+        return self._cached_result(query)
+
+    async def _arecheck_cache(self, query: str) -> Optional[Dict[str, Any]]:
+        if self.single_flight is None or not self.single_flight.cross_process:
+            return None
+        return await self._acached_result(query)
+
+    def _search_uncached(self, query: str) -> Dict[str, Any]:
+        cached = self._recheck_cache(query)
+        if cached is not None:
+            return cached
+
+        local = self._local_results(query)
+        if local is not None:
+            all_results, timed_out_sources = local, []
+        else:
+            all_results, timed_out_sources = self._collect_results(query)
+            self._learn(all_results)
+        result = self._build_result(query, all_results, timed_out_sources)
+        self._store_result(query, result)
+        return result
+
+    async def _asearch_uncached(self, query: str) -> Dict[str, Any]:
+        cached = await self._arecheck_cache(query)
+        if cached is not None:
+            return cached
+
+        # SQLite do catálogo local: numa thread, pra não travar o event loop
+        local = None
+        if self.local_source is not None:
+            local = await asyncio.to_thread(self._local_results, query)
+        if local is not None:
+            all_results, timed_out_sources = local, []
+        else:
+            all_results, timed_out_sources = await self._acollect_results(query)
+            self._learn(all_results)
+        result = self._build_result(query, all_results, timed_out_sources)
+        await self._astore_result(query, result)
+        return result
+
+    def _ranked(self, result: Dict[str, Any], limit: Optional[int]) -> Dict[str, Any]:
+        """
+        Cópia rasa do resultado com `results` ranqueado: top-`limit` por heap
+        ou, com `limit=None`, a lista toda ordenada. O cache e o single-flight
+        guardam/compartilham a versão sem ranking, que não é mutada aqui.
+        """
+        ranked = dict(result)
+        ranked["results"] = rank_offers(result["results"], limit)
+        return ranked
+
+    def search_all(self, query: str, limit: Optional[int] = None) -> Dict[str, Any]:
+        """`limit`: quantas ofertas devolver em `results` (None = todas, ordenadas)."""
+        result = self._cached_result(query)
+        if result is None:
+            if self.single_flight is None:
+                result = self._search_uncached(query)
+            else:
+                result = self.single_flight.do(
+                    normalize_query_key(query), lambda: self._search_uncached(query)
+                )
+        return self._ranked(result, limit)
+
+    async def asearch_all(self, query: str, limit: Optional[int] = None) -> Dict[str, Any]:
+        result = await self._acached_result(query)
+        if result is None:
+            if self.single_flight is None:
+                result = await self._asearch_uncached(query)
+            else:
+                result = await self.single_flight.ado(
+                    normalize_query_key(query), lambda: self._asearch_uncached(query)
+                )
+        return self._ranked(result, limit)
+
+    def iter_search(self, query: str, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Modo streaming: a cada fonte que termina (menos a última), devolve um
+        resultado parcial (com `partial: True`) calculado sobre tudo que já
+        chegou; o último item é o resultado final, igual ao de `search_all`.
+
+        Não passa pelo single-flight (cada chamador quer ver o próprio
+        progresso), mas usa e alimenta os caches normalmente.
+        """
+        cached = self._cached_result(query)
+        if cached is not None:
+            yield self._ranked(cached, limit)
+            return
+
+        local = self._local_results(query)
+        if local is not None:
+            result = self._build_result(query, local, [])
+            self._store_result(query, result)
+            yield self._ranked(result, limit)
+            return
+
+        all_results: List[Offer] = []
+        timed_out_sources: List[str] = []
+        for results, expired, remaining in self._iter_parallel(query):
+            all_results.extend(results)
+            timed_out_sources.extend(expired)
+            # parcial só com fonte ainda por vir: a última chegada já é o final
+            if results and remaining:
+                partial = self._build_result(query, all_results, timed_out_sources)
+                partial["partial"] = True
+                yield self._ranked(partial, limit)
+
+        self._learn(all_results)
+        result = self._build_result(query, all_results, timed_out_sources)
+        self._store_result(query, result)
+        yield self._ranked(result, limit)
+
+    def _build_result(
+        self,
+        query: str,
+        all_results: List[Offer],
+        timed_out_sources: List[str],
+    ) -> Dict[str, Any]:
+        """
+        Pós-processamento comum aos modos sync e async: relevância, outliers,
+        quase-duplicatas e escolha do best. `results` sai na ordem de chegada; o ranking é
+        feito depois, em `_ranked`, só até onde quem chamou precisa.
+        """
+        profile: QueryProfile = classify_query(query)
 
         # Se nada voltou de nenhuma fonte
         if not all_results:
@@ -161,26 +735,36 @@ class PriceAggregator:
                 "query": query,
                 "results": [],
                 "best": None,
+                "total_results": 0,
+                "timed_out_sources": timed_out_sources,
+                "source_status": self._source_status(),
             }
 
-        # Calcula relevância textual
-        for item in all_results:
-            title = item.get("title", "")
-            score = self._relevance_score(profile, title)
-            item["relevance_score"] = score
-            # por padrão, todo mundo é "relevante" até termos regras melhores
-            item["relevant"] = score >= 0.2
+        # Calcula relevância textual (em lote, ver prices/services/relevance.py)
+        score_offers(all_results, profile)
 
         # Filtra por relevância mínima
-        relevant_results = [r for r in all_results if r.get("relevant")]
+        relevant_results = [r for r in all_results if r.relevant]
         if not relevant_results:
             relevant_results = all_results
 
-        # Marca outliers de preço dentro do conjunto relevante
+        # Marca outliers de preço dentro do conjunto relevante, antes de agrupar:
+        # assim uma oferta suspeita não absorve as irmãs legítimas (e some com elas)
+        for r in all_results:
+            r.price_outlier = False  # o streaming remarca a mesma lista
         self._mark_price_outliers(relevant_results)
 
+        # Junta o mesmo produto vindo de fontes diferentes (MinHash/LSH, ver
+        # prices/services/dedup.py): fica a oferta não-outlier de menor preço efetivo
+        offers = all_results
+        if DEDUP_ENABLED:
+            offers, merged = dedup_offers(all_results, self._effective_price)
+            if merged:
+                logger.info("%d ofertas quase iguais agrupadas", merged)
+            relevant_results = [r for r in offers if r.relevant] or offers
+
         # Candidatos para best: relevantes e não outlier
-        candidates = [r for r in relevant_results if not r.get("price_outlier")]
+        candidates = [r for r in relevant_results if not r.price_outlier]
         if not candidates:
             # Se todos forem outlier por algum motivo, volta pro conjunto relevante
             candidates = relevant_results
@@ -190,20 +774,17 @@ class PriceAggregator:
 
         logger.info(
             "Best escolhido: %s (preço=%.2f, efetivo=%.2f, outlier=%s)",
-            best.get("title"),
-            best.get("price"),
-            best.get("effective_price"),
-            best.get("price_outlier"),
-        )
-
-        # Ordena todos os resultados por relevância desc, depois preço asc
-        all_results_sorted = sorted(
-            all_results,
-            key=lambda x: (-x.get("relevance_score", 0), x.get("price") or 10**9),
+            best.title,
+            best.price,
+            best.effective_price,
+            best.price_outlier,
         )
 
         return {
             "query": query,
-            "results": all_results_sorted,
+            "results": offers,
             "best": best,
+            "total_results": len(offers),
+            "timed_out_sources": timed_out_sources,
+            "source_status": self._source_status(),
         }
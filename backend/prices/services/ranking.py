@@ -0,0 +1,48 @@
+# prices/services/ranking.py
+"""
+Ranking das ofertas sem ordenar tudo à toa.
+
+- mediana de preço por seleção (np.partition, O(n)) em vez de ordenar;
+- top-k por heap (heapq.nsmallest, O(n log k)) pro que vai ser exibido;
+- ordenação completa só quando quem chamou pede todos os resultados.
+
+`heapq.nsmallest` devolve o mesmo que `sorted(...)[:k]` (inclusive nos
+empates), então o top-k é exatamente o começo da lista ordenada.
+"""
+import heapq
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from prices.domain.offer import Offer
+
+
+def price_median(prices: Sequence[float]) -> float:
+    """Mesmo valor de `statistics.median`, via seleção parcial."""
+    values = np.asarray(prices, dtype=float)
+    n = len(values)
+    if n == 0:
+        raise ValueError("mediana de lista vazia")
+
+    mid = n // 2
+    if n % 2:
+        return float(np.partition(values, mid)[mid])
+    part = np.partition(values, [mid - 1, mid])
+    return float((part[mid - 1] + part[mid]) / 2)
+
+
+def rank_key(item: Offer) -> Tuple[float, float]:
+    """Relevância desc, depois preço asc (sem preço vai pro fim)."""
+    return (-item.relevance_score, item.price or 10**9)
+
+
+def rank_offers(
+    offers: List[Offer],
+    limit: Optional[int] = None,
+) -> List[Offer]:
+    """As `limit` melhores em ordem; com `limit=None`, todas ordenadas."""
+    if limit is None or limit >= len(offers):
+        return sorted(offers, key=rank_key)
+    if limit <= 0:
+        return []
+    return heapq.nsmallest(limit, offers, key=rank_key)
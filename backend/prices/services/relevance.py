@@ -0,0 +1,82 @@
+# prices/services/relevance.py
+"""
+Score de relevância em lote (NumPy) para as ofertas de uma busca.
+
+Em vez de calcular item a item, os títulos são normalizados uma vez num
+array e os sinais saem como operações vetorizadas:
+
+- cobertura: fração dos tokens da query que aparecem no título
+  (matriz tokens x títulos, mesmo teste de substring de antes);
+  títulos e tokens vêm do `normalize_text` compartilhado (memoizado);
+- prefixo: bônus se o título começa com o primeiro token;
+- marca / família: bônus se o título cita a marca ou alguma keyword da
+  família que `classify_query` identificou.
+"""
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from prices.domain.catalog import FAMILIES, QueryProfile
+from prices.domain.offer import Offer
+from prices.domain.text import normalize_text
+
+PREFIX_BONUS = 0.1
+BRAND_BONUS = 0.05
+FAMILY_BONUS = 0.1
+# abaixo disso a oferta é marcada como não relevante
+RELEVANT_MIN_SCORE = 0.2
+
+_FAMILY_KEYWORDS: Dict[str, List[str]] = {
+    fam.slug: list(dict.fromkeys(normalize_text(kw) for kw in fam.keywords))
+    for fam in FAMILIES
+}
+
+
+def normalize_titles(titles: Sequence[str]) -> np.ndarray:
+    return np.array([normalize_text(t) for t in titles], dtype=str)
+
+
+def _contains(titles: np.ndarray, needle: str) -> np.ndarray:
+    return np.char.find(titles, needle) >= 0
+
+
+def hit_matrix(titles: np.ndarray, tokens: Sequence[str]) -> np.ndarray:
+    """Matriz booleana (tokens x títulos): o token aparece no título?"""
+    if not tokens:
+        return np.zeros((0, len(titles)), dtype=bool)
+    return np.stack([_contains(titles, token) for token in tokens])
+
+
+def score_titles(titles: Sequence[str], profile: QueryProfile) -> np.ndarray:
+    """Score de cada título para a query do `profile` (mesma escala de antes)."""
+    if not len(titles):
+        return np.zeros(0, dtype=float)
+
+    norm = normalize_titles(titles)
+    tokens = profile.tokens
+
+    if tokens:
+        scores = hit_matrix(norm, tokens).sum(axis=0) / len(tokens)
+        scores = scores + PREFIX_BONUS * np.char.startswith(norm, tokens[0])
+    else:
+        scores = np.ones(len(norm), dtype=float)
+
+    if profile.brand:
+        scores = scores + BRAND_BONUS * _contains(norm, normalize_text(profile.brand))
+
+    keywords = _FAMILY_KEYWORDS.get(profile.family_slug or "", [])
+    if keywords:
+        family_hits = np.logical_or.reduce([_contains(norm, kw) for kw in keywords])
+        scores = scores + FAMILY_BONUS * family_hits
+
+    # título vazio não é relevante pra nada
+    scores[norm == ""] = 0.0
+    return scores
+
+
+def score_offers(offers: List[Offer], profile: QueryProfile) -> None:
+    """Preenche `relevance_score` e `relevant` em todas as ofertas de uma vez."""
+    scores = score_titles([o.title for o in offers], profile)
+    for offer, score in zip(offers, scores.tolist()):
+        offer.relevance_score = score
+        offer.relevant = score >= RELEVANT_MIN_SCORE
@@ -0,0 +1,181 @@
+# prices/services/result_cache.py
+"""
+Cache do resultado final de `PriceAggregator.search_all`, chaveado pela
+query normalizada.
+
+Dois backends:
+- "memory": dict LRU em processo, com TTL e tamanho máximo;
+- "django": usa o cache configurado no Django (`CACHES["default"]`), útil
+  quando há vários workers e um backend compartilhado (redis, memcached...).
+
+Escolha via PRICEBOT_RESULT_CACHE=memory|django|off.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_BACKEND = os.environ.get("PRICEBOT_RESULT_CACHE", "memory")
+RESULT_CACHE_TTL = float(os.environ.get("PRICEBOT_RESULT_CACHE_TTL", "300"))
+RESULT_CACHE_MAX_SIZE = int(os.environ.get("PRICEBOT_RESULT_CACHE_MAX_SIZE", "1000"))
+
+_SPACES_RE = re.compile(r"\s+")
+
+
+def normalize_query_key(query: str) -> str:
+    """'  Gloss   LipHoney ' e 'gloss liphoney' caem na mesma entrada."""
+    return _SPACES_RE.sub(" ", query or "").strip().lower()
+
+
+class ResultCache:
+    """
+    Interface dos backends. Os resultados guardados são tratados como
+    somente leitura: quem recebe do cache não deve mutar o dict.
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def set(self, query: str, result: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def _count(self, attr: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self, attr, getattr(self, attr) + amount)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class InMemoryResultCache(ResultCache):
+    def __init__(self, max_size: int = RESULT_CACHE_MAX_SIZE, ttl: float = RESULT_CACHE_TTL) -> None:
+        super().__init__()
+        self.max_size = max_size
+        self.ttl = ttl
+        # chave -> (expira_em, resultado); a ordem do OrderedDict é a do LRU
+        self._entries: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        key = normalize_query_key(query)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                # expirou: remove e conta como miss
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None:
+            self._count("misses")
+            return None
+
+        self._count("hits")
+        return entry[1]
+
+    def set(self, query: str, result: Dict[str, Any]) -> None:
+        key = normalize_query_key(query)
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                evicted += 1
+
+        if evicted:
+            self._count("evictions", evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        data = super().stats()
+        data["size"] = len(self._entries)
+        return data
+
+
+class DjangoResultCache(ResultCache):
+    """
+    Guarda no cache do Django. Tamanho máximo e despejo ficam a cargo do
+    backend configurado (ex.: OPTIONS.MAX_ENTRIES do LocMemCache), então
+    aqui só dá pra contar hits e misses.
+    """
+
+    KEY_PREFIX = "pricebot:result:"
+
+    def __init__(self, ttl: float = RESULT_CACHE_TTL, alias: str = "default") -> None:
+        super().__init__()
+        self.ttl = ttl
+        self.alias = alias
+
+    @property
+    def _cache(self):
+        from django.core.cache import caches
+
+        return caches[self.alias]
+
+    def _key(self, query: str) -> str:
+        return self.KEY_PREFIX + normalize_query_key(query)
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        try:
+            result = self._cache.get(self._key(query))
+        except Exception:
+            logger.exception("Erro ao ler cache de resultados")
+            result = None
+
+        self._count("hits" if result is not None else "misses")
+        return result
+
+    def set(self, query: str, result: Dict[str, Any]) -> None:
+        try:
+            self._cache.set(self._key(query), result, timeout=self.ttl)
+        except Exception:
+            logger.exception("Erro ao gravar cache de resultados")
+
+    def clear(self) -> None:
+        # não limpa o cache inteiro do Django, que pode ser compartilhado
+        logger.warning("DjangoResultCache.clear() não é suportado; use o TTL")
+
+
+_result_cache: Optional[ResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Instância única por processo, conforme PRICEBOT_RESULT_CACHE."""
+    global _result_cache
+
+    if RESULT_CACHE_BACKEND == "off":
+        return None
+
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                if RESULT_CACHE_BACKEND == "django":
+                    _result_cache = DjangoResultCache()
+                else:
+                    _result_cache = InMemoryResultCache()
+    return _result_cache
@@ -0,0 +1,172 @@
+# prices/services/single_flight.py
+"""
+Coalescência de buscas idênticas em andamento ("single-flight").
+
+Enquanto uma busca por uma chave está rodando, quem pedir a mesma chave
+espera pelo mesmo Future e recebe o mesmo resultado, em vez de disparar
+outra rodada de chamadas pagas.
+
+Entre threads do mesmo processo isso é feito com um dict de Futures. Entre
+workers (gunicorn com vários processos), opcionalmente, com flock em um
+conjunto fixo de arquivos de lock em PRICEBOT_SINGLE_FLIGHT_LOCK_DIR: o
+segundo processo espera o primeiro terminar e então acha o resultado no
+cache compartilhado (PRICEBOT_RESULT_CACHE=django).
+"""
+import asyncio
+import fcntl
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SINGLE_FLIGHT_ENABLED = os.environ.get("PRICEBOT_SINGLE_FLIGHT", "True") == "True"
+SINGLE_FLIGHT_LOCK_DIR = os.environ.get("PRICEBOT_SINGLE_FLIGHT_LOCK_DIR", "")
+# quantidade de arquivos de lock; chaves diferentes podem cair no mesmo arquivo
+SINGLE_FLIGHT_LOCK_STRIPES = int(os.environ.get("PRICEBOT_SINGLE_FLIGHT_LOCK_STRIPES", "64"))
+
+
+class LeaderCancelled(Exception):
+    """
+    O líder foi cancelado (cliente desconectou, prazo estourou) antes de
+    terminar. Não é erro da busca: quem estava esperando tenta de novo, e um
+    deles assume como líder.
+    """
+
+
+class SingleFlight:
+    def __init__(self, lock_dir: str = "", lock_stripes: int = SINGLE_FLIGHT_LOCK_STRIPES) -> None:
+        self.lock_dir = lock_dir
+        self.lock_stripes = lock_stripes
+        self.coalesced = 0
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+
+    @property
+    def cross_process(self) -> bool:
+        return bool(self.lock_dir)
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """Devolve (future, é_líder)."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            return future, True
+
+    def _finish(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def _lock_path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        stripe = int(digest[:8], 16) % self.lock_stripes
+        return os.path.join(self.lock_dir, f"single-flight-{stripe}.lock")
+
+    @contextmanager
+    def _process_lock(self, key: str) -> Iterator[None]:
+        if not self.lock_dir:
+            yield
+            return
+
+        with open(self._lock_path(key), "a") as fh:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            logger.info("Busca %r coalescida com uma já em andamento", key)
+            try:
+                return future.result()
+            except LeaderCancelled:
+                continue
+
+        try:
+            with self._process_lock(key):
+                result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key, future)
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            logger.info("Busca %r coalescida com uma já em andamento", key)
+            try:
+                # shield: seguidor cancelado não cancela o Future dos outros
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except LeaderCancelled:
+                continue
+
+        try:
+            if self.lock_dir:
+                # flock bloqueia; no async ele roda numa thread
+                fh = open(self._lock_path(key), "a")
+                await asyncio.to_thread(fcntl.flock, fh.fileno(), fcntl.LOCK_EX)
+            else:
+                fh = None
+            try:
+                result = await fn()
+            finally:
+                if fh is not None:
+                    fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+                    fh.close()
+        except asyncio.CancelledError:
+            # sai do in-flight antes de acordar os seguidores, pra um deles virar líder
+            self._finish(key, future)
+            future.set_exception(LeaderCancelled(key))
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key, future)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            in_flight = len(self._in_flight)
+        return {"coalesced": self.coalesced, "in_flight": in_flight}
+
+
+_single_flight: Optional[SingleFlight] = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> Optional[SingleFlight]:
+    global _single_flight
+
+    if not SINGLE_FLIGHT_ENABLED:
+        return None
+
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight(lock_dir=SINGLE_FLIGHT_LOCK_DIR)
+    return _single_flight
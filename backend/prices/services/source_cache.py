@@ -0,0 +1,148 @@
+# prices/services/source_cache.py
+"""
+Cache por fonte da lista normalizada que cada `BasePriceSource.search`
+devolve, com TTL próprio da fonte (`cache_ttl`) e janela de tolerância
+(`cache_stale_grace`).
+
+- fresca (idade < ttl): devolve do cache;
+- velha mas dentro da tolerância: devolve do cache na hora e dispara
+  uma atualização em background (stale-while-revalidate);
+- além disso: miss, a fonte vai pra rede normalmente.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from prices.domain.offer import Offer
+from prices.services.result_cache import normalize_query_key
+
+logger = logging.getLogger(__name__)
+
+SOURCE_CACHE_ENABLED = os.environ.get("PRICEBOT_SOURCE_CACHE", "True") == "True"
+SOURCE_CACHE_MAX_SIZE = int(os.environ.get("PRICEBOT_SOURCE_CACHE_MAX_SIZE", "5000"))
+SOURCE_REFRESH_WORKERS = int(os.environ.get("PRICEBOT_SOURCE_REFRESH_WORKERS", "2"))
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+def _copy_results(results: List[Offer]) -> List[Offer]:
+    # o agregador escreve relevance_score, effective_price etc. nas ofertas;
+    # a cópia evita que isso vaze pro que está guardado
+    return [item.copy() for item in results]
+
+
+class SourceCache:
+    def __init__(self, max_size: int = SOURCE_CACHE_MAX_SIZE) -> None:
+        self.max_size = max_size
+        # (fonte, query normalizada) -> (gravado_em, resultados)
+        self._entries: Dict[Tuple[str, str], Tuple[float, List[Offer]]] = {}
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+        self._refresh_executor = ThreadPoolExecutor(
+            max_workers=SOURCE_REFRESH_WORKERS,
+            thread_name_prefix="source-refresh",
+        )
+
+    @staticmethod
+    def _key(source, query: str) -> Tuple[str, str]:
+        return (source.name, normalize_query_key(query))
+
+    def lookup(
+        self,
+        source,
+        query: str,
+        allow_expired: bool = False,
+    ) -> Tuple[str, Optional[List[Offer]]]:
+        """
+        Devolve (FRESH|STALE|MISS, resultados ou None). Com `allow_expired`,
+        qualquer entrada guardada serve (como STALE), mesmo fora da tolerância.
+        """
+        ttl = getattr(source, "cache_ttl", 0)
+        if not ttl:
+            return MISS, None
+
+        grace = getattr(source, "cache_stale_grace", 0)
+        with self._lock:
+            entry = self._entries.get(self._key(source, query))
+
+        if entry is None:
+            return MISS, None
+
+        age = time.monotonic() - entry[0]
+        if age < ttl:
+            return FRESH, _copy_results(entry[1])
+        if age < ttl + grace or allow_expired:
+            return STALE, _copy_results(entry[1])
+        return MISS, None
+
+    def store(self, source, query: str, results: List[Offer]) -> None:
+        # lista vazia (fonte sem key, ou nada encontrado) não vale segurar pelo
+        # TTL inteiro; erros nem chegam aqui, as fontes levantam SourceUnavailable
+        if not getattr(source, "cache_ttl", 0) or not results:
+            return
+
+        key = self._key(source, query)
+        with self._lock:
+            # reinsere pra manter o dict em ordem de gravação (mais antiga primeiro)
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.max_size:
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (time.monotonic(), _copy_results(results))
+
+    def refresh_in_background(
+        self,
+        source,
+        query: str,
+        fetch: Callable[[], Optional[List[Offer]]],
+    ) -> None:
+        """
+        Atualiza a entrada em background; uma atualização por chave por vez.
+        `fetch` devolve None quando não chamou a fonte (breaker aberto, sem
+        token): a entrada velha fica como está.
+        """
+        key = self._key(source, query)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def _run() -> None:
+            try:
+                results = fetch()
+                if results is None:
+                    return
+                self.store(source, query, results)
+                logger.info("[%s] cache atualizado em background para %r", source.name, query)
+            except Exception:
+                logger.exception("[%s] falha ao atualizar cache em background", source.name)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresh_executor.submit(_run)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_source_cache: Optional[SourceCache] = None
+_source_cache_lock = threading.Lock()
+
+
+def get_source_cache() -> Optional[SourceCache]:
+    global _source_cache
+
+    if not SOURCE_CACHE_ENABLED:
+        return None
+
+    if _source_cache is None:
+        with _source_cache_lock:
+            if _source_cache is None:
+                _source_cache = SourceCache()
+    return _source_cache
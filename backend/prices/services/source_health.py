@@ -0,0 +1,174 @@
+# prices/services/source_health.py
+"""
+Saúde de cada fonte: janela móvel de latência/erros, timeout adaptativo e
+circuit breaker.
+
+- timeout adaptativo: p99 das últimas chamadas bem-sucedidas * margem,
+  limitado entre um piso e o `timeout` fixo da fonte;
+- breaker: abre depois de N falhas seguidas (erro ou prazo estourado) e a
+  fonte é pulada; passado o cooldown fica meio-aberto e deixa passar uma
+  única chamada de teste, com o timeout cheio. Se der certo, fecha.
+"""
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HEALTH_WINDOW = int(os.environ.get("PRICEBOT_HEALTH_WINDOW", "100"))
+# antes de ter amostras suficientes, usa o timeout fixo da fonte
+HEALTH_MIN_SAMPLES = int(os.environ.get("PRICEBOT_HEALTH_MIN_SAMPLES", "20"))
+ADAPTIVE_TIMEOUT_MARGIN = float(os.environ.get("PRICEBOT_ADAPTIVE_TIMEOUT_MARGIN", "1.5"))
+ADAPTIVE_TIMEOUT_FLOOR = float(os.environ.get("PRICEBOT_ADAPTIVE_TIMEOUT_FLOOR", "2"))
+BREAKER_FAILURES = int(os.environ.get("PRICEBOT_BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.environ.get("PRICEBOT_BREAKER_COOLDOWN", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class SourceHealth:
+    def __init__(self, name: str, base_timeout: float) -> None:
+        self.name = name
+        self.base_timeout = base_timeout
+        # (latência em s, deu certo?)
+        self._window: Deque[Tuple[float, bool]] = deque(maxlen=HEALTH_WINDOW)
+        self._lock = threading.Lock()
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.skipped = 0
+
+    # ------------- Breaker -------------
+
+    def allow_request(self) -> bool:
+        """Pode chamar a fonte agora? No meio-aberto, só uma chamada de teste por vez."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN and time.monotonic() - self.opened_at >= BREAKER_COOLDOWN:
+                self.state = HALF_OPEN
+                logger.info("[%s] circuit breaker meio-aberto; testando a fonte", self.name)
+
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+            self.skipped += 1
+            return False
+
+    def release_probe(self) -> None:
+        """A chamada liberada não aconteceu (ex.: rate limit); libera o teste pra outra."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self._window.append((latency, True))
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+            if self.state != CLOSED:
+                logger.info("[%s] circuit breaker fechado", self.name)
+                self.state = CLOSED
+
+    def record_failure(self, latency: float) -> None:
+        with self._lock:
+            self._window.append((latency, False))
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED and self.consecutive_failures >= BREAKER_FAILURES
+            ):
+                logger.warning(
+                    "[%s] circuit breaker aberto após %d falhas seguidas",
+                    self.name,
+                    self.consecutive_failures,
+                )
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    # ------------- Timeout adaptativo -------------
+
+    def _latencies(self) -> List[float]:
+        with self._lock:
+            return sorted(lat for lat, ok in self._window if ok)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Percentil das latências de sucesso; None sem amostras suficientes."""
+        latencies = self._latencies()
+        if len(latencies) < HEALTH_MIN_SAMPLES:
+            return None
+        return _percentile(latencies, pct)
+
+    def adaptive_timeout(self) -> float:
+        # chamada de teste do meio-aberto ganha o timeout cheio
+        if self.state != CLOSED:
+            return self.base_timeout
+
+        latencies = self._latencies()
+        if len(latencies) < HEALTH_MIN_SAMPLES:
+            return self.base_timeout
+
+        adaptive = _percentile(latencies, 99) * ADAPTIVE_TIMEOUT_MARGIN
+        return min(self.base_timeout, max(ADAPTIVE_TIMEOUT_FLOOR, adaptive))
+
+    def snapshot(self) -> Dict[str, Any]:
+        latencies = self._latencies()
+        with self._lock:
+            total = len(self._window)
+            errors = sum(1 for _, ok in self._window if not ok)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "skipped": self.skipped,
+            "samples": total,
+            "error_rate": errors / total if total else 0.0,
+            "p50": _percentile(latencies, 50) if latencies else None,
+            "p90": _percentile(latencies, 90) if latencies else None,
+            "p99": _percentile(latencies, 99) if latencies else None,
+            "timeout": self.adaptive_timeout(),
+        }
+
+
+_registry: Dict[str, SourceHealth] = {}
+_registry_lock = threading.Lock()
+
+
+def get_source_health(source) -> SourceHealth:
+    """Uma SourceHealth por nome de fonte, compartilhada pelo processo."""
+    health = _registry.get(source.name)
+    if health is None:
+        with _registry_lock:
+            health = _registry.get(source.name)
+            if health is None:
+                health = SourceHealth(source.name, getattr(source, "timeout", 15.0))
+                _registry[source.name] = health
+    return health
+
+
+def health_snapshot() -> Dict[str, Dict[str, Any]]:
+    """Estado de todas as fontes já usadas no processo (pra métricas/log)."""
+    with _registry_lock:
+        items = list(_registry.items())
+    return {name: health.snapshot() for name, health in items}
+
+
+def reset_source_health(name: Optional[str] = None) -> None:
+    with _registry_lock:
+        if name is None:
+            _registry.clear()
+        else:
+            _registry.pop(name, None)
@@ -0,0 +1,195 @@
+# prices/services/source_limits.py
+"""
+Rate limit e orçamento de créditos por fonte.
+
+Serper e RapidAPI cobram por chamada, e a RapidAPI devolve 429 quando a
+gente estoura o limite. Cada fonte pode declarar:
+
+- `rate_limit` / `rate_burst`: token bucket (chamadas por segundo e rajada);
+- `daily_budget` / `monthly_budget`: máximo de chamadas pagas no dia/mês
+  (0 = sem limite);
+- `budget_policy`: o que fazer quando não há token ou crédito:
+    - "queue": espera o próximo token (até o prazo da fonte);
+    - "skip": pula a fonte nessa busca;
+    - "stale": serve o que houver no cache da fonte, mesmo vencido.
+
+Os contadores são por processo.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUE = "queue"
+SKIP = "skip"
+STALE = "stale"
+
+
+class SourceThrottled(Exception):
+    """A fonte não foi chamada por falta de token/crédito (não é falha da fonte)."""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_take(self) -> float:
+        """Consome um token e devolve 0, ou devolve quantos segundos faltam pro próximo."""
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def give_back(self) -> None:
+        """Devolve um token tirado por `try_take` que acabou não sendo usado."""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def pause(self, seconds: float) -> None:
+        """Depois de um 429: zera o balde e segura as chamadas por `seconds`."""
+        now = time.monotonic()
+        self.tokens = 0.0
+        self.updated_at = now
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+class CreditBudget:
+    def __init__(self, daily: int, monthly: int) -> None:
+        self.daily = daily
+        self.monthly = monthly
+        self.day = ""
+        self.month = ""
+        self.spent_today = 0
+        self.spent_month = 0
+
+    def _roll(self) -> None:
+        day = time.strftime("%Y-%m-%d")
+        if day != self.day:
+            self.day = day
+            self.spent_today = 0
+        month = day[:7]
+        if month != self.month:
+            self.month = month
+            self.spent_month = 0
+
+    def exhausted(self) -> bool:
+        self._roll()
+        return bool(
+            (self.daily and self.spent_today >= self.daily)
+            or (self.monthly and self.spent_month >= self.monthly)
+        )
+
+    def spend(self) -> None:
+        self._roll()
+        self.spent_today += 1
+        self.spent_month += 1
+
+
+class SourceLimiter:
+    def __init__(
+        self,
+        name: str,
+        rate_limit: float = 0.0,
+        rate_burst: int = 1,
+        daily_budget: int = 0,
+        monthly_budget: int = 0,
+        policy: str = SKIP,
+    ) -> None:
+        self.name = name
+        self.policy = policy
+        self.bucket = TokenBucket(rate_limit, rate_burst) if rate_limit else None
+        self.budget = CreditBudget(daily_budget, monthly_budget)
+        self._lock = threading.Lock()
+
+        self.throttled = 0
+        self.budget_denied = 0
+        self.rate_limited_429 = 0
+
+    def reserve(self) -> Optional[float]:
+        """
+        Tenta liberar uma chamada:
+        - 0: liberada (token e crédito já consumidos);
+        - > 0: segundos até haver token;
+        - None: orçamento esgotado, não adianta esperar.
+        """
+        with self._lock:
+            if self.budget.exhausted():
+                self.budget_denied += 1
+                return None
+
+            if self.bucket is not None:
+                wait = self.bucket.try_take()
+                if wait > 0:
+                    self.throttled += 1
+                    return wait
+
+            self.budget.spend()
+            return 0.0
+
+    def rate_limited(self, retry_after: Optional[float]) -> None:
+        """A fonte respondeu 429: segura as próximas chamadas."""
+        with self._lock:
+            self.rate_limited_429 += 1
+            if self.bucket is None:
+                return
+            seconds = retry_after if retry_after else 1 / self.bucket.rate
+            self.bucket.pause(seconds)
+        logger.warning("[%s] HTTP 429; segurando chamadas por %.1fs", self.name, seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self.budget._roll()
+            return {
+                "policy": self.policy,
+                "tokens": self.bucket.tokens if self.bucket else None,
+                "spent_today": self.budget.spent_today,
+                "spent_month": self.budget.spent_month,
+                "daily_budget": self.budget.daily,
+                "monthly_budget": self.budget.monthly,
+                "throttled": self.throttled,
+                "budget_denied": self.budget_denied,
+                "rate_limited_429": self.rate_limited_429,
+            }
+
+
+_registry: Dict[str, SourceLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def get_source_limiter(source) -> SourceLimiter:
+    """Um SourceLimiter por nome de fonte, com a config declarada na classe."""
+    limiter = _registry.get(source.name)
+    if limiter is None:
+        with _registry_lock:
+            limiter = _registry.get(source.name)
+            if limiter is None:
+                limiter = SourceLimiter(
+                    source.name,
+                    rate_limit=getattr(source, "rate_limit", 0.0),
+                    rate_burst=getattr(source, "rate_burst", 1),
+                    daily_budget=getattr(source, "daily_budget", 0),
+                    monthly_budget=getattr(source, "monthly_budget", 0),
+                    policy=getattr(source, "budget_policy", SKIP),
+                )
+                _registry[source.name] = limiter
+    return limiter
+
+
+def limits_snapshot() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        items = list(_registry.items())
+    return {name: limiter.stats() for name, limiter in items}
@@ -1,3 +1,173 @@
-from django.test import TestCase
+import asyncio
+import threading
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from prices.domain.makeup_terms import is_makeup_query
+from prices.domain.price import parse_price
+from prices.price_sources.makeup_mock import CatalogIndex
+from prices.services.hedging import HedgeBudget
+from prices.services.single_flight import SingleFlight
+
+
+# formatos reais de preço das lojas -> valor esperado
+PRICE_FORMATS = [
+    ('R$ 59,90', 59.9),
+    ('R$59,90', 59.9),
+    ('R$ 1.299,00', 1299.0),
+    ('R$ 12.345,67', 12345.67),
+    ('R$ 2.699,10', 2699.1),
+    ('R$\xa0149,90', 149.9),
+    ('R$ 1\xa0299,00', 1299.0),
+    ('R$ 39,90 agora', 39.9),
+    ('agora R$ 79,90', 79.9),
+    ('Agora R$ 1.049,00', 1049.0),
+    ('R$ 10,00 - R$ 20,00', 10.0),
+    ('R$ 29,90 a R$ 49,90', 29.9),
+    ('R$ 1.299', 1299.0),
+    ('R$ 35', 35.0),
+    ('59.90', 59.9),
+    ('1299.00', 1299.0),
+    ('1,299.00', 1299.0),
+    ('$1,234.56', 1234.56),
+    ('US$ 19.99', 19.99),
+    ('BRL 89,00', 89.0),
+    ('89,9', 89.9),
+    ('R$ 0,99', 0.99),
+    ('R$ 1.234.567,89', 1234567.89),
+    ('12x R$ 10,00', 120.0),
+    ('R$ 1.199,00 ou 10x de R$ 119,90', 1199.0),
+    ('10x R$ 119,90 sem juros', 1199.0),
+    ('R$\u202f89,90', 89.9),
+    ('R$ 2.5', 2.5),
+    ('', None),
+    ('Preço indisponível', None),
+    ('R$ --', None),
+    (59.9, 59.9),
+    (1299, 1299.0),
+    (None, None),
+]
+
+
+class ParsePriceTests(SimpleTestCase):
+    def test_store_formats(self):
+        for raw, expected in PRICE_FORMATS:
+            with self.subTest(raw=raw):
+                got = parse_price(raw)
+                if expected is None:
+                    self.assertIsNone(got)
+                else:
+                    self.assertAlmostEqual(got, expected)
+
+
+class MakeupQueryTests(SimpleTestCase):
+    def test_makeup_queries(self):
+        for query in ("pó compacto", "po translucido", "gloss liphoney", "base ruby rose", "batom BT", "paleta mac"):
+            with self.subTest(query=query):
+                self.assertTrue(is_makeup_query(query))
+
+    def test_short_keyword_inside_other_words(self):
+        # "pó" sem acento é "po": não pode casar no meio de outra palavra
+        for query in ("copo termico", "tempo de entrega", "camiseta polo", "notebook positivo", "corpo"):
+            with self.subTest(query=query):
+                self.assertFalse(is_makeup_query(query))
+
+
+class SearchLimitTests(SimpleTestCase):
+    def test_invalid_limit(self):
+        for limit in ("0", "-1", "abc"):
+            with self.subTest(limit=limit):
+                resp = self.client.get("/api/prices/", {"q": "batom", "limit": limit}, HTTP_HOST="localhost")
+                self.assertEqual(resp.status_code, 400)
+                self.assertEqual(resp.json()["error"], "invalid_limit")
+
+
+class HedgeBudgetTests(SimpleTestCase):
+    def test_concurrent_hedges_respect_ratio(self):
+        budget = HedgeBudget("teste", max_ratio=0.1)
+        for _ in range(100):
+            budget.record_call(hedged=False)
+
+        barrier = threading.Barrier(50)
+        allowed = []
+
+        def try_hedge():
+            barrier.wait()
+            allowed.append(budget.try_hedge())
+
+        threads = [threading.Thread(target=try_hedge) for _ in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        granted = sum(allowed)
+        self.assertLessEqual(granted / (100 + granted), 0.1)
+
+    def test_release_returns_reservation(self):
+        budget = HedgeBudget("teste", max_ratio=0.5)
+        budget.record_call(hedged=False)
+        self.assertTrue(budget.try_hedge())
+        self.assertFalse(budget.try_hedge())
+        budget.release()
+        self.assertTrue(budget.try_hedge())
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_cancelled_leader_does_not_fail_followers(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        async def scenario():
+            leader = asyncio.create_task(single_flight.ado("batom", fetch))
+            await asyncio.sleep(0.01)
+            followers = [asyncio.create_task(single_flight.ado("batom", fetch)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await asyncio.gather(*followers)
+
+        self.assertEqual(asyncio.run(scenario()), ["ok", "ok"])
+        # o primeiro seguidor assume; o outro coalesce com ele
+        self.assertEqual(len(calls), 2)
+
+    def test_cancelled_follower_does_not_cancel_leader(self):
+        single_flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        async def scenario():
+            leader = asyncio.create_task(single_flight.ado("gloss", fetch))
+            await asyncio.sleep(0.01)
+            follower = asyncio.create_task(single_flight.ado("gloss", fetch))
+            await asyncio.sleep(0.01)
+            follower.cancel()
+            return await leader
+
+        self.assertEqual(asyncio.run(scenario()), "ok")
+
+
+class CatalogIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = CatalogIndex(
+            {"store": "Loja", "source": "mock", "id": i, "title": title, "price": 10 + i}
+            for i, title in enumerate(["Batom matte vermelho", "Batom nude", "Gloss labial"])
+        )
+
+    def test_match_orders_by_hits(self):
+        rows, hits = self.index.match(("batom", "matte"), 10)
+        self.assertEqual(rows.tolist(), [0, 1])
+        self.assertEqual(hits.tolist(), [2, 1])
+
+    def test_match_non_positive_limit(self):
+        for limit in (0, -1):
+            with self.subTest(limit=limit):
+                rows, hits = self.index.match(("batom",), limit)
+                self.assertEqual(len(rows), 0)
+                self.assertEqual(len(hits), 0)
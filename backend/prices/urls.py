@@ -1,7 +1,8 @@
 from django.urls import path, include
-from .views import search_prices
+from .views import prices_stats, search_prices
 from . import views
 
 urlpatterns = [
     path("prices/", search_prices, name="price-search"),
+    path("prices/stats/", prices_stats, name="price-stats"),
 ]
@@ -1,20 +1,72 @@
+import os
+
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 
 from django.http import JsonResponse
 from django.views.decorators.http import require_GET
+from prices.domain.text import cache_stats
+from prices.services.hedging import hedging_snapshot
+from prices.services.http_client import pool_stats
 from prices.services.price_agregator import PriceAggregator
+from prices.services.result_cache import get_result_cache
+from prices.services.single_flight import get_single_flight
+from prices.services.source_health import health_snapshot
+from prices.services.source_limits import limits_snapshot
+
+# quantas ofertas a API devolve por padrão; `?all=1` devolve todas ordenadas
+API_RESULTS_LIMIT = int(os.environ.get("PRICEBOT_API_RESULTS_LIMIT", "20"))
+# teto do `limit` por chamada (acima disso, use `all=1`)
+API_RESULTS_MAX_LIMIT = int(os.environ.get("PRICEBOT_API_RESULTS_MAX_LIMIT", "100"))
 
 
+def _serialize_result(result):
+    """Ofertas viram dicts só aqui, na saída JSON."""
+    best = result.get("best")
+    return {
+        **result,
+        "results": [offer.to_dict() for offer in result["results"]],
+        "best": best.to_dict() if best else None,
+    }
+
 
 @require_GET
-def search_prices(request):
+async def search_prices(request):
     query = request.GET.get("q", "").strip()
     if not query:
         return JsonResponse({"error": "missing_query", "message": "Parâmetro q é obrigatório"}, status=400)
 
+    if request.GET.get("all") in ("1", "true"):
+        limit = None
+    else:
+        try:
+            limit = int(request.GET.get("limit", API_RESULTS_LIMIT))
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return JsonResponse({"error": "invalid_limit", "message": "Parâmetro limit deve ser inteiro positivo"}, status=400)
+        limit = min(limit, API_RESULTS_MAX_LIMIT)
+
     aggregator = PriceAggregator()
-    result = aggregator.search_all(query)
+    result = await aggregator.asearch_all(query, limit=limit)
 
-    return JsonResponse(result, status=200)
\ No newline at end of file
+    return JsonResponse(_serialize_result(result), status=200)
+
+
+@require_GET
+def prices_stats(request):
+    """Estado do agregador: breaker, rate limit, hedge, caches, single-flight e pool HTTP."""
+    result_cache = get_result_cache()
+    single_flight = get_single_flight()
+    return JsonResponse(
+        {
+            "sources": health_snapshot(),
+            "limits": limits_snapshot(),
+            "hedging": hedging_snapshot(),
+            "result_cache": result_cache.stats() if result_cache is not None else None,
+            "single_flight": single_flight.stats() if single_flight is not None else None,
+            "http_pool": pool_stats(),
+            "text_cache": cache_stats(),
+        }
+    )
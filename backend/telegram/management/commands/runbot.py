@@ -0,0 +1,61 @@
+# telegram/management/commands/runbot.py
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from telegram.services.handlers import handle_update
+from telegram.services.polling import TelegramConflict, UpdatePoller
+from telegram.services.update_queue import UPDATE_QUEUE_SIZE, UPDATE_WORKERS, UpdateQueue
+
+
+class Command(BaseCommand):
+    help = (
+        "Roda o bot por long polling (getUpdates), sem webhook: os updates vão "
+        "para um pool de workers com ordem por chat. Ctrl+C/SIGTERM encerra "
+        "esvaziando a fila."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=UPDATE_WORKERS, help="threads que processam updates")
+        parser.add_argument("--queue-size", type=int, default=UPDATE_QUEUE_SIZE)
+        parser.add_argument("--poll-timeout", type=int, default=25, help="long poll do getUpdates (s)")
+        parser.add_argument("--drain-timeout", type=float, default=30.0, help="quanto esperar a fila no shutdown (s)")
+        parser.add_argument(
+            "--delete-webhook",
+            action="store_true",
+            help="remove o webhook antes (o getUpdates não funciona com webhook ativo)",
+        )
+
+    def handle(self, *args, **options):
+        update_queue = UpdateQueue(handle_update, max_size=options["queue_size"], workers=options["workers"])
+        poller = UpdatePoller(update_queue, poll_timeout=options["poll_timeout"])
+
+        def stop(signum, frame):
+            # o getUpdates em andamento termina (até --poll-timeout) e o loop sai
+            self.stdout.write("Encerrando: esperando o getUpdates atual e a fila…")
+            poller.stop()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        if options["delete_webhook"]:
+            poller.delete_webhook()
+
+        self.stdout.write(f"Long polling com {options['workers']} workers")
+        try:
+            poller.run()
+        except TelegramConflict as e:
+            raise CommandError(
+                f"getUpdates recusado (409): há webhook ativo ou outro runbot rodando. "
+                f"Use --delete-webhook. ({e})"
+            )
+
+        drained = poller.shutdown(options["drain_timeout"])
+        stats = update_queue.stats()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{poller.received} updates recebidos, {stats['processed']} processados, "
+                f"{poller.duplicates} repetidos ignorados"
+                + ("" if drained else f"; {update_queue.depth()} ficaram para o próximo start")
+            )
+        )
@@ -1,16 +1,69 @@
 import os
 import logging
-import requests
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Dict, Optional, Tuple, Union
+
+from prices.services.http_client import get_session
+from .send_queue import get_send_dispatcher
+from .static_replies import get_static_reply
 
 logger = logging.getLogger(__name__)
 
 TELEGRAM_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
-TELEGRAM_API_BASE = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}"
+# TELEGRAM_API_BASE aponta pra outro servidor (ex.: um Telegram fake em benchmark)
+TELEGRAM_API_BASE = os.environ.get("TELEGRAM_API_BASE") or f"https://api.telegram.org/bot{TELEGRAM_TOKEN}"
 GLOBAL_CHAT_ID = os.environ.get("PRICEBOT_GLOBAL_CHAT_ID")
+# envia pelo despachante com rate limit (telegram/services/send_queue.py); False = POST na hora
+SEND_QUEUE = os.environ.get("PRICEBOT_SEND_QUEUE", "True") == "True"
+# quanto quem precisa do message_id espera o envio sair da fila (s)
+SEND_WAIT_TIMEOUT = float(os.environ.get("PRICEBOT_SEND_WAIT_TIMEOUT", "30"))
+
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
 
 
-def safe_send_message(chat_id: int, text: str, reply_markup: dict | None = None, parse_mode: str | None = None) -> None:
+def _post(method: str, payload: Union[Dict[str, Any], bytes]) -> Tuple[int, Dict[str, Any]]:
+    url = f"{TELEGRAM_API_BASE}/{method}"
+    if isinstance(payload, bytes):
+        # corpo já serializado (respostas fixas, ver static_replies.py)
+        resp = get_session().post(url, data=payload, headers=_JSON_HEADERS, timeout=10)
+    else:
+        resp = get_session().post(url, json=payload, timeout=10)
+    try:
+        body = resp.json()
+    except ValueError:
+        body = {"description": resp.text}
+    return resp.status_code, body
+
+
+def _call(method: str, payload: Union[Dict[str, Any], bytes], chat_id: Any = None) -> Future:
+    """Future com o `result` da API (None se falhar). Com a fila, não bloqueia."""
+    if SEND_QUEUE:
+        return get_send_dispatcher(_post).submit(method, payload, chat_id)
+
+    future: Future = Future()
+    try:
+        status, body = _post(method, payload)
+    except Exception:
+        logger.exception("Falha no %s para %s", method, chat_id)
+        status, body = 0, {}
+    if status and status != 200:
+        logger.warning("Erro no %s para %s: %s", method, chat_id, body.get("description"))
+    future.set_result(body.get("result") if status == 200 else None)
+    return future
+
+
+def safe_send_message(
+    chat_id: int,
+    text: str,
+    reply_markup: dict | None = None,
+    parse_mode: str | None = None,
+    wait: bool = False,
+) -> int | None:
+    """
+    Enfileira a mensagem e segue. Com `wait=True`, espera o envio e devolve
+    o message_id (None se falhar).
+    """
     payload: dict = {
         "chat_id": chat_id,
         "text": text,
@@ -20,12 +73,33 @@ def safe_send_message(chat_id: int, text: str, reply_markup: dict | None = None,
     if reply_markup:
         payload["reply_markup"] = reply_markup
 
+    future = _call("sendMessage", payload, chat_id)
+    if not wait:
+        return None
     try:
-        resp = requests.post(f"{TELEGRAM_API_BASE}/sendMessage", json=payload, timeout=10)
-        if resp.status_code != 200:
-            logger.warning("Erro ao enviar mensagem para %s: %s", chat_id, resp.text)
-    except Exception:
-        logger.exception("Falha ao enviar mensagem para %s", chat_id)
+        result = future.result(timeout=SEND_WAIT_TIMEOUT)
+    except FutureTimeout:
+        logger.warning("Mensagem para %s não saiu da fila em %.0fs", chat_id, SEND_WAIT_TIMEOUT)
+        return None
+    return (result or {}).get("message_id")
+
+
+def send_static_reply(chat_id: int, key: str, language_code: Optional[str] = None) -> None:
+    """Envia uma resposta fixa do registro, com o JSON montado no import."""
+    _call("sendMessage", get_static_reply(key, language_code).payload_for(chat_id), chat_id)
+
+
+def safe_edit_message_text(chat_id: int, message_id: int, text: str, parse_mode: str | None = None) -> None:
+    payload: dict = {
+        "chat_id": chat_id,
+        "message_id": message_id,
+        "text": text,
+    }
+    if parse_mode:
+        payload["parse_mode"] = parse_mode
+
+    # mesma fila do chat: a edição sai depois da mensagem que ela edita
+    _call("editMessageText", payload, chat_id)
 
 
 def safe_answer_callback_query(callback_query_id: str, text: str | None = None) -> None:
@@ -33,9 +107,11 @@ def safe_answer_callback_query(callback_query_id: str, text: str | None = None)
     if text:
         payload["text"] = text
 
-    try:
-        resp = requests.post(f"{TELEGRAM_API_BASE}/answerCallbackQuery", json=payload, timeout=10)
-        if resp.status_code != 200:
-            logger.warning("Erro ao responder callback_query %s: %s", callback_query_id, resp.text)
-    except Exception:
-        logger.exception("Falha ao responder callback_query %s", callback_query_id)
+    _call("answerCallbackQuery", payload)
+
+
+def send_queue_stats() -> Dict[str, Any]:
+    # sem fila de envio não há dispatcher (e não vale criar um só pra métrica)
+    if not SEND_QUEUE:
+        return {"enabled": False}
+    return get_send_dispatcher(_post).stats()
@@ -1,6 +1,11 @@
 # telegram_app/formatters.py
 from typing import Dict, Any, List
 
+from prices.domain.offer import Offer
+
+# quantas ofertas a resposta do bot mostra (o agregador só ranqueia essas)
+MAX_OFFERS = 3
+
 
 def _format_currency(value: float, currency: str = "BRL") -> str:
     if currency == "BRL":
@@ -8,10 +13,18 @@ def _format_currency(value: float, currency: str = "BRL") -> str:
     return f"{currency} {value:.2f}"
 
 
-def format_price_response(result: Dict[str, Any], max_offers: int = 3) -> str:
+def _alternatives_note(offer: Offer) -> str:
+    # mesmo produto em outras fontes/lojas, agrupado pelo agregador
+    if not offer.alternatives:
+        return ""
+    plural = "s" if offer.alternatives > 1 else ""
+    return f" (+{offer.alternatives} oferta{plural} parecida{plural})"
+
+
+def format_price_response(result: Dict[str, Any], max_offers: int = MAX_OFFERS) -> str:
     query = (result.get("query") or "").strip()
     best = result.get("best")
-    offers: List[Dict[str, Any]] = result.get("results") or []
+    offers: List[Offer] = result.get("results") or []
 
     if not offers and not best:
         return f"❌ Não encontrei ofertas para {query or 'o produto informado'}."
@@ -21,7 +34,7 @@ def format_price_response(result: Dict[str, Any], max_offers: int = 3) -> str:
         offers = [best] + offers
 
     # filtra relevantes, se houver
-    relevant_offers = [o for o in offers if o.get("relevant")]
+    relevant_offers = [o for o in offers if o.relevant]
     if not relevant_offers:
         relevant_offers = offers
 
@@ -39,17 +52,17 @@ def format_price_response(result: Dict[str, Any], max_offers: int = 3) -> str:
 
     # --------- Bloco da melhor oferta ---------
     if best:
-        best_store_name = best.get("store", "Loja").split("(")[0].strip()
-        best_price = _format_currency(best["price"], best.get("currency", "BRL"))
+        best_store_name = (best.store or "Loja").split("(")[0].strip()
+        best_price = _format_currency(best.price, best.currency)
 
         header_lines.append("")
         header_lines.append("💰 Melhor oferta encontrada:")
         header_lines.append(
-            f"➡️{best_store_name} — {best_price}\n"
-            f"{best.get('title', 'Produto')}"
+            f"➡️{best_store_name} — {best_price}{_alternatives_note(best)}\n"
+            f"{best.title or 'Produto'}"
         )
-        if best.get("url"):
-            header_lines.append(best["url"])
+        if best.url:
+            header_lines.append(best.url)
 
     # --------- Bloco de outras ofertas ---------
     body_lines: List[str] = []
@@ -64,15 +77,15 @@ def format_price_response(result: Dict[str, Any], max_offers: int = 3) -> str:
         body_lines.append("")
         body_lines.append("📊 Outras ofertas:")
         for offer in other_offers:
-            price_str = _format_currency(offer["price"], offer.get("currency", "BRL"))
-            title = offer.get("title", "Produto")
-            url = offer.get("url") or ""
+            price_str = _format_currency(offer.price, offer.currency)
+            title = offer.title or "Produto"
+            url = offer.url or ""
 
             # pega o nome da loja certo pra CADA oferta,
             # não reaproveita o do best
-            offer_store_name = offer.get("store", "Loja").split("(")[0].strip()
+            offer_store_name = (offer.store or "Loja").split("(")[0].strip()
 
-            line = f"•{offer_store_name} — {price_str}\n {title}"
+            line = f"•{offer_store_name} — {price_str}{_alternatives_note(offer)}\n {title}"
             if url:
                 line += f"\nClique no link: {url}"
             body_lines.append(line)
@@ -1,18 +1,29 @@
 import logging
 import re
 import os
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
+
+from asgiref.sync import sync_to_async
 
 from prices.domain.makeup_terms import is_makeup_query
+from prices.domain.offer import Offer
 from prices.services.price_agregator import PriceAggregator
-from .bot_client import safe_send_message, safe_answer_callback_query 
-from .formatters import format_price_response
+from .bot_client import (
+    safe_answer_callback_query,
+    safe_edit_message_text,
+    safe_send_message,
+    send_static_reply,
+)
+from .formatters import MAX_OFFERS, format_price_response
+from .static_replies import category_key
 
 from telegram.models import SearchLog
 
 GLOBAL_CHAT_ID = os.environ.get("PRICEBOT_GLOBAL_CHAT_ID")
 # Hardcoded bot id (aceita ser hardcoded conforme pedido)
 BOT_ID = int(os.environ.get("TELEGRAM_BOT_ID", "8176839555"))
+# Manda um "buscando…" e vai editando a mensagem conforme as lojas respondem
+STREAM_RESULTS = os.environ.get("PRICEBOT_STREAM_RESULTS", "False") == "True"
 
 logger = logging.getLogger(__name__)
 
@@ -31,10 +42,14 @@ def extract_query_from_text(text: str) -> str:
     return t
 
 
-def handle_update(update: Dict[str, Any]) -> None:
+def _route_update(update: Dict[str, Any]) -> Optional[Tuple[int, Dict[str, Any], str, str]]:
     """
     Decide se o update é mensagem normal ou clique em botão (callback_query)
     e delega para o handler certo.
+
+    Tudo que não precisa de busca de preço é respondido aqui mesmo. Se o
+    update for uma busca, devolve (chat_id, message, text, query) para quem
+    chamou rodar o agregador (sync ou async).
     """
     # trata updates do tipo my_chat_member (quando o bot é adicionado/alterado em um chat)
     my_chat_member = update.get("my_chat_member")
@@ -46,21 +61,22 @@ def handle_update(update: Dict[str, Any]) -> None:
         if user.get("is_bot") and user.get("id") == BOT_ID:
             print(f"Bot adicionado ao grupo (my_chat_member): id={chat.get('id')}, title={chat.get('title')}")
             logger.info("Bot adicionado via my_chat_member: %s (%s)", chat.get("title"), chat.get("id"))
-        return
+        return None
 
     callback = update.get("callback_query")
     if callback:
         handle_callback_query(callback)
-        return
+        return None
 
     message = update.get("message") or update.get("edited_message")
     if not message:
         logger.info("Update sem message nem callback_query: %s", update)
-        return
+        return None
 
     chat = message.get("chat") or {}
     chat_id = chat.get("id")
     text = message.get("text") or ""
+    language_code = (message.get("from") or {}).get("language_code")
 
     # Verifica se há novos membros na mensagem (quando o bot é adicionado)
     new_members = message.get("new_chat_members") or []
@@ -71,45 +87,111 @@ def handle_update(update: Dict[str, Any]) -> None:
 
     if chat_id is None:
         logger.info("Message sem chat_id: %s", message)
-        return
+        return None
 
     if text.startswith("/start"):
-        send_start_message_with_categories(chat_id)
-        return
+        send_start_message_with_categories(chat_id, language_code)
+        return None
 
     query = extract_query_from_text(text)
     
     if not is_makeup_query(query):
-        safe_send_message(
-            chat_id,
-            "Este bot funciona somente com produtos de maquiagem 💄\n"
-            "Tente algo como:\n"
-            "• gloss liphoney\n"
-            "• base ruby rose\n"
-            "• paleta bruna tavares"
-    )
-        return
+        send_static_reply(chat_id, "not_makeup", language_code)
+        return None
     
     if not query:
-        safe_send_message(
-            chat_id,
-            "Não entendi o produto 😅\n"
-            "Tenta algo como:\n"
-            "Quais são as ofertas de base matte para pele oleosa?",
-        )
-        return
+        send_static_reply(chat_id, "empty_query", language_code)
+        return None
     
 
     logger.info("Consulta do bot: %s (query: %s)", text, query)
+    return chat_id, message, text, query
+
+
+def handle_update(update: Dict[str, Any]) -> None:
+    routed = _route_update(update)
+    if routed is None:
+        return
+
+    chat_id, message, text, query = routed
+    if STREAM_RESULTS:
+        result = _stream_search_result(chat_id, query)
+        _deliver_search_result(chat_id, message, text, query, result, already_sent=True)
+        return
 
     aggregator = PriceAggregator()
-    result = aggregator.search_all(query)
+    result = aggregator.search_all(query, limit=MAX_OFFERS)
+    _deliver_search_result(chat_id, message, text, query, result)
 
-    message_text = format_price_response(result)
-    safe_send_message(chat_id, message_text)
+
+async def ahandle_update(update: Dict[str, Any]) -> None:
+    """
+    Versão async do handle_update: a busca nas fontes roda no event loop;
+    envio de mensagens e ORM continuam sync, via sync_to_async.
+    """
+    routed = await sync_to_async(_route_update)(update)
+    if routed is None:
+        return
+
+    chat_id, message, text, query = routed
+    if STREAM_RESULTS:
+        # o streaming edita a mensagem a cada fonte; roda no modo com threads
+        result = await sync_to_async(_stream_search_result, thread_sensitive=False)(chat_id, query)
+        await sync_to_async(_deliver_search_result)(
+            chat_id, message, text, query, result, already_sent=True
+        )
+        return
+
+    aggregator = PriceAggregator()
+    result = await aggregator.asearch_all(query, limit=MAX_OFFERS)
+    await sync_to_async(_deliver_search_result)(chat_id, message, text, query, result)
+
+
+def _stream_search_result(chat_id: int, query: str) -> Dict[str, Any]:
+    """
+    Envia um "buscando…" e edita essa mensagem a cada resultado parcial do
+    agregador, até o final. Devolve o resultado final.
+    """
+    message_id = safe_send_message(chat_id, f"🔎 Buscando ofertas para {query}…", wait=True)
+
+    aggregator = PriceAggregator()
+    last_text = None
+    result: Dict[str, Any] = {"query": query, "results": [], "best": None}
+    for result in aggregator.iter_search(query, limit=MAX_OFFERS):
+        message_text = format_price_response(result)
+        if result.get("partial"):
+            message_text += "\n\n⏳ Ainda buscando em outras lojas…"
+
+        # sem o message_id não dá pra editar: espera o final e manda normal
+        if message_id is None or message_text == last_text:
+            continue
+        safe_edit_message_text(chat_id, message_id, message_text)
+        last_text = message_text
+
+    if message_id is None:
+        safe_send_message(chat_id, format_price_response(result))
+
+    return result
+
+
+def _deliver_search_result(
+    chat_id: int,
+    message: Dict[str, Any],
+    text: str,
+    query: str,
+    result: Dict[str, Any],
+    already_sent: bool = False,
+) -> None:
+    """
+    Envia a resposta da busca (se o streaming ainda não mandou), pergunta de
+    follow-up, grava o SearchLog e faz o broadcast pro grupo global.
+    """
+    if not already_sent:
+        message_text = format_price_response(result)
+        safe_send_message(chat_id, message_text)
 
     # pergunta se quer nova busca / encerrar
-    send_followup_question(chat_id)
+    send_followup_question(chat_id, (message.get("from") or {}).get("language_code"))
 
     # ---- LOG NO BANCO ----
     best = result.get("best")
@@ -120,10 +202,10 @@ def handle_update(update: Dict[str, Any]) -> None:
             username=message["from"].get("username"),
             query_raw=text,
             query_clean=query,
-            best_store=best.get("store") if best else None,
-            best_title=best.get("title") if best else None,
-            best_price=best.get("price") if best else None,
-            best_url=best.get("url") if best else None,
+            best_store=best.store if best else None,
+            best_title=best.title if best else None,
+            best_price=best.price if best else None,
+            best_url=best.url if best else None,
         )
     except Exception:
         logger.exception("Erro ao salvar SearchLog")
@@ -137,10 +219,10 @@ def handle_update(update: Dict[str, Any]) -> None:
             logger.warning("PRICEBOT_GLOBAL_CHAT_ID inválido: %s", GLOBAL_CHAT_ID)
             return
 
-        store_name = (best.get("store") or "Loja").split("(")[0].strip()
-        price = best.get("price")
-        title = best.get("title") or "Produto"
-        url = best.get("url") or ""
+        store_name = (best.store or "Loja").split("(")[0].strip()
+        price = best.price
+        title = best.title or "Produto"
+        url = best.url or ""
 
         # formata preço de forma segura
         if isinstance(price, (int, float)):
@@ -168,7 +250,7 @@ def handle_update(update: Dict[str, Any]) -> None:
 
 
 
-def _broadcast_best_offer_to_global(query: str, best: Dict[str, Any]) -> None:
+def _broadcast_best_offer_to_global(query: str, best: Offer) -> None:
     """Envia a melhor oferta para o grupo/canal global, de forma anônima."""
     if not GLOBAL_CHAT_ID:
         return
@@ -179,11 +261,11 @@ def _broadcast_best_offer_to_global(query: str, best: Dict[str, Any]) -> None:
         logger.warning("PRICEBOT_GLOBAL_CHAT_ID inválido: %s", GLOBAL_CHAT_ID)
         return
 
-    store_name = (best.get("store") or "Loja").split("(")[0].strip()
-    price = best.get("price")
-    currency = best.get("currency", "BRL")
-    title = best.get("title") or "Produto"
-    url = best.get("url") or ""
+    store_name = (best.store or "Loja").split("(")[0].strip()
+    price = best.price
+    currency = best.currency
+    title = best.title or "Produto"
+    url = best.url or ""
 
     price_str = format_price_response(price, currency)
 
@@ -202,70 +284,16 @@ def _broadcast_best_offer_to_global(query: str, best: Dict[str, Any]) -> None:
     text = "\n".join(lines)
     safe_send_message(chat_id, text)  # sem parse_mode pra evitar erro de Markdown
 
-def send_followup_question(chat_id: int) -> None:
+def send_followup_question(chat_id: int, language_code: Optional[str] = None) -> None:
     """
     Envia uma mensagem com botões perguntando se o usuário quer mais alguma coisa.
     """
-    reply_markup = {
-        "inline_keyboard": [
-            [
-                {"text": "🔎 Nova busca", "callback_data": "action:new_search"},
-                {"text": "❌ Encerrar", "callback_data": "action:close"},
-            ]
-        ]
-    }
-
-    text = (
-        "Posso te ajudar com mais alguma coisa? 🙂\n\n"
-        "Você pode:\n"
-        "• Fazer uma *nova busca* clicando em \"Nova busca\"\n"
-        "• Ou simplesmente digitar o nome de outro produto"
-    )
-
-    safe_send_message(
-        chat_id,
-        text,
-        reply_markup=reply_markup,
-        
-    )
-
-
-
-def send_start_message_with_categories(chat_id: int) -> None:
-
-    reply_markup = {
-        "inline_keyboard": [
-            [
-                {"text": "💄 Rosto",    "callback_data": "cat:face"},
-                {"text": "👁️ Olhos",   "callback_data": "cat:eyes"},
-            ],
-            [
-                {"text": "💋 Lábios",   "callback_data": "cat:lips"},
-                {"text": "🧴 Skincare", "callback_data": "cat:skincare"},
-            ],
-            [
-                {"text": "🛍️ Tudo",    "callback_data": "cat:all"},
-            ],
-        ]
-    }
-
-    text = (
-        "Oi! Eu sou o MakeOfertas Bot 💄\n\n"
-        "Te ajudo a achar ofertas de maquiagem e beleza em grandes lojas online.\n\n"
-        "Você pode escolher uma categoria aqui embaixo ou simplesmente me dizer o que procura, "
-        "por exemplo:\n"
-        "• base para pele oleosa\n"
-        "• batom vermelho matte\n"
-        "• máscara de cílios à prova d’água\n"
-        "• paleta de sombra neutra\n"
-    )
+    # texto e botões montados uma vez só (static_replies.py)
+    send_static_reply(chat_id, "followup", language_code)
 
-    safe_send_message(
-        chat_id,
-        text,
-        reply_markup=reply_markup,
-    )
 
+def send_start_message_with_categories(chat_id: int, language_code: Optional[str] = None) -> None:
+    send_static_reply(chat_id, "start", language_code)
 
 
 def handle_callback_query(callback: Dict[str, Any]) -> None:
@@ -283,68 +311,15 @@ def handle_callback_query(callback: Dict[str, Any]) -> None:
     if chat_id is None:
         return
 
+    language_code = (callback.get("from") or {}).get("language_code")
+
     # -------- categorias de maquiagem --------
     if data.startswith("cat:"):
         category = data.split(":", 1)[1]
-
-        if category == "face":
-            text = (
-                "Beleza! Vamos procurar produtos para *rosto* 💄\n\n"
-                "Me manda o que você quer, por exemplo:\n"
-                "• base matte para pele oleosa\n"
-                "• corretivo alta cobertura\n"
-                "• pó compacto translúcido\n"
-            )
-        elif category == "eyes":
-            text = (
-                "Show! Vamos focar em *olhos* 👁️\n\n"
-                "Exemplos do que você pode pedir:\n"
-                "• máscara de cílios à prova d’água\n"
-                "• delineador líquido preto\n"
-                "• paleta de sombras neutra\n"
-            )
-        elif category == "lips":
-            text = (
-                "Ok, vamos de *lábios* 💋\n\n"
-                "Exemplos:\n"
-                "• batom vermelho matte\n"
-                "• gloss labial incolor\n"
-                "• lip tint rosado\n"
-            )
-        elif category == "skincare":
-            text = (
-                "Bora ver *skincare* 🧴\n\n"
-                "Você pode pedir coisas como:\n"
-                "• hidratante facial pele oleosa\n"
-                "• protetor solar rosto fps 50\n"
-                "• sérum vitamina C\n"
-            )
-        else:  # "all" ou qualquer outra coisa
-            text = (
-                "Categoria geral selecionada 🛍️\n\n"
-                "Me conta o que você está procurando, por exemplo:\n"
-                "• kit maquiagem básica\n"
-                "• necessaire\n"
-                "• espelho de maquiagem com luz\n"
-            )
-
-        # aqui eu usaria sem Markdown pra não dar erro; se quiser Markdown, tira os *...*
-        safe_send_message(chat_id, text)
+        send_static_reply(chat_id, category_key(category), language_code)
         return
 
     # -------- ações de follow-up (se você já tiver) --------
-    if data == "action:new_search":
-        safe_send_message(
-            chat_id,
-            "Beleza! Me manda o nome do próximo produto de maquiagem/beleza que você quer pesquisar 🕵️‍♀️",
-        )
+    if data in ("action:new_search", "action:close"):
+        send_static_reply(chat_id, data, language_code)
         return
-
-    if data == "action:close":
-        safe_send_message(
-            chat_id,
-            "Fechado! Se precisar, é só mandar outra mensagem ou usar /start 😄",
-        )
-        return
-
-
@@ -0,0 +1,20 @@
+# telegram/services/metrics.py
+"""Resumo de latência usado nas métricas das filas de updates e de envio."""
+import math
+from typing import Dict, List, Optional
+
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return round(sorted_values[index], 4)
+
+
+def latency_summary(values: List[float]) -> Dict[str, Optional[float]]:
+    values = sorted(values)
+    return {
+        "p50": _percentile(values, 50),
+        "p99": _percentile(values, 99),
+        "max": _percentile(values, 100),
+    }
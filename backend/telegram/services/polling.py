@@ -0,0 +1,123 @@
+# telegram/services/polling.py
+"""
+Ingestão por long polling (getUpdates), alternativa ao webhook: não
+precisa de endpoint HTTPS público.
+
+O offset só avança depois que o update entra na fila dos workers (a mesma
+UpdateQueue do webhook, com ordem por chat); fila cheia segura o polling,
+e o Telegram guarda o resto. Os updates só são confirmados pro Telegram
+na chamada seguinte (offset = último + 1), inclusive na última, feita no
+shutdown depois de esvaziar a fila (se não esvaziar a tempo, não confirma).
+"""
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from prices.services.http_client import get_session
+from .bot_client import TELEGRAM_API_BASE
+from .update_dedup import get_update_dedup
+from .update_queue import UpdateQueue
+
+logger = logging.getLogger(__name__)
+
+# espera entre tentativas quando o getUpdates falha (dobra até o teto)
+_BACKOFF_START = 1.0
+_BACKOFF_MAX = 30.0
+
+
+class TelegramConflict(Exception):
+    """409 no getUpdates: tem webhook configurado (ou outro poller rodando)."""
+
+
+class UpdatePoller:
+    def __init__(
+        self,
+        update_queue: UpdateQueue,
+        poll_timeout: int = 25,
+        limit: int = 100,
+        api_base: str = TELEGRAM_API_BASE,
+        dedup: bool = True,
+    ) -> None:
+        self.queue = update_queue
+        self.poll_timeout = poll_timeout
+        self.limit = limit
+        self.api_base = api_base
+        self.dedup = get_update_dedup() if dedup else None
+        self.offset: Optional[int] = None
+        self.stop_event = threading.Event()
+        self.received = 0
+        self.duplicates = 0
+
+    def _api(self, method: str, payload: Dict[str, Any], timeout: float) -> Any:
+        resp = get_session().post(f"{self.api_base}/{method}", json=payload, timeout=timeout)
+        if resp.status_code == 409:
+            raise TelegramConflict(resp.text)
+        resp.raise_for_status()
+        return resp.json().get("result")
+
+    def delete_webhook(self) -> None:
+        self._api("deleteWebhook", {}, timeout=10)
+
+    def get_updates(self, timeout: int) -> List[Dict[str, Any]]:
+        payload: Dict[str, Any] = {"timeout": timeout, "limit": self.limit}
+        if self.offset is not None:
+            payload["offset"] = self.offset
+        # o HTTP espera um pouco mais que o long poll do Telegram
+        return self._api("getUpdates", payload, timeout=timeout + 10) or []
+
+    def _enqueue(self, update: Dict[str, Any]) -> bool:
+        """Põe o update na fila (esperando vaga); False se pediram pra parar antes."""
+        update_id = update["update_id"]
+        if self.dedup is not None and self.dedup.check_and_remember(update_id):
+            self.duplicates += 1
+            return True
+
+        while not self.queue.submit(update, timeout=1.0):
+            if self.stop_event.is_set():
+                # não entrou: o getUpdates do próximo start entrega de novo
+                if self.dedup is not None:
+                    self.dedup.forget(update_id)
+                return False
+        return True
+
+    def poll_once(self, timeout: Optional[int] = None) -> int:
+        """Um getUpdates + enfileiramento; devolve quantos updates vieram."""
+        updates = self.get_updates(self.poll_timeout if timeout is None else timeout)
+        for update in updates:
+            if not self._enqueue(update):
+                break
+            self.offset = update["update_id"] + 1
+            self.received += 1
+        return len(updates)
+
+    def run(self) -> None:
+        backoff = _BACKOFF_START
+        while not self.stop_event.is_set():
+            try:
+                self.poll_once()
+            except TelegramConflict:
+                raise
+            except Exception:
+                logger.exception("Erro no getUpdates; tentando de novo em %.0fs", backoff)
+                self.stop_event.wait(backoff)
+                backoff = min(backoff * 2, _BACKOFF_MAX)
+                continue
+            backoff = _BACKOFF_START
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def shutdown(self, drain_timeout: float) -> bool:
+        """Esvazia a fila e confirma pro Telegram o que foi processado."""
+        drained = self.queue.drain(drain_timeout)
+        if not drained:
+            # sem confirmar: o Telegram entrega de novo no próximo start
+            logger.warning("Encerrando com %d updates ainda na fila", self.queue.depth())
+            return False
+        if self.offset is not None:
+            try:
+                # offset confirma tudo antes dele; limit=1/timeout=0 só pra confirmar
+                self._api("getUpdates", {"offset": self.offset, "limit": 1, "timeout": 0}, timeout=10)
+            except Exception:
+                logger.exception("Erro ao confirmar o offset %s no shutdown", self.offset)
+        return True
@@ -0,0 +1,314 @@
+# telegram/services/send_queue.py
+"""
+Despachante das chamadas de envio pro Telegram (sendMessage,
+editMessageText, answerCallbackQuery).
+
+Quem manda mensagem só enfileira e segue; as threads daqui fazem o POST
+respeitando os limites do Telegram:
+
+- token bucket global (~30 msg/s por bot) e um por chat (~1 msg/s, com uma
+  rajadinha pra resposta + pergunta de follow-up saírem juntas);
+- ordem por chat: cada chat tem sua fila e só uma chamada em voo por vez,
+  então a edição nunca passa na frente da mensagem que ela edita;
+- 429: respeita o `retry_after` da resposta, segura o chat e tenta de novo
+  (até PRICEBOT_SEND_MAX_RETRIES), no começo da fila do chat.
+
+Cada envio devolve um Future com o `result` da API (None se falhou).
+"""
+import atexit
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple, Union
+
+from prices.services.source_limits import TokenBucket
+from .metrics import latency_summary
+
+logger = logging.getLogger(__name__)
+
+SEND_GLOBAL_RATE = float(os.environ.get("PRICEBOT_SEND_GLOBAL_RATE", "30"))
+SEND_CHAT_RATE = float(os.environ.get("PRICEBOT_SEND_CHAT_RATE", "1"))
+SEND_CHAT_BURST = int(os.environ.get("PRICEBOT_SEND_CHAT_BURST", "3"))
+SEND_WORKERS = int(os.environ.get("PRICEBOT_SEND_WORKERS", "4"))
+SEND_QUEUE_SIZE = int(os.environ.get("PRICEBOT_SEND_QUEUE_SIZE", "5000"))
+SEND_MAX_RETRIES = int(os.environ.get("PRICEBOT_SEND_MAX_RETRIES", "3"))
+# no shutdown, quanto tempo (s) esperar o que ainda está na fila sair
+SEND_DRAIN_TIMEOUT = float(os.environ.get("PRICEBOT_SEND_DRAIN_TIMEOUT", "5"))
+
+# acima disso, buckets de chats parados há tempo são descartados
+_MAX_CHAT_BUCKETS = 10_000
+
+# payload em dict ou já serializado em JSON (bytes)
+Payload = Union[Dict[str, Any], bytes]
+# (método, payload) -> (status HTTP, corpo JSON)
+PostFn = Callable[[str, Payload], Tuple[int, Dict[str, Any]]]
+
+
+class _Job:
+    __slots__ = ("method", "payload", "lane", "future", "enqueued_at", "attempts")
+
+    def __init__(self, method: str, payload: Payload, lane: Any) -> None:
+        self.method = method
+        self.payload = payload
+        self.lane = lane
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+        self.attempts = 0
+
+
+class SendDispatcher:
+    def __init__(
+        self,
+        post: PostFn,
+        global_rate: float = SEND_GLOBAL_RATE,
+        chat_rate: float = SEND_CHAT_RATE,
+        chat_burst: int = SEND_CHAT_BURST,
+        workers: int = SEND_WORKERS,
+        max_size: int = SEND_QUEUE_SIZE,
+        max_retries: int = SEND_MAX_RETRIES,
+    ) -> None:
+        self.post = post
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.workers = workers
+        self.max_size = max_size
+        self.max_retries = max_retries
+
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._seq = itertools.count()
+
+        # fila por chat ("lane"); chamadas sem chat ganham uma lane só delas
+        self._lanes: Dict[Any, Deque[_Job]] = {}
+        # lanes com chamada em voo (não voltam pro heap até terminar)
+        self._busy: Set[Any] = set()
+        # (pode sair a partir de, desempate, lane): cada lane com fila e sem
+        # chamada em voo está aqui exatamente uma vez
+        self._ready: List[Tuple[float, int, Any]] = []
+
+        self._global = TokenBucket(global_rate, int(global_rate)) if global_rate else None
+        self._chat_buckets: Dict[Any, TokenBucket] = {}
+
+        self.depth = 0
+        self.in_flight = 0
+        # (espera na fila, duração do POST) em s
+        self._timings: Deque[Tuple[float, float]] = deque(maxlen=500)
+        self._counters = {
+            "enqueued": 0,
+            "rejected": 0,
+            "sent": 0,
+            "failed": 0,
+            "retried_429": 0,
+            "dropped_429": 0,
+        }
+
+    # ------------- Enfileirar -------------
+
+    def submit(self, method: str, payload: Payload, chat_id: Any = None) -> Future:
+        """Enfileira a chamada e devolve na hora um Future com o `result` da API."""
+        lane = chat_id if chat_id is not None else ("call", next(self._seq))
+        job = _Job(method, payload, lane)
+
+        with self._cond:
+            if not self._threads:
+                self._start()
+
+            if self.depth >= self.max_size:
+                self._counters["rejected"] += 1
+                logger.warning("Fila de envio cheia (%d); %s para %s descartado", self.depth, method, chat_id)
+                job.future.set_result(None)
+                return job.future
+
+            lane_jobs = self._lanes.setdefault(lane, deque())
+            lane_jobs.append(job)
+            self.depth += 1
+            self._counters["enqueued"] += 1
+            if len(lane_jobs) == 1 and lane not in self._busy:
+                self._schedule(lane, job.enqueued_at)
+                self._cond.notify()
+        return job.future
+
+    def _start(self) -> None:
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"telegram-send-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        atexit.register(self.drain, SEND_DRAIN_TIMEOUT)
+
+    def _schedule(self, lane: Any, ready_at: float) -> None:
+        heapq.heappush(self._ready, (ready_at, next(self._seq), lane))
+
+    # ------------- Limites -------------
+
+    def _chat_bucket(self, lane: Any) -> Optional[TokenBucket]:
+        if isinstance(lane, tuple) or not self.chat_rate:
+            return None
+        bucket = self._chat_buckets.get(lane)
+        if bucket is None:
+            if len(self._chat_buckets) >= _MAX_CHAT_BUCKETS:
+                self._prune_buckets()
+            bucket = self._chat_buckets[lane] = TokenBucket(self.chat_rate, self.chat_burst)
+        return bucket
+
+    def _prune_buckets(self) -> None:
+        # chat parado há tempo suficiente pra encher o balde não perde nada
+        idle_for = self.chat_burst / self.chat_rate
+        now = time.monotonic()
+        for lane, bucket in list(self._chat_buckets.items()):
+            if lane not in self._lanes and now - bucket.updated_at > idle_for and now > bucket.blocked_until:
+                del self._chat_buckets[lane]
+
+    def _take_tokens(self, lane: Any) -> float:
+        """0 se a lane pode enviar agora (tokens consumidos); senão, quanto esperar."""
+        if self._global is not None:
+            wait = self._global.try_take()
+            if wait > 0:
+                return wait
+
+        bucket = self._chat_bucket(lane)
+        if bucket is not None:
+            wait = bucket.try_take()
+            if wait > 0:
+                if self._global is not None:
+                    # devolve o token global que não vai ser usado
+                    self._global.give_back()
+                return wait
+        return 0.0
+
+    # ------------- Workers -------------
+
+    def _next_job(self) -> _Job:
+        with self._cond:
+            while True:
+                if not self._ready:
+                    self._cond.wait()
+                    continue
+
+                ready_at, _, lane = self._ready[0]
+                now = time.monotonic()
+                if ready_at > now:
+                    self._cond.wait(ready_at - now)
+                    continue
+
+                heapq.heappop(self._ready)
+                wait = self._take_tokens(lane)
+                if wait > 0:
+                    self._schedule(lane, now + wait)
+                    continue
+
+                job = self._lanes[lane].popleft()
+                self._busy.add(lane)
+                self.depth -= 1
+                self.in_flight += 1
+                return job
+
+    def _run(self) -> None:
+        while True:
+            job = self._next_job()
+            started = time.monotonic()
+            try:
+                status, body = self.post(job.method, job.payload)
+            except Exception:
+                logger.exception("Falha no %s para %s", job.method, job.lane)
+                status, body = 0, {}
+            finished = time.monotonic()
+
+            retry_after = None
+            if status == 429:
+                retry_after = float((body.get("parameters") or {}).get("retry_after") or 1)
+            elif status != 200 and status:
+                logger.warning("Erro no %s para %s: %s", job.method, job.lane, body.get("description"))
+
+            with self._cond:
+                self.in_flight -= 1
+                self._busy.discard(job.lane)
+                self._timings.append((started - job.enqueued_at, finished - started))
+                lane_jobs = self._lanes[job.lane]
+                ready_at = finished
+
+                retry = retry_after is not None and job.attempts < self.max_retries
+                if retry:
+                    job.attempts += 1
+                    lane_jobs.appendleft(job)
+                    self.depth += 1
+                    self._counters["retried_429"] += 1
+                    ready_at = finished + retry_after
+                    self._pause(job.lane, retry_after)
+                elif retry_after is not None:
+                    self._counters["dropped_429"] += 1
+                elif status == 200:
+                    self._counters["sent"] += 1
+                else:
+                    self._counters["failed"] += 1
+
+                if lane_jobs:
+                    self._schedule(job.lane, ready_at)
+                else:
+                    del self._lanes[job.lane]
+                self._cond.notify_all()
+
+            if retry:
+                logger.warning(
+                    "HTTP 429 no %s para %s; tentando de novo em %.1fs", job.method, job.lane, retry_after
+                )
+                continue
+            job.future.set_result(body.get("result") if status == 200 else None)
+
+    def _pause(self, lane: Any, seconds: float) -> None:
+        bucket = self._chat_bucket(lane)
+        if bucket is not None:
+            bucket.pause(seconds)
+        elif self._global is not None:
+            self._global.pause(seconds)
+
+    # ------------- Shutdown / métricas -------------
+
+    def drain(self, timeout: float) -> bool:
+        """Espera a fila esvaziar (até `timeout`); True se esvaziou."""
+        give_up_at = time.monotonic() + timeout
+        with self._cond:
+            while self.depth or self.in_flight:
+                remaining = give_up_at - time.monotonic()
+                if remaining <= 0:
+                    logger.warning("Encerrando com %d envios na fila", self.depth)
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            counters = dict(self._counters)
+            data = {
+                "depth": self.depth,
+                "max_size": self.max_size,
+                "chats_waiting": len(self._lanes),
+                "in_flight": self.in_flight,
+                "workers": self.workers,
+            }
+            timings = list(self._timings)
+
+        return {
+            **counters,
+            **data,
+            "wait_seconds": latency_summary([wait for wait, _ in timings]),
+            "send_seconds": latency_summary([took for _, took in timings]),
+        }
+
+
+_dispatcher: Optional[SendDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_send_dispatcher(post: PostFn) -> SendDispatcher:
+    global _dispatcher
+
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = SendDispatcher(post)
+    return _dispatcher
@@ -0,0 +1,174 @@
+# telegram/services/static_replies.py
+"""
+Respostas fixas do bot (/start, categorias, follow-up, avisos), montadas e
+serializadas em JSON uma vez só, no import. No envio só entra o chat_id na
+frente dos bytes prontos: menu e botões não custam dict nem json.dumps.
+
+Cada resposta pode ter variantes por idioma (`language_code` do Telegram,
+ex.: "pt-br" -> "pt"); sem variante, vale a do idioma padrão.
+"""
+import json
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_LANGUAGE = "pt"
+
+
+class StaticReply:
+    __slots__ = ("key", "language", "text", "reply_markup", "_tail")
+
+    def __init__(self, key: str, text: str, reply_markup: Optional[Dict[str, Any]], language: str) -> None:
+        self.key = key
+        self.language = language
+        self.text = text
+        self.reply_markup = reply_markup
+
+        payload: Dict[str, Any] = {"text": text}
+        if reply_markup:
+            payload["reply_markup"] = reply_markup
+        # '{"text": ...}' sem o '{': o chat_id entra na frente em payload_for
+        self._tail = json.dumps(payload, ensure_ascii=False).encode("utf-8")[1:]
+
+    def payload_for(self, chat_id: int) -> bytes:
+        """Corpo JSON do sendMessage pra esse chat."""
+        return b'{"chat_id": %d, %s' % (chat_id, self._tail)
+
+
+_replies: Dict[Tuple[str, str], StaticReply] = {}
+
+
+def register(key: str, text: str, reply_markup: Optional[Dict[str, Any]] = None, language: str = DEFAULT_LANGUAGE) -> None:
+    _replies[(key, language)] = StaticReply(key, text, reply_markup, language)
+
+
+def get_static_reply(key: str, language_code: Optional[str] = None) -> StaticReply:
+    if language_code:
+        language = language_code.split("-", 1)[0].lower()
+        reply = _replies.get((key, language))
+        if reply is not None:
+            return reply
+    return _replies[(key, DEFAULT_LANGUAGE)]
+
+
+def category_key(category: str) -> str:
+    """Callback `cat:<categoria>`; categoria desconhecida cai em "cat:all"."""
+    key = f"cat:{category}"
+    return key if (key, DEFAULT_LANGUAGE) in _replies else "cat:all"
+
+
+# ------------- Respostas -------------
+
+register(
+    "start",
+    "Oi! Eu sou o MakeOfertas Bot 💄\n\n"
+    "Te ajudo a achar ofertas de maquiagem e beleza em grandes lojas online.\n\n"
+    "Você pode escolher uma categoria aqui embaixo ou simplesmente me dizer o que procura, "
+    "por exemplo:\n"
+    "• base para pele oleosa\n"
+    "• batom vermelho matte\n"
+    "• máscara de cílios à prova d’água\n"
+    "• paleta de sombra neutra\n",
+    {
+        "inline_keyboard": [
+            [
+                {"text": "💄 Rosto",    "callback_data": "cat:face"},
+                {"text": "👁️ Olhos",   "callback_data": "cat:eyes"},
+            ],
+            [
+                {"text": "💋 Lábios",   "callback_data": "cat:lips"},
+                {"text": "🧴 Skincare", "callback_data": "cat:skincare"},
+            ],
+            [
+                {"text": "🛍️ Tudo",    "callback_data": "cat:all"},
+            ],
+        ]
+    },
+)
+
+register(
+    "followup",
+    "Posso te ajudar com mais alguma coisa? 🙂\n\n"
+    "Você pode:\n"
+    "• Fazer uma *nova busca* clicando em \"Nova busca\"\n"
+    "• Ou simplesmente digitar o nome de outro produto",
+    {
+        "inline_keyboard": [
+            [
+                {"text": "🔎 Nova busca", "callback_data": "action:new_search"},
+                {"text": "❌ Encerrar", "callback_data": "action:close"},
+            ]
+        ]
+    },
+)
+
+register(
+    "not_makeup",
+    "Este bot funciona somente com produtos de maquiagem 💄\n"
+    "Tente algo como:\n"
+    "• gloss liphoney\n"
+    "• base ruby rose\n"
+    "• paleta bruna tavares",
+)
+
+register(
+    "empty_query",
+    "Não entendi o produto 😅\n"
+    "Tenta algo como:\n"
+    "Quais são as ofertas de base matte para pele oleosa?",
+)
+
+# aqui eu usaria sem Markdown pra não dar erro; se quiser Markdown, tira os *...*
+register(
+    "cat:face",
+    "Beleza! Vamos procurar produtos para *rosto* 💄\n\n"
+    "Me manda o que você quer, por exemplo:\n"
+    "• base matte para pele oleosa\n"
+    "• corretivo alta cobertura\n"
+    "• pó compacto translúcido\n",
+)
+
+register(
+    "cat:eyes",
+    "Show! Vamos focar em *olhos* 👁️\n\n"
+    "Exemplos do que você pode pedir:\n"
+    "• máscara de cílios à prova d’água\n"
+    "• delineador líquido preto\n"
+    "• paleta de sombras neutra\n",
+)
+
+register(
+    "cat:lips",
+    "Ok, vamos de *lábios* 💋\n\n"
+    "Exemplos:\n"
+    "• batom vermelho matte\n"
+    "• gloss labial incolor\n"
+    "• lip tint rosado\n",
+)
+
+register(
+    "cat:skincare",
+    "Bora ver *skincare* 🧴\n\n"
+    "Você pode pedir coisas como:\n"
+    "• hidratante facial pele oleosa\n"
+    "• protetor solar rosto fps 50\n"
+    "• sérum vitamina C\n",
+)
+
+# "all" ou qualquer outra coisa
+register(
+    "cat:all",
+    "Categoria geral selecionada 🛍️\n\n"
+    "Me conta o que você está procurando, por exemplo:\n"
+    "• kit maquiagem básica\n"
+    "• necessaire\n"
+    "• espelho de maquiagem com luz\n",
+)
+
+register(
+    "action:new_search",
+    "Beleza! Me manda o nome do próximo produto de maquiagem/beleza que você quer pesquisar 🕵️‍♀️",
+)
+
+register(
+    "action:close",
+    "Fechado! Se precisar, é só mandar outra mensagem ou usar /start 😄",
+)
@@ -0,0 +1,234 @@
+# telegram/services/update_dedup.py
+"""
+Descarta update_id repetido (o Telegram reenvia quando o webhook demora),
+antes de enfileirar: reenvio não paga uma segunda busca nem manda resposta
+duplicada.
+
+- Anel em memória: os últimos PRICEBOT_UPDATE_DEDUP_SIZE update_ids, exato.
+- Bloom filter em duas gerações (trocadas a cada meia janela): recebe o que
+  sai do anel por tamanho e cobre até o fim da janela, em pouca memória.
+  Falso positivo é possível, mas fica em poucos por milhão.
+- Opcional, PRICEBOT_UPDATE_DEDUP_DB=<arquivo .sqlite3>: tabela
+  compartilhada entre os workers do host, pra reenvio que cai em outro
+  processo.
+
+Consulta e registro são um passo só (`check_and_remember`): dois reenvios
+simultâneos não passam os dois. Se a fila recusar o update, `forget` desfaz
+o registro pra o próximo reenvio do Telegram passar.
+"""
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+UPDATE_DEDUP_SIZE = int(os.environ.get("PRICEBOT_UPDATE_DEDUP_SIZE", "10000"))
+# por quanto tempo (s) um update_id conta como repetido
+UPDATE_DEDUP_WINDOW = float(os.environ.get("PRICEBOT_UPDATE_DEDUP_WINDOW", "3600"))
+UPDATE_DEDUP_DB = os.environ.get("PRICEBOT_UPDATE_DEDUP_DB", "")
+
+_BLOOM_FP_RATE = 1e-6
+_MASK64 = (1 << 64) - 1
+
+
+def _mix64(value: int) -> int:
+    # splitmix64: espalha ids sequenciais pelos bits
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, fp_rate: float = _BLOOM_FP_RATE) -> None:
+        self.size = max(64, int(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: int):
+        # double hashing: h1 + i*h2 com as duas metades do mix
+        mixed = _mix64(value)
+        h1, h2 = mixed & 0xFFFFFFFF, (mixed >> 32) | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, value: int) -> None:
+        for pos in self._positions(value):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, value: int) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+
+class SqliteSeenUpdates:
+    def __init__(self, path: str, window: float) -> None:
+        self.path = path
+        self.window = window
+        self._local = threading.local()
+        self._inserts = 0
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS processed_updates ("
+            "update_id INTEGER PRIMARY KEY, seen_at REAL NOT NULL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def claim(self, update_id: int) -> bool:
+        """
+        Registra o update_id; False se já estava lá dentro da janela. Um
+        statement só (registro vencido é renovado), atômico entre processos.
+        """
+        now = time.time()
+        conn = self._connect()
+        cursor = conn.execute(
+            "INSERT INTO processed_updates (update_id, seen_at) VALUES (?, ?) "
+            "ON CONFLICT (update_id) DO UPDATE SET seen_at = excluded.seen_at "
+            "WHERE processed_updates.seen_at < ?",
+            (update_id, now, now - self.window),
+        )
+        claimed = cursor.rowcount > 0
+        if claimed:
+            self._inserts += 1
+            if self._inserts % 1000 == 0:
+                conn.execute("DELETE FROM processed_updates WHERE seen_at < ?", (now - self.window,))
+        return claimed
+
+    def forget(self, update_id: int) -> None:
+        self._connect().execute("DELETE FROM processed_updates WHERE update_id = ?", (update_id,))
+
+
+class UpdateDedup:
+    def __init__(
+        self,
+        size: int = UPDATE_DEDUP_SIZE,
+        window: float = UPDATE_DEDUP_WINDOW,
+        db_path: str = UPDATE_DEDUP_DB,
+    ) -> None:
+        self.window = window
+        self._lock = threading.Lock()
+        # (update_id, visto em)
+        self._ring: Deque[Tuple[int, float]] = deque()
+        self._ring_ids: Set[int] = set()
+        self.size = size
+
+        # geração atual recebe o que sai do anel; a anterior só é consultada
+        self._bloom = BloomFilter(size)
+        self._previous_bloom = BloomFilter(size)
+        self._bloom_started = time.monotonic()
+        self._bloom_count = 0
+
+        self.shared: Optional[SqliteSeenUpdates] = (
+            SqliteSeenUpdates(db_path, window) if db_path else None
+        )
+        self._counters: Dict[str, int] = {"checked": 0, "duplicates": 0, "shared_duplicates": 0}
+
+    def _rotate(self, now: float) -> None:
+        # meia janela por geração (ou geração cheia): o que sai foi visto há mais de meia janela
+        if now - self._bloom_started >= self.window / 2 or self._bloom_count >= self.size:
+            self._previous_bloom = self._bloom
+            self._bloom = BloomFilter(self.size)
+            self._bloom_started = now
+            self._bloom_count = 0
+
+    def _expire(self, now: float) -> None:
+        while self._ring and (
+            len(self._ring) > self.size or now - self._ring[0][1] > self.window
+        ):
+            old_id, seen_at = self._ring.popleft()
+            self._ring_ids.discard(old_id)
+            if now - seen_at <= self.window:
+                # saiu por tamanho, ainda dentro da janela: passa pro bloom
+                self._rotate(now)
+                self._bloom.add(old_id)
+                self._bloom_count += 1
+
+    def _seen_locally(self, update_id: int, now: float) -> bool:
+        self._expire(now)
+        if update_id in self._ring_ids:
+            return True
+        return update_id in self._bloom or update_id in self._previous_bloom
+
+    def _remember(self, update_id: int, now: float) -> None:
+        self._ring.append((update_id, now))
+        self._ring_ids.add(update_id)
+        self._expire(now)
+
+    def _forget(self, update_id: int) -> None:
+        if update_id in self._ring_ids:
+            self._ring_ids.discard(update_id)
+            # acabou de entrar: procura do fim pro começo
+            for i in range(len(self._ring) - 1, -1, -1):
+                if self._ring[i][0] == update_id:
+                    del self._ring[i]
+                    break
+
+    def check_and_remember(self, update_id: int) -> bool:
+        """
+        True se o update_id já foi aceito dentro da janela; senão registra
+        e devolve False, na mesma operação.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._counters["checked"] += 1
+            if self._seen_locally(update_id, now):
+                self._counters["duplicates"] += 1
+                return True
+            self._remember(update_id, now)
+
+        if self.shared is not None:
+            try:
+                claimed = self.shared.claim(update_id)
+            except sqlite3.Error:
+                # na dúvida, processa: melhor responder duas vezes que nenhuma
+                logger.exception("Erro no dedup compartilhado de updates")
+                return False
+            if not claimed:
+                with self._lock:
+                    # o dono é outro processo: se ele desistir (`forget`), o reenvio tem que passar aqui
+                    self._forget(update_id)
+                    self._counters["duplicates"] += 1
+                    self._counters["shared_duplicates"] += 1
+                return True
+        return False
+
+    def forget(self, update_id: int) -> None:
+        """Desfaz o `check_and_remember` de um update que a fila recusou."""
+        with self._lock:
+            self._forget(update_id)
+
+        if self.shared is not None:
+            try:
+                self.shared.forget(update_id)
+            except sqlite3.Error:
+                logger.exception("Erro no dedup compartilhado de updates")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            data = dict(self._counters)
+            data["ring_size"] = len(self._ring)
+        return data
+
+
+_dedup: Optional[UpdateDedup] = None
+_dedup_lock = threading.Lock()
+
+
+def get_update_dedup() -> UpdateDedup:
+    global _dedup
+
+    if _dedup is None:
+        with _dedup_lock:
+            if _dedup is None:
+                _dedup = UpdateDedup()
+    return _dedup
@@ -0,0 +1,181 @@
+# telegram/services/update_queue.py
+"""
+Fila de updates do webhook: o view só valida e enfileira, e responde 200
+na hora; quem roda busca, envio de mensagens e SearchLog são as threads
+daqui. Assim o Telegram não reenvia update por webhook lento.
+
+A fila é limitada e em memória: cheia, o webhook responde 503 e o próprio
+Telegram reenvia depois. Update que já estava na fila se perde se o
+processo cair (foi confirmado com 200).
+
+Cada worker tem sua fila e os updates vão pra ela pelo chat: updates do
+mesmo chat são processados em ordem, um de cada vez.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from django.db import close_old_connections
+
+from .metrics import latency_summary
+
+logger = logging.getLogger(__name__)
+
+UPDATE_QUEUE_SIZE = int(os.environ.get("PRICEBOT_UPDATE_QUEUE_SIZE", "1000"))
+UPDATE_WORKERS = int(os.environ.get("PRICEBOT_UPDATE_WORKERS", "4"))
+# janela das métricas de espera/processamento (nº de updates)
+UPDATE_METRICS_WINDOW = int(os.environ.get("PRICEBOT_UPDATE_METRICS_WINDOW", "500"))
+
+
+def update_chat_id(update: Dict[str, Any]) -> Optional[int]:
+    """Chat de onde veio o update (None se não der pra saber)."""
+    message = update.get("message") or update.get("edited_message")
+    if message is None:
+        callback = update.get("callback_query") or {}
+        message = callback.get("message")
+    if message is not None:
+        return (message.get("chat") or {}).get("id")
+    member = update.get("my_chat_member") or {}
+    return (member.get("chat") or {}).get("id")
+
+
+class UpdateQueue:
+    def __init__(
+        self,
+        handler: Callable[[Dict[str, Any]], None],
+        max_size: int = UPDATE_QUEUE_SIZE,
+        workers: int = UPDATE_WORKERS,
+    ) -> None:
+        self.handler = handler
+        self.workers = workers
+        # uma fila por worker; (update, instante em que entrou na fila)
+        per_worker = max(1, max_size // workers)
+        self._queues: List["queue.Queue[Tuple[Dict[str, Any], float]]"] = [
+            queue.Queue(maxsize=per_worker) for _ in range(workers)
+        ]
+        self.max_size = per_worker * workers
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+        # (espera na fila, tempo de processamento) em s
+        self._timings: Deque[Tuple[float, float]] = deque(maxlen=UPDATE_METRICS_WINDOW)
+        self._counters = {"enqueued": 0, "rejected": 0, "processed": 0, "failed": 0}
+        self.in_flight = 0
+
+    def _count(self, name: str, delta: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += delta
+
+    def _start(self) -> None:
+        # threads sobem na primeira chamada, não no import (manage.py, migrations…)
+        with self._lock:
+            if self._threads:
+                return
+            for i, worker_queue in enumerate(self._queues):
+                thread = threading.Thread(
+                    target=self._run, args=(worker_queue,), name=f"telegram-update-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _queue_for(self, update: Dict[str, Any]) -> "queue.Queue":
+        chat_id = update_chat_id(update)
+        key = chat_id if chat_id is not None else update.get("update_id", 0)
+        return self._queues[hash(key) % len(self._queues)]
+
+    def submit(self, update: Dict[str, Any], timeout: Optional[float] = None) -> bool:
+        """
+        Enfileira; False se a fila do worker estiver cheia. Sem `timeout` não
+        bloqueia; com ele, espera até `timeout` s por espaço.
+        """
+        if not self._threads:
+            self._start()
+        try:
+            self._queue_for(update).put(
+                (update, time.monotonic()), block=timeout is not None, timeout=timeout
+            )
+        except queue.Full:
+            self._count("rejected")
+            logger.warning(
+                "Fila de updates cheia (%d); update %s recusado",
+                self.max_size,
+                update.get("update_id"),
+            )
+            return False
+        self._count("enqueued")
+        return True
+
+    def _run(self, worker_queue: "queue.Queue") -> None:
+        while True:
+            update, enqueued_at = worker_queue.get()
+            started = time.monotonic()
+            with self._lock:
+                self.in_flight += 1
+            try:
+                self.handler(update)
+            except Exception:
+                self._count("failed")
+                logger.exception("Erro ao processar update %s", update.get("update_id"))
+            else:
+                self._count("processed")
+            finally:
+                finished = time.monotonic()
+                with self._lock:
+                    self.in_flight -= 1
+                    self._timings.append((started - enqueued_at, finished - started))
+                # a thread é reaproveitada: não deixa conexão do banco velha pra trás
+                close_old_connections()
+                worker_queue.task_done()
+
+    def depth(self) -> int:
+        return sum(worker_queue.qsize() for worker_queue in self._queues)
+
+    def join(self) -> None:
+        """Espera a fila esvaziar (útil em teste/shutdown)."""
+        for worker_queue in self._queues:
+            worker_queue.join()
+
+    def drain(self, timeout: float) -> bool:
+        """Como `join`, mas desiste depois de `timeout` s; True se esvaziou."""
+        give_up_at = time.monotonic() + timeout
+        while any(worker_queue.unfinished_tasks for worker_queue in self._queues):
+            if time.monotonic() >= give_up_at:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            in_flight = self.in_flight
+            timings = list(self._timings)
+
+        return {
+            **counters,
+            "depth": self.depth(),
+            "max_size": self.max_size,
+            "workers": self.workers,
+            "in_flight": in_flight,
+            "wait_seconds": latency_summary([wait for wait, _ in timings]),
+            "processing_seconds": latency_summary([took for _, took in timings]),
+        }
+
+
+_update_queue: Optional[UpdateQueue] = None
+_update_queue_lock = threading.Lock()
+
+
+def get_update_queue() -> UpdateQueue:
+    global _update_queue
+
+    if _update_queue is None:
+        with _update_queue_lock:
+            if _update_queue is None:
+                from .handlers import handle_update
+
+                _update_queue = UpdateQueue(handle_update)
+    return _update_queue
@@ -1,3 +1,115 @@
-from django.test import TestCase
+import os
+import tempfile
+import threading
+import time
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from telegram.services.send_queue import SendDispatcher
+from telegram.services.update_dedup import UpdateDedup
+
+
+class UpdateDedupTests(SimpleTestCase):
+    def test_duplicate_in_ring(self):
+        dedup = UpdateDedup(size=10, window=3600)
+        self.assertFalse(dedup.check_and_remember(1))
+        self.assertTrue(dedup.check_and_remember(1))
+
+    def test_forget_lets_resend_through(self):
+        dedup = UpdateDedup(size=10, window=3600)
+        dedup.check_and_remember(1)
+        dedup.forget(1)
+        self.assertFalse(dedup.check_and_remember(1))
+
+    def test_duplicate_after_bloom_rotation(self):
+        # anel de 2: 1..3 saem pro bloom; a geração enche com 2 ids e roda
+        dedup = UpdateDedup(size=2, window=3600)
+        for update_id in range(1, 6):
+            self.assertFalse(dedup.check_and_remember(update_id))
+
+        # 1 e 2 estão na geração anterior, 3 na atual, 4 e 5 no anel
+        for update_id in range(1, 6):
+            with self.subTest(update_id=update_id):
+                self.assertTrue(dedup.check_and_remember(update_id))
+        self.assertEqual(dedup.stats()["duplicates"], 5)
+
+
+class SharedUpdateDedupTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        db_path = os.path.join(tmp.name, "dedup.sqlite3")
+        # dois workers do mesmo host
+        self.first = UpdateDedup(size=10, window=3600, db_path=db_path)
+        self.second = UpdateDedup(size=10, window=3600, db_path=db_path)
+
+    def test_duplicate_across_workers(self):
+        self.assertFalse(self.first.check_and_remember(7))
+        self.assertTrue(self.second.check_and_remember(7))
+        self.assertEqual(self.second.stats()["shared_duplicates"], 1)
+
+    def test_forget_releases_shared_claim(self):
+        self.first.check_and_remember(7)
+        self.assertTrue(self.second.check_and_remember(7))
+
+        # a fila do primeiro recusou: o reenvio pode cair no segundo
+        self.first.forget(7)
+        self.assertFalse(self.second.check_and_remember(7))
+        self.assertTrue(self.first.check_and_remember(7))
+
+
+class SendDispatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.calls = []
+        self.lock = threading.Lock()
+        self.throttled = set()
+
+    def fake_post(self, method, payload):
+        text = payload["text"]
+        with self.lock:
+            self.calls.append((payload["chat_id"], text, time.monotonic()))
+            if text == "a1" and text not in self.throttled:
+                self.throttled.add(text)
+                return 429, {"ok": False, "parameters": {"retry_after": 0.2}}
+        return 200, {"ok": True, "result": {"text": text}}
+
+    def sent(self, chat_id):
+        return [(text, at) for chat, text, at in self.calls if chat == chat_id]
+
+    def test_chat_order_kept_after_429(self):
+        dispatcher = SendDispatcher(self.fake_post, global_rate=0, chat_rate=1000, chat_burst=10, workers=3)
+        futures = [
+            dispatcher.submit("sendMessage", {"chat_id": chat_id, "text": text}, chat_id)
+            for chat_id, text in ((1, "a1"), (1, "a2"), (1, "a3"), (2, "b1"))
+        ]
+
+        results = [future.result(timeout=5) for future in futures]
+        self.assertEqual([r["text"] for r in results], ["a1", "a2", "a3", "b1"])
+
+        chat_a = self.sent(1)
+        self.assertEqual([text for text, _ in chat_a], ["a1", "a1", "a2", "a3"])
+        # a nova tentativa respeita o retry_after
+        self.assertGreaterEqual(chat_a[1][1] - chat_a[0][1], 0.2)
+        # o outro chat não espera o backoff
+        self.assertLess(self.sent(2)[0][1], chat_a[1][1])
+
+        stats = dispatcher.stats()
+        self.assertEqual(stats["retried_429"], 1)
+        self.assertEqual(stats["sent"], 4)
+
+    def test_gives_up_after_max_retries(self):
+        def always_429(method, payload):
+            with self.lock:
+                self.calls.append((payload["chat_id"], payload["text"], time.monotonic()))
+            if payload["text"] == "a1":
+                return 429, {"ok": False, "parameters": {"retry_after": 0.01}}
+            return 200, {"ok": True, "result": {"text": payload["text"]}}
+
+        dispatcher = SendDispatcher(always_429, global_rate=0, chat_rate=0, workers=2, max_retries=2)
+        first = dispatcher.submit("sendMessage", {"chat_id": 1, "text": "a1"}, 1)
+        second = dispatcher.submit("sendMessage", {"chat_id": 1, "text": "a2"}, 1)
+
+        self.assertIsNone(first.result(timeout=5))
+        self.assertEqual(second.result(timeout=5), {"text": "a2"})
+        self.assertEqual([text for text, _ in self.sent(1)], ["a1", "a1", "a1", "a2"])
+        self.assertEqual(dispatcher.stats()["dropped_429"], 1)
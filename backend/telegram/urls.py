@@ -1,7 +1,8 @@
 # telegram_app/urls.py
 from django.urls import path
-from .views import telegram_webhook
+from .views import telegram_webhook, update_queue_stats
 
 urlpatterns = [
     path("webhook/", telegram_webhook, name="telegram_webhook"),
+    path("queue/", update_queue_stats, name="telegram_update_queue"),
 ]
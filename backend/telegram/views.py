@@ -1,19 +1,36 @@
 import json
 import logging
+import os
 
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 
-from .services.handlers import handle_update
+from .services.bot_client import send_queue_stats
+from .services.handlers import ahandle_update
+from .services.update_dedup import get_update_dedup
+from .services.update_queue import get_update_queue
 
 logger = logging.getLogger(__name__)
 
+# responde o webhook na hora e processa o update na fila (False = processa inline)
+UPDATE_QUEUE = os.environ.get("PRICEBOT_UPDATE_QUEUE", "True") == "True"
+# ignora update_id repetido (reenvio do Telegram) antes de qualquer busca
+UPDATE_DEDUP = os.environ.get("PRICEBOT_UPDATE_DEDUP", "True") == "True"
+
+
+async def _dedup_call(method, update_id: int):
+    # com a tabela compartilhada tem I/O de SQLite: fora do event loop
+    if get_update_dedup().shared is None:
+        return method(update_id)
+    return await sync_to_async(method, thread_sensitive=False)(update_id)
+
 
 @csrf_exempt
 @require_POST
-def telegram_webhook(request):
+async def telegram_webhook(request):
     try:
         body = request.body.decode("utf-8")
         update = json.loads(body)
@@ -21,6 +38,35 @@ def telegram_webhook(request):
         logger.exception("Erro ao ler update do Telegram: %s", e)
         return HttpResponse(status=400)
 
+    if not isinstance(update, dict) or not isinstance(update.get("update_id"), int):
+        logger.warning("Update inválido do Telegram: %s", update)
+        return HttpResponse(status=400)
+
+    update_id = update["update_id"]
+    dedup = get_update_dedup()
+    if UPDATE_DEDUP and await _dedup_call(dedup.check_and_remember, update_id):
+        logger.info("Update %s repetido (reenvio do Telegram); ignorando", update_id)
+        return HttpResponse(status=200)
+
     logger.info("Update recebido do Telegram: %s", update)
-    handle_update(update)
+    if UPDATE_QUEUE and not get_update_queue().submit(update):
+        # fila cheia: o Telegram reenvia o update mais tarde, e o reenvio tem que passar
+        if UPDATE_DEDUP:
+            await _dedup_call(dedup.forget, update_id)
+        return HttpResponse(status=503)
+
+    if not UPDATE_QUEUE:
+        await ahandle_update(update)
     return HttpResponse(status=200)
+
+
+@require_GET
+def update_queue_stats(request):
+    """Filas de updates e de envio (profundidade, espera, processamento) e reenvios ignorados."""
+    return JsonResponse(
+        {
+            "updates": get_update_queue().stats(),
+            "sends": send_queue_stats(),
+            "dedup": get_update_dedup().stats(),
+        }
+    )